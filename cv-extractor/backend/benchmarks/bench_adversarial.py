@@ -0,0 +1,138 @@
+"""
+Benchmark de l'extraction sur des textes hostiles.
+
+Chaque texte est construit pour faire exploser le retour arrière d'un
+pattern (longues suites de "a.a.a." pour l'email, "@" en rafale, lettres
+espacées, texte sans saut de ligne comme après clean_text...) ou tiré au
+hasard parmi les caractères sensibles. L'extraction complète
+(extract_cv_info) est mesurée à plusieurs tailles : le coût par octet
+doit rester borné, c'est-à-dire ne pas grandir avec la taille du texte.
+
+Le script échoue (code de sortie 1) si le coût par octet à la plus grande
+taille dépasse `--max-growth` fois celui de la plus petite.
+`--legacy` mesure aussi l'ancien pattern d'email avec le module re.
+
+Usage :
+    cd backend
+    python benchmarks/bench_adversarial.py [--sizes 16384 65536 262144] [--legacy]
+    REGEX_ENGINE=re2 python benchmarks/bench_adversarial.py
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.extractor import extract_cv_info
+from services.regex_engine import active_engine
+
+LEGACY_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+FUZZ_ALPHABET = "aZ.@-_1 é%+:\n"
+
+
+def _repeat(unit: str) -> Callable[[int], str]:
+    return lambda size: (unit * (size // len(unit) + 1))[:size]
+
+
+def _fuzz(size: int) -> str:
+    rng = random.Random(size)
+    return "".join(rng.choice(FUZZ_ALPHABET) for _ in range(size))
+
+
+# Textes hostiles : nom -> générateur (taille en caractères -> texte)
+CASES: Dict[str, Callable[[int], str]] = {
+    "points_et_lettres": _repeat("a."),
+    "arobases_en_rafale": _repeat("a@"),
+    "domaine_sans_extension": lambda size: "yann@" + _repeat("a.1")(size - 5),
+    "partie_locale_geante": lambda size: _repeat("a")(size - 8) + "@b.c.d1",
+    "lettres_espacees": _repeat("Y a n n "),
+    "espaces": lambda size: "Yann" + " " * (size - 8) + "HOUN",
+    "titres_en_rafale": _repeat("FORMATION Master "),
+    "diplomes_en_rafale": _repeat("Master Informatique, Licence "),
+    "fuzz": _fuzz,
+}
+
+
+def measure(func: Callable[[str], object], text: str, repeat: int) -> float:
+    """Meilleur temps (secondes) sur `repeat` exécutions"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def extract_quietly(text: str) -> None:
+    # extract_name affiche des traces de debug
+    with contextlib.redirect_stdout(io.StringIO()):
+        extract_cv_info(text)
+
+
+def bench(sizes: List[int], repeat: int, legacy: bool) -> List[Dict]:
+    results = []
+    for name, make in CASES.items():
+        per_byte = {}
+        for size in sizes:
+            text = make(size)
+            per_byte[size] = measure(extract_quietly, text, repeat) / len(text) * 1e9
+        result = {"case": name, "ns_per_byte": per_byte}
+        if legacy:
+            # L'ancien pattern est quadratique : petites tailles uniquement
+            text = make(min(sizes))
+            result["legacy_email_ns_per_byte"] = (
+                measure(LEGACY_EMAIL_PATTERN.search, text, 1) / len(text) * 1e9
+            )
+        results.append(result)
+    return results
+
+
+def print_report(results: List[Dict], sizes: List[int]) -> None:
+    header = f"{'cas':<24}" + "".join(f"{size:>12}" for size in sizes) + f"{'croissance':>12}"
+    print(f"Coût de extract_cv_info en ns/octet (moteur : {active_engine()})")
+    print(header)
+    for result in results:
+        values = [result["ns_per_byte"][size] for size in sizes]
+        line = f"{result['case']:<24}" + "".join(f"{value:>12.0f}" for value in values)
+        line += f"{values[-1] / values[0]:>11.1f}x"
+        if "legacy_email_ns_per_byte" in result:
+            line += f"   (ancien pattern d'email : {result['legacy_email_ns_per_byte']:.0f} ns/octet)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction sur des textes hostiles")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16384, 65536, 262144])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Rapport maximal des coûts par octet entre la plus grande et la plus petite taille")
+    parser.add_argument("--legacy", action="store_true", help="Mesure aussi l'ancien pattern d'email")
+    parser.add_argument("--json", help="Écrit les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    results = bench(sizes, args.repeat, args.legacy)
+    print_report(results, sizes)
+    if args.json:
+        with open(args.json, "w") as target:
+            json.dump(results, target, indent=2)
+
+    failures = [
+        result["case"] for result in results
+        if result["ns_per_byte"][sizes[-1]] > args.max_growth * result["ns_per_byte"][sizes[0]]
+    ]
+    if failures:
+        print(f"Coût par octet non borné : {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
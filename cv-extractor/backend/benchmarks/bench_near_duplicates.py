@@ -0,0 +1,169 @@
+"""
+Benchmark de la recherche de quasi-doublons (index LSH par bandes).
+
+La table est remplie par paliers (`--sizes`) de CV d'origine aux
+signatures MinHash aléatoires, insérées directement avec leurs bandes
+(sans texte ni extraction). À chaque palier, find_near_duplicates est
+mesuré pour des uploads qui sont des versions d'un CV stocké (signature
+modifiée sur une partie de ses valeurs) et pour des CV nouveaux, et
+comparé à un parcours complet des signatures (`--probes-scan` requêtes).
+
+La latence de l'index doit rester quasi constante d'un palier à l'autre,
+quand celle du parcours complet grandit avec le nombre de CV. Le script
+échoue (code de sortie 1) si une version n'est pas retrouvée.
+
+Usage :
+    cd backend
+    python benchmarks/bench_near_duplicates.py [--sizes 10000 50000 100000] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.load_test import percentile
+from database import Base, create_database_engine
+from models.cv_database import CVExtraction, MinHashBand
+from services import minhash
+from services.repository import find_near_duplicates
+
+
+def random_signature(rng: random.Random) -> minhash.Signature:
+    return tuple(rng.getrandbits(32) for _ in range(minhash.NUM_HASHES))
+
+
+def make_version(rng: random.Random, signature: minhash.Signature, changed: float) -> minhash.Signature:
+    """Version de la signature dont une part `changed` des valeurs diffère"""
+    values = list(signature)
+    for slot in rng.sample(range(minhash.NUM_HASHES), int(changed * minhash.NUM_HASHES)):
+        values[slot] = rng.getrandbits(32)
+    return tuple(values)
+
+
+def fill(session_factory, rng: random.Random, start: int, rows: int, batch_size: int = 2000) -> None:
+    """Complète la table de CV d'origine et de leurs bandes"""
+    db = session_factory()
+    try:
+        for offset in range(start, rows, batch_size):
+            cvs, bands = [], []
+            for index in range(offset, min(offset + batch_size, rows)):
+                signature = random_signature(rng)
+                cvs.append({"id": index + 1, "filename": f"cv{index}.pdf",
+                            "candidate_key": f"email:cv{index}@example.com",
+                            "minhash": minhash.pack(signature)})
+                bands.extend({"band": band, "bucket": bucket, "cv_id": index + 1}
+                             for band, bucket in minhash.band_buckets(signature))
+            db.execute(CVExtraction.__table__.insert(), cvs)
+            db.execute(MinHashBand.__table__.insert(), bands)
+            db.commit()
+    finally:
+        db.close()
+
+
+def scan(db, signature: minhash.Signature) -> int:
+    """Parcours complet : meilleure signature au-dessus du seuil, sans index"""
+    best, best_similarity = None, minhash.NEAR_DUPLICATE_THRESHOLD
+    for cv_id, data in db.execute(select(CVExtraction.id, CVExtraction.minhash)):
+        score = minhash.similarity(signature, minhash.unpack(data))
+        if score >= best_similarity:
+            best, best_similarity = cv_id, score
+    return best
+
+
+def latencies_summary(latencies: List[float]) -> Dict:
+    latencies.sort()
+    return {"p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95)}
+
+
+def bench_size(session_factory, rng: random.Random, rows: int, probes: int, probes_scan: int,
+               changed: float) -> Dict:
+    db = session_factory()
+    try:
+        stored = [(cv_id, minhash.unpack(data)) for cv_id, data in db.execute(
+            select(CVExtraction.id, CVExtraction.minhash).order_by(CVExtraction.id)
+        ).all()[::max(1, rows // probes)]]
+        versions, fresh, missed = [], [], 0
+        for cv_id, signature in stored[:probes]:
+            row = {"minhash": minhash.pack(make_version(rng, signature, changed)), "candidate_key": None}
+            started = time.perf_counter()
+            found = find_near_duplicates(db, [row])[0]
+            versions.append((time.perf_counter() - started) * 1000)
+            missed += found is None or found[0] != cv_id
+
+            row = {"minhash": minhash.pack(random_signature(rng)), "candidate_key": None}
+            started = time.perf_counter()
+            find_near_duplicates(db, [row])
+            fresh.append((time.perf_counter() - started) * 1000)
+
+        scans = []
+        for _, signature in stored[:probes_scan]:
+            started = time.perf_counter()
+            scan(db, make_version(rng, signature, changed))
+            scans.append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+    return {
+        "rows": rows,
+        "version_ms": latencies_summary(versions),
+        "new_cv_ms": latencies_summary(fresh),
+        "scan_ms": latencies_summary(scans),
+        "missed": missed,
+    }
+
+
+def print_report(results: List[Dict]) -> None:
+    print(f"{'lignes':>8}  {'version p50/p95 (ms)':>21}  {'nouveau p50/p95 (ms)':>21}"
+          f"  {'parcours p50 (ms)':>18}  {'manqués':>8}")
+    for result in results:
+        version, fresh = result["version_ms"], result["new_cv_ms"]
+        print(f"{result['rows']:>8}  {version['p50']:>10.2f}/{version['p95']:<10.2f}"
+              f"  {fresh['p50']:>10.2f}/{fresh['p95']:<10.2f}"
+              f"  {result['scan_ms']['p50']:>18.1f}  {result['missed']:>8d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de quasi-doublons")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--probes", type=int, default=200, help="Recherches par palier via l'index")
+    parser.add_argument("--probes-scan", type=int, default=5, help="Recherches par parcours complet")
+    parser.add_argument("--changed", type=float, default=0.1,
+                        help="Part des valeurs de signature modifiées dans une version")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Fichier où sauvegarder les résultats")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_database_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}")
+        try:
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            filled = 0
+            for rows in sorted(args.sizes):
+                fill(session_factory, rng, filled, rows)
+                filled = rows
+                results.append(bench_size(session_factory, rng, rows, args.probes, args.probes_scan, args.changed))
+        finally:
+            engine.dispose()
+
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps({"config": vars(args) | {"json": None}, "results": results}, indent=2))
+    if any(result["missed"] for result in results):
+        print("Des versions n'ont pas été retrouvées par l'index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
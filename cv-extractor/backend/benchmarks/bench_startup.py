@@ -0,0 +1,116 @@
+"""
+Benchmark du démarrage à froid du backend.
+
+Mesure deux choses dans des processus Python neufs :
+- le coût d'import de `main` (via `python -X importtime`), avec les
+  modules les plus lourds ;
+- le temps jusqu'à la première requête : lancement du processus,
+  import, lifespan (création des tables) puis GET /health.
+
+Usage :
+    cd backend
+    python benchmarks/bench_startup.py [--runs 5] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+FIRST_REQUEST_SNIPPET = """
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+"""
+
+
+def _env(db_path: str) -> dict:
+    """Environnement isolé : base SQLite jetable, pas de warm-up"""
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{db_path}"
+    env.setdefault("PRELOAD_PARSERS", "false")
+    return env
+
+
+def measure_import_time(env: dict) -> dict:
+    """
+    Lance `python -X importtime -c "import main"` et analyse la sortie.
+
+    Returns:
+        Dictionnaire avec le temps cumulé total et les modules les plus lourds
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # Format : "import time: <self> | <cumulé> | <indentation><module>"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((name[1:], int(self_us), int(cumulative_us)))
+
+    total_us = next((cum for name, _, cum in modules if name == "main"), 0)
+    # Imports directs de main : un seul niveau d'indentation (2 espaces)
+    top_level = sorted(
+        ((name.strip(), cum) for name, _, cum in modules
+         if name.startswith("  ") and not name.startswith("   ")),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    return {
+        "import_main_ms": total_us / 1000,
+        "heaviest_direct_imports_ms": {name: cum / 1000 for name, cum in top_level[:10]},
+    }
+
+
+def measure_first_request(env: dict) -> float:
+    """Temps (s) entre le lancement du processus et la réponse à /health"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SNIPPET],
+        cwd=BACKEND_DIR, env=env, capture_output=True, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de processus lancés")
+    parser.add_argument("--json", type=Path, help="Fichier où sauvegarder les résultats")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(os.path.join(tmp, "bench.db"))
+        imports = [measure_import_time(env) for _ in range(args.runs)]
+        first_requests = [measure_first_request(env) for _ in range(args.runs)]
+
+    results = {
+        "runs": args.runs,
+        "import_main_ms_median": statistics.median(r["import_main_ms"] for r in imports),
+        "time_to_first_request_ms_median": statistics.median(first_requests) * 1000,
+        "time_to_first_request_ms_max": max(first_requests) * 1000,
+        "heaviest_direct_imports_ms": imports[-1]["heaviest_direct_imports_ms"],
+    }
+
+    print(f"Import de main (médiane)          : {results['import_main_ms_median']:.1f} ms")
+    print(f"Première requête (médiane / max)  : {results['time_to_first_request_ms_median']:.1f} ms"
+          f" / {results['time_to_first_request_ms_max']:.1f} ms")
+    print("Imports directs de main les plus lourds :")
+    for name, ms in results["heaviest_direct_imports_ms"].items():
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark du stockage : mode SQLite embarqué comparé à PostgreSQL.
+
+Pour chaque base :
+- débit d'insertion : `--writers` threads enregistrent chacun des CV
+  distincts avec save_extraction, comme l'endpoint d'upload (en SQLite,
+  par la file d'écriture unique) ; les erreurs ("database is locked"...)
+  sont comptées ;
+- latence de l'historique : la table est complétée jusqu'à `--rows`
+  lignes, puis les requêtes de GET /api/v1/history (sans filtre, par
+  niveau, par type de diplôme) sont rejouées `--queries` fois.
+
+La base SQLite est un fichier jetable. PostgreSQL n'est mesuré qu'avec
+`--postgres-url`, qui doit désigner une base jetable : la table
+cv_extractions y est supprimée puis recréée.
+
+Usage :
+    cd backend
+    python benchmarks/bench_storage.py [--postgres-url postgresql://...] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.load_test import percentile
+from database import Base, create_database_engine
+from models.cv_database import CVExtraction
+from services.repository import build_row, save_extraction, upsert_rows
+from services.write_queue import WriteQueue
+
+DEGREES = (
+    ("Master Informatique", 5, "Master"),
+    ("Licence Mathématiques", 3, "Licence"),
+    ("BTS SIO", 2, "BTS"),
+    ("Doctorat en Physique", 8, "Doctorat"),
+    ("Diplôme d'ingénieur", 5, "Ingénieur"),
+)
+TEXT = "Développement d'applications web et d'API REST en Python. " * 40
+
+
+def make_cv(index: int) -> Dict:
+    """CV extrait synthétique (coordonnées uniques par index)"""
+    degree, level, label = DEGREES[index % len(DEGREES)]
+    return {
+        "first_name": "Camille",
+        "last_name": f"MARTIN{index}",
+        "email": f"camille.martin{index}@example.com",
+        "phone": f"06{index:08d}"[:10],
+        "degree": degree,
+        "degree_level": level,
+        "degree_label": label,
+        "degree_field": None,
+    }
+
+
+def bench_inserts(session_factory, is_sqlite: bool, count: int, writers: int) -> Dict:
+    """Insertions concurrentes, une transaction par CV comme l'API"""
+    write_queue = WriteQueue(session_factory) if is_sqlite else None
+    errors: List[str] = []
+
+    def writer(worker: int) -> None:
+        db = None if write_queue else session_factory()
+        try:
+            for index in range(worker, count, writers):
+                cv_data = make_cv(index)
+                try:
+                    if write_queue:
+                        write_queue.run(save_extraction, cv_data, f"cv{index}.pdf", TEXT)
+                    else:
+                        save_extraction(db, cv_data, f"cv{index}.pdf", TEXT)
+                except Exception as e:
+                    errors.append(str(e).splitlines()[0])
+                    if db is not None:
+                        db.rollback()
+        finally:
+            if db is not None:
+                db.close()
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if write_queue:
+        write_queue.close()
+    return {
+        "inserts": count,
+        "writers": writers,
+        "inserts_per_s": count / elapsed,
+        "errors": len(errors),
+        "first_errors": sorted(set(errors))[:3],
+    }
+
+
+def fill(session_factory, start: int, rows: int, batch_size: int = 1000) -> None:
+    """Complète la table par lots (upsert multi-lignes)"""
+    db = session_factory()
+    try:
+        for offset in range(start, rows, batch_size):
+            batch = [build_row(make_cv(index), f"cv{index}.pdf", text=TEXT)
+                     for index in range(offset, min(offset + batch_size, rows))]
+            upsert_rows(db, batch)
+            db.commit()
+    finally:
+        db.close()
+
+
+def bench_history(session_factory, queries: int, limit: int) -> Dict:
+    """Latences (ms) des requêtes de l'historique, sérialisation to_dict comprise"""
+    filters = {
+        "recent": [],
+        "min_level": [CVExtraction.degree_level >= 5],
+        "degree_label": [CVExtraction.degree_label == "Licence"],
+    }
+    results = {}
+    db = session_factory()
+    try:
+        for name, conditions in filters.items():
+            latencies = []
+            for _ in range(queries):
+                started = time.perf_counter()
+                # Même requête que GET /api/v1/history
+                cv_list = db.query(CVExtraction).filter(*conditions).order_by(
+                    CVExtraction.last_seen_at.desc().nullslast()
+                ).limit(limit).all()
+                [cv.to_dict() for cv in cv_list]
+                latencies.append((time.perf_counter() - started) * 1000)
+                db.rollback()
+            latencies.sort()
+            results[name] = {
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+            }
+    finally:
+        db.close()
+    return results
+
+
+def bench_database(url: str, args) -> Dict:
+    engine = create_database_engine(url)
+    try:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        inserts = bench_inserts(session_factory, engine.dialect.name == "sqlite", args.inserts, args.writers)
+        fill(session_factory, args.inserts, args.rows)
+        history = bench_history(session_factory, args.queries, args.limit)
+        return {"backend": engine.dialect.name, "rows": args.rows, "insert": inserts, "history_ms": history}
+    finally:
+        engine.dispose()
+
+
+def print_report(results: List[Dict]) -> None:
+    print(f"{'base':12} {'insert/s':>9} {'erreurs':>8}  {'historique p50 / p95 (ms)':>26}")
+    for result in results:
+        insert = result["insert"]
+        history = "  ".join(
+            f"{name} {latency['p50']:.1f}/{latency['p95']:.1f}"
+            for name, latency in result["history_ms"].items()
+        )
+        print(f"{result['backend']:12} {insert['inserts_per_s']:9.0f} {insert['errors']:8d}  {history}")
+        for error in insert["first_errors"]:
+            print(f"    {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du stockage SQLite / PostgreSQL")
+    parser.add_argument("--postgres-url", help="Base PostgreSQL JETABLE à comparer (la table est recréée)")
+    parser.add_argument("--inserts", type=int, default=2000, help="CV enregistrés un par un")
+    parser.add_argument("--writers", type=int, default=8, help="Threads d'écriture concurrents")
+    parser.add_argument("--rows", type=int, default=20000, help="Lignes en base pour l'historique")
+    parser.add_argument("--queries", type=int, default=200, help="Répétitions par requête d'historique")
+    parser.add_argument("--limit", type=int, default=50, help="Taille de page de l'historique")
+    parser.add_argument("--json", type=Path, help="Fichier où sauvegarder les résultats")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        results.append(bench_database(f"sqlite:///{os.path.join(tmp, 'bench.sqlite3')}", args))
+    if args.postgres_url:
+        results.append(bench_database(args.postgres_url, args))
+
+    print_report(results)
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key not in ("json", "postgres_url")}
+        args.json.write_text(json.dumps({"config": config, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
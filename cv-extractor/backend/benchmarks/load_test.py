@@ -0,0 +1,339 @@
+"""
+Test de charge de l'API : débit, latences et taux d'erreur.
+
+Rejoue un mélange d'uploads de CV synthétiques (PDF/DOCX générés à la
+volée) et de lectures de l'historique, avec une concurrence et un débit
+configurables, contre :
+- une instance uvicorn locale lancée par le script (base SQLite jetable
+  par défaut, ou `--database-url` pour un PostgreSQL local) ;
+- ou un serveur déjà démarré (`--url`).
+
+Avec `--rate`, les requêtes partent à intervalles fixes (charge ouverte)
+et la latence est mesurée depuis l'instant prévu d'envoi : une requête
+retardée par la saturation du serveur compte dans la latence.
+
+Usage :
+    cd backend
+    python benchmarks/load_test.py --concurrency 16 --duration 30 [--rate 20] [--json resultats.json]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+FIRST_NAMES = ("Yann", "Marie", "Thomas", "Camille", "Lucas", "Chloé", "Hugo", "Léa", "Nicolas", "Sarah")
+LAST_NAMES = ("MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND", "LEROY", "MOREAU")
+DEGREES = (
+    "Master Informatique", "Licence Mathématiques", "Diplôme d'ingénieur en Génie Civil",
+    "BTS Services Informatiques aux Organisations", "Doctorat en Physique", "Bachelor Marketing",
+)
+FILLER = (
+    "Développement d'applications web et d'API REST en Python.",
+    "Gestion de projet agile, animation des cérémonies Scrum.",
+    "Analyse de données et mise en place de tableaux de bord.",
+    "Maintenance d'une infrastructure Linux et conteneurs Docker.",
+)
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+# --- Génération des documents synthétiques ---
+
+def cv_lines(rng: random.Random, index: int, pages: int) -> List[List[str]]:
+    """Lignes d'un CV synthétique, par page (coordonnées uniques par index)"""
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    header = [
+        f"{first_name} {last_name}",
+        f"{first_name.lower()}.{last_name.lower()}{index}@example.com",
+        f"06 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+        "FORMATION",
+        f"{rng.choice(DEGREES)} - {rng.randint(2005, 2024)}",
+        "EXPÉRIENCE",
+    ]
+    body = [[rng.choice(FILLER) for _ in range(30)] for _ in range(pages)]
+    body[0] = header + body[0][:20]
+    return body
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """PDF minimal (Helvetica, WinAnsi) : une page par liste de lignes"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for lines in pages:
+        content = "BT /F1 10 Tf 50 780 Td 14 TL " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        content_bytes = content.encode("cp1252", errors="replace")
+        objects.append(f"<< /Length {len(content_bytes)} >>\nstream\n" + content_bytes.decode("latin-1") + "\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R"
+            " /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_docx(pages: List[List[str]]) -> bytes:
+    """DOCX généré avec python-docx"""
+    from docx import Document
+
+    document = Document()
+    for lines in pages:
+        for line in lines:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_corpus(size: int, docx_ratio: float, max_pages: int, seed: int) -> List[Tuple[str, bytes, str]]:
+    """Corpus de `size` documents distincts : (nom de fichier, contenu, type MIME)"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        pages = cv_lines(rng, index, rng.randint(1, max_pages))
+        if rng.random() < docx_ratio:
+            corpus.append((f"cv_{index}.docx", make_docx(pages), DOCX_MIME))
+        else:
+            corpus.append((f"cv_{index}.pdf", make_pdf(pages), "application/pdf"))
+    return corpus
+
+
+# --- Serveur local ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, workers: int, tmp_dir: str) -> Tuple[subprocess.Popen, str]:
+    """
+    Lance uvicorn sur un port libre et attend que /health réponde.
+    La limitation de débit est désactivée (tous les clients ont la même IP).
+    """
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "RATE_LIMIT_ENABLED": "false",
+        "PRELOAD_PARSERS": "true",
+        "RESULT_CACHE_PATH": os.path.join(tmp_dir, "results.sqlite3"),
+        "POISON_CACHE_PATH": os.path.join(tmp_dir, "poison.sqlite3"),
+    })
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Le serveur uvicorn s'est arrêté au démarrage")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Le serveur uvicorn n'a pas démarré en 60 s")
+
+
+# --- Génération de charge ---
+
+class Sample(NamedTuple):
+    kind: str
+    status: int  # 0 : erreur réseau ou délai client dépassé
+    latency: float
+
+
+async def _request(client: httpx.AsyncClient, kind: str, document: Optional[Tuple[str, bytes, str]]) -> int:
+    try:
+        if kind == "upload":
+            response = await client.post("/api/v1/upload-cv", files={"file": document})
+        else:
+            response = await client.get("/api/v1/history", params={"limit": 50})
+        return response.status_code
+    except httpx.HTTPError:
+        return 0
+
+
+async def run_load(url: str, corpus: List[Tuple[str, bytes, str]], concurrency: int, rate: float,
+                   duration: float, max_requests: int, history_ratio: float, timeout: float,
+                   seed: int) -> Tuple[List[Sample], float]:
+    """
+    Envoie les requêtes jusqu'à `duration` secondes ou `max_requests` requêtes.
+
+    Returns:
+        (mesures, durée effective en secondes)
+    """
+    rng = random.Random(seed)
+    samples: List[Sample] = []
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def one(kind: str, document, scheduled: float) -> None:
+            try:
+                status = await _request(client, kind, document)
+                samples.append(Sample(kind, status, time.perf_counter() - scheduled))
+            finally:
+                slots.release()
+
+        tasks = []
+        started = time.perf_counter()
+        sent = 0
+        while sent < max_requests:
+            scheduled = started + sent / rate if rate > 0 else time.perf_counter()
+            if scheduled - started >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await slots.acquire()
+            if rate <= 0:
+                scheduled = time.perf_counter()
+                if scheduled - started >= duration:
+                    slots.release()
+                    break
+            kind = "history" if rng.random() < history_ratio else "upload"
+            tasks.append(asyncio.create_task(one(kind, corpus[sent % len(corpus)] if kind == "upload" else None, scheduled)))
+            sent += 1
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+# --- Rapport ---
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    """Débit, percentiles de latence (ms) et taux d'erreur, au total et par type de requête"""
+    def stats(group: List[Sample]) -> Dict:
+        latencies = sorted(sample.latency * 1000 for sample in group)
+        errors = sum(1 for sample in group if not 200 <= sample.status < 300)
+        statuses: Dict[str, int] = {}
+        for sample in group:
+            statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+        return {
+            "requests": len(group),
+            "throughput_rps": len(group) / elapsed if elapsed else 0.0,
+            "error_rate": errors / len(group) if group else 0.0,
+            "status_codes": statuses,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+        }
+
+    result = {"duration_s": elapsed, "all": stats(samples)}
+    for kind in ("upload", "history"):
+        group = [sample for sample in samples if sample.kind == kind]
+        if group:
+            result[kind] = stats(group)
+    return result
+
+
+def print_report(summary: Dict) -> None:
+    print(f"Durée : {summary['duration_s']:.1f} s")
+    print(f"{'':10} {'requêtes':>9} {'req/s':>8} {'erreurs':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for kind in ("all", "upload", "history"):
+        if kind not in summary:
+            continue
+        stats = summary[kind]
+        latency = stats["latency_ms"]
+        print(
+            f"{kind:10} {stats['requests']:9d} {stats['throughput_rps']:8.1f} {stats['error_rate']:8.1%}"
+            f" {latency['p50']:8.1f} {latency['p90']:8.1f} {latency['p95']:8.1f} {latency['p99']:8.1f} {latency['max']:8.1f}"
+        )
+    print(f"Codes HTTP : {summary['all']['status_codes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API CV Extractor")
+    parser.add_argument("--url", help="Serveur existant (sinon, uvicorn est lancé localement)")
+    parser.add_argument("--database-url", help="Base du serveur lancé (défaut : SQLite jetable)")
+    parser.add_argument("--server-workers", type=int, default=1, help="Workers uvicorn du serveur lancé")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes simultanées au plus")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requêtes/s (0 : aussi vite que possible)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée du test en secondes")
+    parser.add_argument("--requests", type=int, default=sys.maxsize, help="Nombre maximal de requêtes")
+    parser.add_argument("--history-ratio", type=float, default=0.2, help="Part des lectures de l'historique")
+    parser.add_argument("--docx-ratio", type=float, default=0.3, help="Part des DOCX parmi les uploads")
+    parser.add_argument("--corpus-size", type=int, default=200, help="Nombre de CV distincts générés")
+    parser.add_argument("--max-pages", type=int, default=3, help="Nombre maximal de pages par CV")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Délai client par requête (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", type=Path, help="Fichier où sauvegarder les résultats")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus_size, args.docx_ratio, args.max_pages, args.seed)
+    print(f" Corpus : {len(corpus)} CV ({sum(len(doc[1]) for doc in corpus) / 1e6:.1f} Mo)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        url = args.url
+        if url is None:
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+            server, url = start_server(database_url, args.server_workers, tmp)
+            print(f" Serveur local : {url} ({database_url.split(':', 1)[0]}, {args.server_workers} worker(s))")
+        try:
+            samples, elapsed = asyncio.run(run_load(
+                url, corpus, args.concurrency, args.rate, args.duration, args.requests,
+                args.history_ratio, args.timeout, args.seed
+            ))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    summary = summarize(samples, elapsed)
+    print_report(summary)
+
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key not in ("json", "requests")}
+        config["requests"] = None if args.requests == sys.maxsize else args.requests
+        args.json.write_text(json.dumps({"config": config, "results": summary}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
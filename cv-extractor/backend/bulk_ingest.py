@@ -0,0 +1,223 @@
+"""
+Ingestion hors ligne d'une archive de CV (PDF/DOCX).
+
+Parcourt un dossier, traite les fichiers sur tous les cœurs (pool de
+processus), enregistre les résultats dans cv_extractions par lots
+(upsert), et tient un manifeste des fichiers terminés indexé par hash :
+une exécution interrompue reprend sans retraiter les fichiers déjà faits.
+
+Usage :
+    cd backend
+    python bulk_ingest.py /chemin/vers/archive [--workers 8] [--batch-size 500]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+# Configure le PYTHONPATH AVANT tous les autres imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database import SessionLocal
+from init_db import init_database
+from services.pipeline import SUPPORTED_EXTENSIONS, process_file
+from services.repository import build_row, upsert_rows
+
+MANIFEST_NAME = ".cv_ingest_manifest.jsonl"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Hashes déjà traités, transmis une fois à chaque worker
+_done_hashes: Set[str] = set()
+
+
+def discover_files(root: Path) -> Iterator[Path]:
+    """Parcourt récursivement le dossier à la recherche de PDF/DOCX"""
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.rsplit(".", 1)[-1].lower() in SUPPORTED_EXTENSIONS:
+                yield Path(dirpath) / filename
+
+
+def file_hash(path: Path) -> str:
+    """Hash SHA-256 du contenu du fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, Dict]:
+    """
+    Entrées du manifeste indexées par hash (les dernières l'emportent).
+    Les fichiers illisibles (sans hash) ne sont pas indexés : ils sont
+    retentés à chaque exécution.
+    """
+    entries = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as manifest:
+            for line in manifest:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # dernière ligne tronquée par une interruption
+                if entry.get("hash"):
+                    entries[entry["hash"]] = entry
+    return entries
+
+
+def _terminate_last_line(path: Path) -> None:
+    """Termine par un saut de ligne une dernière ligne tronquée, pour que la suite du manifeste reste lisible"""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb+") as manifest:
+        manifest.seek(-1, os.SEEK_END)
+        if manifest.read(1) != b"\n":
+            manifest.write(b"\n")
+
+
+def _init_worker(done_hashes: Set[str]) -> None:
+    """Initialisation d'un worker : hashes déjà faits, sortie des extracteurs muette"""
+    global _done_hashes
+    _done_hashes = done_hashes
+    sys.stdout = open(os.devnull, "w")
+
+
+def _process(path: Path) -> Tuple[str, Optional[str], int, Optional[Tuple[Dict, str]], Optional[str]]:
+    """
+    Traite un fichier dans un worker.
+    Un fichier disparu ou illisible est rapporté en erreur, sans hash.
+
+    Returns:
+        (chemin, hash ou None, taille, (résultat, texte) ou None, erreur ou None)
+    """
+    digest, size = None, 0
+    try:
+        size = path.stat().st_size
+        digest = file_hash(path)
+        if digest in _done_hashes:
+            return str(path), digest, size, None, None
+        return str(path), digest, size, process_file(str(path), path.suffix[1:].lower()), None
+    except Exception as e:
+        return str(path), digest, size, None, str(e)
+
+
+class Throughput:
+    """Compteurs de débit affichés pendant l'ingestion"""
+
+    def __init__(self, report_every: float = 5.0):
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.report_every = report_every
+        self.docs = self.bytes = self.skipped = self.errors = 0
+
+    def add(self, size: int, skipped: bool = False, error: bool = False) -> None:
+        if skipped:
+            self.skipped += 1
+            return
+        self.docs += 1
+        self.bytes += size
+        self.errors += int(error)
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last_report < self.report_every:
+            return
+        self.last_report = now
+        elapsed = max(now - self.started, 1e-9)
+        print(
+            f" {self.docs} traités ({self.errors} erreurs), {self.skipped} déjà faits"
+            f" | {self.docs / elapsed:.1f} docs/s | {self.bytes / elapsed / 1e6:.2f} Mo/s",
+            flush=True
+        )
+
+
+def ingest(root: Path, workers: int, batch_size: int, manifest_path: Path, retry_errors: bool = False) -> Throughput:
+    """
+    Ingestion complète d'un dossier.
+    Un lot n'est inscrit au manifeste qu'après le commit en base.
+    """
+    manifest = load_manifest(manifest_path)
+    _terminate_last_line(manifest_path)
+    done = {
+        digest for digest, entry in manifest.items()
+        if entry["status"] == "ok" or not retry_errors
+    }
+    print(f" {len(done)} fichiers déjà traités d'après le manifeste {manifest_path}")
+
+    stats = Throughput()
+    db = SessionLocal()
+    rows, entries = [], []
+
+    def flush() -> None:
+        if rows:
+            upsert_rows(db, rows)
+            db.commit()
+        with open(manifest_path, "a", encoding="utf-8") as manifest_file:
+            for entry in entries:
+                manifest_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        rows.clear()
+        entries.clear()
+
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(done,), maxtasksperchild=200) as pool:
+            for path, digest, size, result, error in pool.imap_unordered(_process, discover_files(root), chunksize=8):
+                if result is None and error is None:
+                    stats.add(size, skipped=True)
+                    continue
+                if digest is not None:
+                    if digest in done:
+                        # Même contenu déjà vu plus tôt dans cette exécution
+                        stats.add(size, skipped=True)
+                        continue
+                    done.add(digest)
+
+                stats.add(size, error=error is not None)
+                entry = {"hash": digest, "path": path, "status": "ok" if error is None else "error"}
+                if error is not None:
+                    entry["error"] = error
+                else:
+                    cv_data, text = result
+                    rows.append(build_row(cv_data, Path(path).name, text=text))
+                entries.append(entry)
+
+                if len(entries) >= batch_size:
+                    flush()
+                stats.report()
+        flush()
+    finally:
+        db.close()
+
+    stats.report(force=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion en masse d'une archive de CV")
+    parser.add_argument("directory", type=Path, help="Dossier contenant les CV (parcouru récursivement)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    parser.add_argument("--batch-size", type=int, default=500, help="Nombre de CV par insertion en base")
+    parser.add_argument("--manifest", type=Path, help=f"Manifeste de reprise (défaut : <dossier>/{MANIFEST_NAME})")
+    parser.add_argument("--retry-errors", action="store_true", help="Retraiter les fichiers en erreur")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"Dossier introuvable : {args.directory}")
+
+    init_database()
+    ingest(
+        args.directory,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        manifest_path=args.manifest or args.directory / MANIFEST_NAME,
+        retry_errors=args.retry_errors,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Configuration gunicorn pour la production.
+
+Lancement :
+    gunicorn -c gunicorn_conf.py main:app
+
+- N workers uvicorn (WEB_CONCURRENCY, par défaut le nombre de CPU), chacun
+  avec CPU / N processus de parsing (voir services/admission.py)
+- application préchargée dans le master : parseurs et patterns compilés
+  sont chargés avant le fork et partagés en copy-on-write
+- recyclage des workers après MAX_REQUESTS requêtes pour limiter la
+  croissance mémoire de pdfplumber
+"""
+import multiprocessing
+import os
+
+# Le schéma est créé une seule fois par le master, pas par chaque worker
+os.environ.setdefault("AUTO_CREATE_TABLES", "false")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Lu par l'application (préchargée après ce fichier) : chaque worker n'a que
+# sa part des CPU en processus de parsing (PARSE_CONCURRENCY par défaut)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Recyclage des workers (la gigue évite qu'ils redémarrent tous en même temps)
+max_requests = int(os.getenv("MAX_REQUESTS", "500"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "50"))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """
+    Exécuté dans le master, avant le fork des workers.
+    """
+    from database import engine
+    from init_db import init_database
+    from services.warmup import warm_up
+
+    init_database()
+    # Aucune connexion ouverte ne doit être héritée par les workers
+    engine.dispose()
+
+    duration = warm_up()
+    server.log.info("Parseurs préchargés en %.0f ms", duration * 1000)
@@ -1,15 +1,140 @@
 """
 Script pour initialiser la base de données.
-Crée toutes les tables définies dans les modèles.
+Crée toutes les tables définies dans les modèles, puis ajoute aux tables
+existantes les colonnes et index apparus depuis leur création.
+Les lignes d'une base antérieure reçoivent leur clé candidat, et les
+compteurs de statistiques sont calculés une fois.
 """
+from datetime import datetime
+
+from sqlalchemy import bindparam, exists, inspect, select, text, update
+from sqlalchemy.orm import Session
+
 from database import engine, Base
-from models.cv_database import CVExtraction
+from models.cv_database import CVExtraction, StatsTotal
+from services.repository import candidate_identity, rebuild_stats
+
+# Taille des lots de la recherche des clés déjà présentes
+BACKFILL_BATCH_SIZE = 500
+
+
+def _column_ddl(column, dialect) -> str:
+    """Définition SQL d'une colonne pour ALTER TABLE ... ADD COLUMN"""
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    if column.server_default is not None:
+        default = column.server_default.arg
+        default = default if str(default).isdigit() else f"'{default}'"
+        ddl += f" DEFAULT {default}"
+    return ddl
+
+
+def backfill_candidates(conn) -> int:
+    """
+    Renseigne l'identité des lignes antérieures au dédoublonnage.
+
+    Ces lignes se reconnaissent à leur last_seen_at vide (build_row le
+    remplit toujours). Email normalisé, téléphone E.164 et clé candidat
+    sont calculés comme à l'upload (candidate_identity, indicatif par
+    défaut faute de locale) et last_seen_at reprend created_at.
+
+    L'index unique n'autorise qu'une ligne par clé : la clé va à la ligne
+    la plus récente du candidat, sauf si une ligne la porte déjà. Les
+    doublons plus anciens gardent une clé vide (aucune ligne n'est
+    supprimée) et ne reçoivent plus les uploads suivants.
+
+    Returns:
+        Nombre de lignes renseignées
+    """
+    table = CVExtraction.__table__
+    rows = conn.execute(
+        select(table.c.id, table.c.email, table.c.phone, table.c.created_at)
+        .where(table.c.last_seen_at.is_(None))
+        .order_by(table.c.id.desc())
+    ).all()
+    if not rows:
+        return 0
+    
+    values = []
+    for row in rows:
+        email_normalized, phone_e164, key = candidate_identity({"email": row.email, "phone": row.phone})
+        values.append({
+            "row_id": row.id,
+            "email_normalized": email_normalized,
+            "phone_e164": phone_e164,
+            "candidate_key": key,
+            "last_seen_at": row.created_at or datetime.utcnow(),
+        })
+    
+    keys = sorted({value["candidate_key"] for value in values if value["candidate_key"]})
+    taken = set()
+    for start in range(0, len(keys), BACKFILL_BATCH_SIZE):
+        batch = keys[start:start + BACKFILL_BATCH_SIZE]
+        taken.update(conn.scalars(select(table.c.candidate_key).where(table.c.candidate_key.in_(batch))))
+    # Lignes parcourues de la plus récente à la plus ancienne
+    for value in values:
+        if value["candidate_key"] in taken:
+            value["candidate_key"] = None
+        elif value["candidate_key"]:
+            taken.add(value["candidate_key"])
+    
+    conn.execute(
+        update(table).where(table.c.id == bindparam("row_id")).values(
+            email_normalized=bindparam("email_normalized"),
+            phone_e164=bindparam("phone_e164"),
+            candidate_key=bindparam("candidate_key"),
+            last_seen_at=bindparam("last_seen_at"),
+        ),
+        values
+    )
+    return len(values)
+
+
+def migrate_schema(bind=None):
+    """
+    Migration : ajoute les colonnes et index manquants, puis renseigne la
+    clé candidat des lignes antérieures (avant la création de son index
+    unique). Aucune ligne n'est supprimée.
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    print(f"   + {table.name}.{column.name}")
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, bind.dialect)}"))
+        filled = backfill_candidates(conn)
+        if filled:
+            print(f"   + cv_extractions : clé candidat de {filled} ligne(s) existante(s)")
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def init_stats():
+    """
+    Calcule les compteurs de statistiques si la table des CV est remplie
+    mais pas eux (ou s'ils précèdent le décompte des champs extraits)
+    """
+    with Session(engine) as db:
+        if db.scalar(select(exists().where(StatsTotal.metric == "extracted"))):
+            return
+        if not db.scalar(select(exists().where(CVExtraction.id.isnot(None)))):
+            return
+        print("   + statistiques (cv_stats_totals)")
+        rebuild_stats(db)
+        db.commit()
+
 
 def init_database():
     """Crée toutes les tables dans la base de données"""
     print("🔧 Création des tables...")
     Base.metadata.create_all(bind=engine)
+    migrate_schema()
+    init_stats()
     print(" Tables créées avec succès !")
 
 if __name__ == "__main__":
-    init_database()
\ No newline at end of file
+    init_database()
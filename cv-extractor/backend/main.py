@@ -6,27 +6,73 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-import shutil
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Request, Header, Response, Body, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 
 # Import des services et modèles
-from services.pdf_parser import extract_text_from_pdf, clean_text as clean_pdf_text
-from services.docx_parser import extract_text_from_docx, clean_text as clean_docx_text
-from services.extractor import extract_cv_info
+from services.pipeline import SUPPORTED_EXTENSIONS, extract_text
+from services.extractor import EXTRACTOR_VERSION, extract_cv_info, resolve_fields, select_fields
+from services.admission import (
+    RATE_LIMIT_ENABLED,
+    REJECTIONS_TOTAL,
+    QueueFullError,
+    identify_client,
+    parse_scheduler,
+    rate_limiter,
+)
+from services.metrics import render_metrics
+from services.parser_pool import ParserCrashError, ParseTimeoutError, get_parser_pool
+from services import history, profiling, stats
+from services.repository import delete_extraction, delete_extractions, record_upload
 from models.cv_result import CVResult
-from models.cv_database import CVExtraction
-from database import get_db, engine, Base
+from database import get_db
+from init_db import init_database
+from services.warmup import warm_up
+from services.result_cache import get_poison_cache, get_result_cache
+from services.upload_buffer import SourceHandle, UploadBuffer, open_source
+from services.write_queue import get_write_queue
+
+# Gestion du schéma au démarrage (désactivable si les migrations sont faites à part)
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "true").lower() == "true"
+# Préchargement des parseurs au démarrage plutôt qu'à la première requête
+PRELOAD_PARSERS = os.getenv("PRELOAD_PARSERS", "false").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Démarrage de l'application.
+    Aucun travail lourd n'est fait à l'import du module : la création des
+    tables et le warm-up des parseurs ont lieu ici, une seule fois.
+    """
+    if AUTO_CREATE_TABLES:
+        init_database()
+    if PRELOAD_PARSERS:
+        duration = warm_up()
+        print(f" Parseurs préchargés en {duration * 1000:.0f} ms")
+    yield
+    parser_pool = get_parser_pool()
+    if parser_pool:
+        parser_pool.close()
+    write_queue = get_write_queue()
+    if write_queue:
+        write_queue.close()
 
-# Crée les tables au démarrage
-Base.metadata.create_all(bind=engine)
 
 # Création de l'application FastAPI
 app = FastAPI(
     title="CV Extractor API",
     description="API pour extraire automatiquement les informations d'un CV",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -43,6 +89,13 @@ UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
 
+def extract_text_from_handle(handle: SourceHandle, file_extension: str,
+                             fields: Optional[Tuple[str, ...]] = None) -> str:
+    """Parsing dans un thread (pool désactivé), depuis la mémoire partagée ou un fichier"""
+    with open_source(handle) as source:
+        return extract_text(source, file_extension, fields)
+
+
 @app.get("/")
 async def root():
     """Endpoint racine pour vérifier que l'API fonctionne"""
@@ -53,14 +106,73 @@ async def root():
         "endpoints": {
             "upload": "/api/v1/upload-cv",
             "history": "/api/v1/history",
+            "stats": "/api/v1/stats",
             "docs": "/docs"
         }
     }
 
 
+def admission_control(
+    request: Request,
+    x_api_key: Optional[str] = Header(default=None),
+    x_end_user: Optional[str] = Header(default=None)
+) -> Tuple[str, str]:
+    """
+    Dépendance FastAPI : identifie le client et applique la limitation de débit.
+    La classe du client vient de sa clé d'API (API_CLIENTS), jamais d'un en-tête libre.
+
+    Returns:
+        (clé du client, classe du client)
+    """
+    client_key, client_class = identify_client(
+        x_api_key, x_end_user, request.client.host if request.client else "inconnu"
+    )
+    
+    if RATE_LIMIT_ENABLED:
+        retry_after = rate_limiter.check(client_key)
+        if retry_after > 0:
+            REJECTIONS_TOTAL.inc(reason="rate_limited", client_class=client_class)
+            raise HTTPException(
+                status_code=429,
+                detail="Trop de requêtes, réessayez plus tard",
+                headers={"Retry-After": str(max(1, round(retry_after)))}
+            )
+    
+    return client_key, client_class
+
+
+async def run_write(db: Session, func, *args):
+    """
+    Exécute une écriture `func(db, *args)` hors de la boucle asyncio.
+    En mode SQLite, elle passe par la file d'écriture unique du processus.
+    """
+    write_queue = get_write_queue()
+    if write_queue:
+        return await write_queue.run_async(func, *args)
+    return await run_in_threadpool(func, db, *args)
+
+
 @app.post("/api/v1/upload-cv", response_model=CVResult)
-async def upload_cv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Endpoint principal pour uploader et analyser un CV"""
+async def upload_cv(
+    response: Response,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    client: Tuple[str, str] = Depends(admission_control),
+    x_profile_token: Optional[str] = Header(default=None),
+    fields: Optional[str] = None
+):
+    """
+    Endpoint principal pour uploader et analyser un CV.
+    `fields` (ex. "email,phone") limite l'analyse aux champs demandés : les
+    autres extracteurs ne sont pas exécutés, la lecture du document s'arrête
+    dès que ces champs sont trouvés, et les champs non demandés valent null.
+    Avec l'en-tête administrateur X-Profile-Token, la requête est profilée
+    (identifiant du profil dans l'en-tête de réponse X-Profile-Id).
+    """
+    client_key, client_class = client
+    started = time.perf_counter()
+    profile_on_demand = profiling.is_admin(x_profile_token)
+    profile = profiling.RequestProfile() if profile_on_demand or profiling.should_sample() else None
     
     # 1. Validation du fichier
     if not file.filename:
@@ -68,95 +180,196 @@ async def upload_cv(file: UploadFile = File(...), db: Session = Depends(get_db))
     
     file_extension = file.filename.split(".")[-1].lower()
     
-    if file_extension not in ["pdf", "docx"]:
+    if file_extension not in SUPPORTED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Format de fichier non supporté. Utilisez PDF ou DOCX. Reçu: {file_extension}"
         )
     
-    # 2. Sauvegarde temporaire du fichier
-    file_path = UPLOAD_DIR / file.filename
+    try:
+        requested_fields = resolve_fields(fields.split(",")) if fields else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    # 2. Copie du fichier en mémoire partagée (ou dans un fichier temporaire
+    # au nom unique), lue directement par le processus de parsing
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        upload, file_hash = await run_in_threadpool(UploadBuffer.from_file, file.file, UPLOAD_DIR, file_extension)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la sauvegarde du fichier: {str(e)}"
         )
     
-    # 3. Extraction du texte selon le format
     try:
-        if file_extension == "pdf":
-            raw_text = extract_text_from_pdf(str(file_path))
-            cleaned_text = clean_pdf_text(raw_text)
-        else:  # docx
-            raw_text = extract_text_from_docx(str(file_path))
-            cleaned_text = clean_docx_text(raw_text)
+        # Un fichier identique a déjà été analysé (par n'importe quel worker)
+        # avec la version actuelle de l'extracteur
+        cache = get_result_cache()
+        cache_key = f"{file_hash}:v{EXTRACTOR_VERSION}"
+        cv_data = None
+        # (une requête profilée à la demande ne passe pas par le cache)
+        if cache and not profile_on_demand:
+            cv_data = cache.get(cache_key)
+            if requested_fields:
+                # Un résultat complet répond aussi à une demande partielle
+                cv_data = select_fields(cv_data, requested_fields) if cv_data else None
+                cache_key = f"{cache_key}:{','.join(requested_fields)}"
+                cv_data = cv_data or cache.get(cache_key)
+        cleaned_text = None
+        partial_result = False
         
-        if not cleaned_text:
-            raise ValueError("Aucun texte extrait du fichier")
+        if cv_data is None:
+            # 3 et 4. Parsing et extraction, hors de la boucle asyncio, derrière
+            # la file d'attente équitable (slots de parsing limités)
+            poison = get_poison_cache()
+            try:
+                # Fichier qui a récemment dépassé le délai de parsing ou fait tomber
+                # le processus de parsing : refus immédiat
+                if poison and poison.get(file_hash):
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Ce fichier a récemment fait échouer l'analyse, réessayez plus tard"
+                    )
+                
+                async with parse_scheduler.slot(client_key, client_class):
+                    # Parsing dans un processus à mémoire bornée (ou dans un thread si désactivé)
+                    parser_pool = get_parser_pool()
+                    if parser_pool:
+                        parse = partial(parser_pool.extract_text, profile=profile, fields=requested_fields)
+                    else:
+                        parse = partial(extract_text_from_handle, fields=requested_fields)
+                        parse = partial(profile.call, parse) if profile else parse
+                    try:
+                        cleaned_text = await run_in_threadpool(parse, upload.handle, file_extension)
+                    except ParseTimeoutError as e:
+                        # Processus de parsing tué : résultat partiel des pages déjà extraites
+                        if poison:
+                            poison.set(file_hash, {"reason": "timeout"})
+                        if not e.partial_text:
+                            raise HTTPException(status_code=422, detail=str(e))
+                        cleaned_text = e.partial_text
+                        partial_result = True
+                    except ParserCrashError as e:
+                        # Processus arrêté pendant le parsing de ce document (un processus
+                        # mort au repos est remplacé par le pool sans erreur)
+                        if poison:
+                            poison.set(file_hash, {"reason": "crashed"})
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Erreur lors de l'extraction du texte: {str(e)}"
+                        )
+                    except Exception as e:
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Erreur lors de l'extraction du texte: {str(e)}"
+                        )
+                    
+                    try:
+                        extract = partial(extract_cv_info, fields=requested_fields)
+                        extract = partial(profile.call, extract) if profile else extract
+                        cv_data = await run_in_threadpool(extract, cleaned_text)
+                    except Exception as e:
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Erreur lors de l'extraction des informations: {str(e)}"
+                        )
+            except QueueFullError:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Serveur saturé, réessayez plus tard",
+                    headers={"Retry-After": "5"}
+                )
             
-    except Exception as e:
-        if file_path.exists():
-            os.remove(file_path)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de l'extraction du texte: {str(e)}"
-        )
+            # Un résultat partiel n'est pas mis en cache
+            if cache and not partial_result:
+                cache.set(cache_key, cv_data)
+    finally:
+        # 5. Nettoyage : libère la mémoire partagée ou supprime le fichier temporaire
+        upload.close()
     
-    # 4. Extraction des informations
+    # 6. Sauvegarde dans la base de données (fusion avec le candidat existant,
+    # rattachement à un CV quasi identique déjà stocké)
+    # Le texte n'est conservé que s'il couvre tout le document
+    if requested_fields:
+        cleaned_text = None
+    duplicate_of = None
     try:
-        cv_data = extract_cv_info(cleaned_text)
+        cv_id, duplicate_of = await run_write(db, record_upload, cv_data, file.filename, cleaned_text)
+        print(f" CV sauvegardé en base de données (ID: {cv_id})")
+        if duplicate_of is not None:
+            print(f" Version d'un CV déjà analysé (ID: {duplicate_of})")
     except Exception as e:
-        if file_path.exists():
-            os.remove(file_path)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de l'extraction des informations: {str(e)}"
-        )
+        db.rollback()
+        print(f" Erreur lors de la sauvegarde en BDD : {str(e)}")
     
-    # 5. Nettoyage : supprime le fichier temporaire
-    try:
-        if file_path.exists():
-            os.remove(file_path)
-    except Exception:
-        pass
+    # 7. Profil de la requête (à la demande, ou parmi les plus lentes)
+    if profile:
+        if profile_on_demand:
+            response.headers["X-Profile-Id"] = await run_in_threadpool(profiling.save_on_demand, profile)
+        else:
+            await run_in_threadpool(profiling.keep_if_slow, profile, time.perf_counter() - started)
     
-    # 6. Sauvegarde dans la base de données
-    try:
-        cv_entry = CVExtraction(
-            first_name=cv_data.get("first_name"),
-            last_name=cv_data.get("last_name"),
-            email=cv_data.get("email"),
-            phone=cv_data.get("phone"),
-            degree=cv_data.get("degree"),
-            filename=file.filename
-        )
-        db.add(cv_entry)
-        db.commit()
-        db.refresh(cv_entry)
-        print(f" CV sauvegardé en base de données (ID: {cv_entry.id})")
-    except Exception as e:
-        print(f" Erreur lors de la sauvegarde en BDD : {str(e)}")
+    # 8. Retourne le résultat
+    return CVResult(**cv_data, partial=partial_result, duplicate_of=duplicate_of)
+
+
+def build_history_response(db: Session, if_none_match: Optional[str], accept_encoding: Optional[str],
+                           limit: int, offset: int = 0, sort: Optional[str] = None, **filters) -> Response:
+    """
+    Réponse de l'historique : 304 si le client a déjà la version courante,
+    sinon la page demandée et le nombre total de lignes filtrées, en JSON
+    sérialisé depuis les colonnes (compressé si volumineux).
+    `filters` : filtres de history.fetch_history (min_level, degree_label, search...).
+    """
+    etag = history.history_etag(history.table_version(db))
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if history.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     
-    # 7. Retourne le résultat
-    return CVResult(**cv_data)
+    rows = history.fetch_history(db, limit, offset=offset, sort=sort, **filters)
+    total = history.count_history(db, **filters)
+    body = history.render_history(rows, total, offset)
+    if len(body) >= history.HISTORY_COMPRESS_MIN_BYTES:
+        encoding = history.choose_encoding(accept_encoding)
+        if encoding:
+            body = history.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/v1/history")
-async def get_history(limit: int = 50, db: Session = Depends(get_db)):
-    """Récupère l'historique des CV extraits"""
+async def get_history(
+    limit: int = Query(default=50, ge=1, le=history.HISTORY_MAX_LIMIT),
+    offset: int = Query(default=0, ge=0),
+    sort: str = history.DEFAULT_SORT,
+    q: Optional[str] = None,
+    min_level: Optional[int] = None,
+    degree_label: Optional[str] = None,
+    group_versions: bool = False,
+    versions_of: Optional[int] = None,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None)
+):
+    """
+    Récupère une page de l'historique des CV extraits.
+    Filtres optionnels (colonnes indexées) : niveau minimal (Bac+N) et type de diplôme ;
+    `q` recherche dans le nom, le prénom, l'email et le nom de fichier.
+    Tri : nom de colonne, préfixé de "-" pour l'ordre décroissant (`-last_seen_at` par défaut).
+    Versions d'un même CV (quasi-doublons) : `group_versions=true` ne garde que les CV
+    d'origine avec leur nombre de versions, `versions_of=<id>` liste un CV et ses versions.
+    Un client qui renvoie l'ETag reçu (If-None-Match) obtient 304 si rien n'a changé.
+    """
     try:
-        cv_list = db.query(CVExtraction).order_by(
-            CVExtraction.created_at.desc()
-        ).limit(limit).all()
-        
-        return {
-            "count": len(cv_list),
-            "data": [cv.to_dict() for cv in cv_list]
-        }
+        history.parse_sort(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await run_in_threadpool(partial(
+            build_history_response, db, if_none_match, accept_encoding, limit, offset, sort,
+            min_level=min_level, degree_label=degree_label, search=q,
+            group_versions=group_versions, versions_of=versions_of
+        ))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -164,18 +377,27 @@ async def get_history(limit: int = 50, db: Session = Depends(get_db)):
         )
 
 
+@app.post("/api/v1/history/delete")
+async def delete_cvs(ids: List[int] = Body(..., embed=True, max_length=history.HISTORY_MAX_LIMIT),
+                     db: Session = Depends(get_db)):
+    """Supprime plusieurs CV de l'historique (sélection du tableau du frontend)"""
+    try:
+        deleted = await run_write(db, delete_extractions, ids)
+        return {"message": f"{deleted} CV supprimé(s)", "deleted": deleted}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la suppression: {str(e)}"
+        )
+
+
 @app.delete("/api/v1/history/{cv_id}")
 async def delete_cv(cv_id: int, db: Session = Depends(get_db)):
     """Supprime un CV de l'historique"""
     try:
-        cv_entry = db.query(CVExtraction).filter(CVExtraction.id == cv_id).first()
-        
-        if not cv_entry:
+        if not await run_write(db, delete_extraction, cv_id):
             raise HTTPException(status_code=404, detail="CV non trouvé")
         
-        db.delete(cv_entry)
-        db.commit()
-        
         return {"message": f"CV {cv_id} supprimé avec succès"}
     except HTTPException:
         raise
@@ -186,6 +408,70 @@ async def delete_cv(cv_id: int, db: Session = Depends(get_db)):
         )
 
 
+def build_stats_response(db: Session, if_none_match: Optional[str], days: int) -> Response:
+    """Réponse des statistiques : 304 si le client a déjà la version courante"""
+    today = datetime.utcnow().date()
+    etag = stats.stats_etag(history.table_version(db), today)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if history.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    body = history.dumps(stats.fetch_stats(db, days, today))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/v1/stats")
+async def get_stats(
+    days: int = Query(default=30, ge=1, le=stats.STATS_MAX_DAYS),
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Statistiques d'extraction : nombre de CV, taux de réussite par champ
+    ("Non trouvé"), répartition des diplômes, et uploads par jour sur les
+    `days` derniers jours. Lues dans des tables de compteurs (temps constant).
+    """
+    try:
+        return await run_in_threadpool(build_stats_response, db, if_none_match, days)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la récupération des statistiques: {str(e)}"
+        )
+
+
+def require_admin(x_profile_token: Optional[str] = Header(default=None)) -> None:
+    """Dépendance FastAPI : réservé aux détenteurs du jeton de profilage"""
+    if not profiling.is_admin(x_profile_token):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
+
+
+@app.get("/api/v1/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Liste les profils enregistrés (à la demande et requêtes les plus lentes)"""
+    profiles = profiling.list_profiles()
+    return {"count": len(profiles), "data": profiles}
+
+
+@app.get("/api/v1/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, raw: bool = False):
+    """
+    Résumé texte d'un profil (fonctions triées par temps cumulé),
+    ou fichier pstats brut avec raw=true.
+    """
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    if raw:
+        return FileResponse(path, filename=path.name, media_type="application/octet-stream")
+    return PlainTextResponse(await run_in_threadpool(profiling.render_summary, path))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métriques au format Prometheus (file d'attente, rejets...)"""
+    return render_metrics()
+
+
 @app.get("/health")
 async def health_check():
     """Endpoint de santé"""
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import BigInteger, Column, Date, Integer, SmallInteger, String, DateTime, LargeBinary, Index, text
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -12,6 +13,8 @@ from database import Base
 class CVExtraction(Base):
     """
     Modèle de table pour stocker les extractions de CV.
+    Une ligne par candidat : les uploads successifs du même candidat
+    (même email, ou même téléphone à défaut) sont fusionnés.
     """
     __tablename__ = "cv_extractions"
     
@@ -21,9 +24,46 @@ class CVExtraction(Base):
     email = Column(String(255))
     phone = Column(String(50))
     degree = Column(String(500))
+    # Diplôme structuré (taxonomie) : filtres "Bac+5 ou plus" par index
+    degree_level = Column(Integer, index=True)
+    degree_label = Column(String(50), index=True)
+    degree_field = Column(String(200))
     filename = Column(String(255))
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Dédoublonnage des candidats
+    email_normalized = Column(String(255))
+    phone_e164 = Column(String(20))
+    candidate_key = Column(String(255))
+    upload_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Texte normalisé (compressé zlib) du dernier upload : permet de relancer
+    # l'extraction sans le fichier d'origine. Chargé seulement à la demande.
+    normalized_text = deferred(Column(LargeBinary))
+    extractor_version = Column(Integer, index=True)
+    
+    # Quasi-doublons (services/minhash.py) : signature MinHash du texte, et
+    # CV d'origine dont cette ligne est une version (NULL : CV d'origine)
+    minhash = deferred(Column(LargeBinary))
+    duplicate_of = Column(Integer, index=True)
+    
+    __table_args__ = (
+        # Cible du ON CONFLICT de l'upsert (les NULL ne sont jamais en conflit)
+        Index("ux_cv_extractions_candidate_key", "candidate_key", unique=True),
+        # Index partiels : seules les lignes avec une coordonnée sont indexées
+        Index(
+            "ix_cv_extractions_email_normalized", "email_normalized",
+            postgresql_where=text("email_normalized IS NOT NULL"),
+            sqlite_where=text("email_normalized IS NOT NULL")
+        ),
+        Index(
+            "ix_cv_extractions_phone_e164", "phone_e164",
+            postgresql_where=text("phone_e164 IS NOT NULL"),
+            sqlite_where=text("phone_e164 IS NOT NULL")
+        ),
+    )
+    
     def __repr__(self):
         return f"<CVExtraction(id={self.id}, name={self.first_name} {self.last_name})>"
     
@@ -36,6 +76,70 @@ class CVExtraction(Base):
             "email": self.email,
             "phone": self.phone,
             "degree": self.degree,
+            "degree_level": self.degree_level,
+            "degree_label": self.degree_label,
+            "degree_field": self.degree_field,
             "filename": self.filename,
-            "created_at": self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "upload_count": self.upload_count,
+            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
+            "extractor_version": self.extractor_version,
+            "duplicate_of": self.duplicate_of
+        }
+
+
+
+class MinHashBand(Base):
+    """
+    Index LSH des signatures MinHash : une ligne par bande de la signature
+    d'un CV. Les CV qui partagent un bucket sont candidats quasi-doublons.
+    """
+    __tablename__ = "cv_minhash_bands"
+    
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    cv_id = Column(Integer, primary_key=True)
+    
+    __table_args__ = (
+        # Suppression des bandes d'un CV
+        Index("ix_cv_minhash_bands_cv_id", "cv_id"),
+    )
+
+
+class StatsDaily(Base):
+    """
+    Compteurs d'uploads par jour, incrémentés dans la transaction de chaque
+    upload : metric "uploads" (value vide), "extracted" (value : champ
+    demandé), "missing" (value : champ "Non trouvé") et "degree" (value :
+    type de diplôme).
+    """
+    __tablename__ = "cv_stats_daily"
+    
+    day = Column(Date, primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    value = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class StatsTotal(Base):
+    """
+    Compteurs de l'état courant de cv_extractions : metric "cvs",
+    "extracted", "missing" et "degree", mis à jour par différence à chaque
+    écriture.
+    """
+    __tablename__ = "cv_stats_totals"
+    
+    metric = Column(String(20), primary_key=True)
+    value = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TableVersion(Base):
+    """
+    Compteur de modifications d'une table, incrémenté dans la transaction
+    de chaque écriture : sert d'ETag à l'historique sans le relire.
+    """
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -12,6 +12,12 @@ class CVResult(BaseModel):
         email: Adresse email extraite
         phone: Numéro de téléphone extrait
         degree: Diplôme principal extrait
+        degree_level: Niveau du diplôme (Bac+N)
+        degree_label: Type de diplôme (Licence, Master, Ingénieur...)
+        degree_field: Domaine du diplôme
+        partial: Vrai si le parsing a été interrompu (délai dépassé)
+        duplicate_of: CV déjà analysé dont celui-ci est une version (quasi-doublon)
+        locale: Langue détectée du CV (fr, en, de, es)
     """
     first_name: Optional[str] = Field(
         default="Non trouvé",
@@ -33,6 +39,30 @@ class CVResult(BaseModel):
         default="Non trouvé",
         description="Diplôme principal du candidat"
     )
+    degree_level: Optional[int] = Field(
+        default=None,
+        description="Niveau du diplôme principal (Bac+N, 0 pour le Bac)"
+    )
+    degree_label: Optional[str] = Field(
+        default=None,
+        description="Type de diplôme (Licence, Master, Ingénieur...)"
+    )
+    degree_field: Optional[str] = Field(
+        default=None,
+        description="Domaine du diplôme principal"
+    )
+    partial: bool = Field(
+        default=False,
+        description="Résultat partiel : seules les premières pages ont été analysées"
+    )
+    duplicate_of: Optional[int] = Field(
+        default=None,
+        description="Identifiant du CV déjà analysé dont celui-ci est une version"
+    )
+    locale: Optional[str] = Field(
+        default=None,
+        description="Langue détectée du CV, dont les patterns d'extraction ont été utilisés"
+    )
 
     class Config:
         """Configuration du modèle Pydantic"""
@@ -42,6 +72,9 @@ class CVResult(BaseModel):
                 "last_name": "Bernard",
                 "email": "alain.bernard@gmail.com",
                 "phone": "+33612345678",
-                "degree": "Master Informatique"
+                "degree": "Master Informatique",
+                "degree_level": 5,
+                "degree_label": "Master",
+                "degree_field": "Informatique"
             }
         }
\ No newline at end of file
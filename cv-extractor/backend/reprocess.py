@@ -0,0 +1,226 @@
+"""
+Ré-extraction des CV déjà en base après une évolution de l'extracteur.
+
+Seul extract_cv_info est relancé, sur le texte normalisé stocké avec
+chaque ligne (aucun fichier n'est reparsé). Les lignes dont
+extractor_version est antérieure à EXTRACTOR_VERSION sont traitées par
+lots, sur tous les cœurs. Chaque lot est commité avec la nouvelle version :
+la colonne sert de point de reprise, une exécution interrompue repart
+des lignes restantes.
+
+Un upload du même candidat peut être enregistré pendant la ré-extraction
+d'un lot : avant l'écriture, les lignes du lot sont relues sous verrou
+(FOR UPDATE sous PostgreSQL, verrou d'écriture de la base sous SQLite) et
+celles qui ont changé depuis leur lecture (upload_count ou
+extractor_version) sont laissées telles quelles, pour ne pas écraser le
+nouvel upload avec des valeurs périmées.
+
+`--signatures` calcule aussi les signatures MinHash (quasi-doublons) des
+lignes enregistrées avant leur apparition, et les ajoute à l'index LSH.
+Les lignes existantes ne sont pas rattachées entre elles : seuls les
+uploads suivants sont comparés à elles.
+
+Les compteurs de statistiques suivent les valeurs ré-extraites ;
+`--stats` les recalcule entièrement depuis cv_extractions (après une
+écriture directe en base, ou périodiquement par sécurité).
+
+Usage :
+    cd backend
+    python reprocess.py [--workers 8] [--batch-size 2000] [--signatures] [--stats]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Configure le PYTHONPATH AVANT tous les autres imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from init_db import init_database
+from models.cv_database import CVExtraction
+from services import minhash
+from services.extractor import EXTRACTOR_VERSION, extract_cv_info
+from services.repository import (
+    EXTRACTED_FIELDS, DEGREE_FIELDS, bump_version, decompress_text, index_signatures, rebuild_stats,
+    reextracted_values, update_totals
+)
+
+# Lignes à ré-extraire : version obsolète et texte disponible
+STALE = (
+    or_(CVExtraction.extractor_version.is_(None), CVExtraction.extractor_version < EXTRACTOR_VERSION),
+    CVExtraction.normalized_text.isnot(None),
+)
+# Colonnes relues sous verrou avant l'écriture (valeurs actuelles conservées si besoin)
+LOCKED_COLUMNS = [CVExtraction.id, CVExtraction.upload_count, CVExtraction.extractor_version] + [
+    CVExtraction.__table__.c[field] for field in EXTRACTED_FIELDS + DEGREE_FIELDS
+]
+# Colonnes lues pour chaque ligne
+COLUMNS = LOCKED_COLUMNS + [CVExtraction.normalized_text]
+
+
+def _init_worker() -> None:
+    """Sortie des extracteurs muette"""
+    sys.stdout = open(os.devnull, "w")
+
+
+def _reextract(item: Tuple[int, bytes]) -> Tuple[int, Optional[Dict], Optional[str]]:
+    """Ré-extrait une ligne dans un worker : (id, résultat ou None, erreur ou None)"""
+    row_id, compressed = item
+    try:
+        return row_id, extract_cv_info(decompress_text(compressed)), None
+    except Exception as e:
+        return row_id, None, str(e)
+
+
+def _unchanged_rows(db: Session, read: Dict[int, Dict]) -> Dict[int, Dict]:
+    """
+    Relit sous verrou les lignes lues au début du lot et ne garde que celles
+    qu'aucune écriture n'a modifiées depuis (jusqu'au commit du lot).
+    """
+    # Première écriture de la transaction : sous SQLite, elle prend le verrou
+    # d'écriture de la base avant la relecture
+    bump_version(db)
+    current = db.execute(
+        select(*LOCKED_COLUMNS).where(CVExtraction.id.in_(list(read))).with_for_update()
+    ).mappings().all()
+    return {
+        row["id"]: row for row in current
+        if (row["upload_count"], row["extractor_version"])
+        == (read[row["id"]]["upload_count"], read[row["id"]]["extractor_version"])
+    }
+
+
+def reprocess(workers: int, batch_size: int) -> Tuple[int, int]:
+    """
+    Ré-extrait toutes les lignes obsolètes.
+
+    Returns:
+        (lignes mises à jour, lignes en erreur)
+    """
+    db = SessionLocal()
+    updated = errors = skipped = 0
+    started = time.perf_counter()
+    try:
+        remaining = db.scalar(select(func.count()).select_from(CVExtraction).where(*STALE))
+        print(f" {remaining} lignes à ré-extraire (version {EXTRACTOR_VERSION})")
+
+        last_id = 0
+        with multiprocessing.Pool(workers, initializer=_init_worker, maxtasksperchild=1000) as pool:
+            while True:
+                # Pagination par id : les lignes en erreur ne sont pas relues dans cette exécution
+                rows = db.execute(
+                    select(*COLUMNS).where(*STALE, CVExtraction.id > last_id)
+                    .order_by(CVExtraction.id).limit(batch_size)
+                ).mappings().all()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+
+                by_id = {row["id"]: row for row in rows}
+                results = {}
+                for row_id, cv_data, error in pool.imap_unordered(
+                    _reextract, [(row["id"], row["normalized_text"]) for row in rows], chunksize=32
+                ):
+                    if error is not None:
+                        errors += 1
+                        print(f" Erreur sur la ligne {row_id} : {error}")
+                        continue
+                    results[row_id] = cv_data
+
+                values = []
+                if results:
+                    current = _unchanged_rows(db, {row_id: by_id[row_id] for row_id in results})
+                    skipped += len(results) - len(current)
+                    values = [reextracted_values(current[row_id], results[row_id]) for row_id in sorted(current)]
+                if values:
+                    db.execute(update(CVExtraction), values)
+                    update_totals(db, [current[value["id"]] for value in values], values)
+                db.commit()
+                updated += len(values)
+
+                elapsed = max(time.perf_counter() - started, 1e-9)
+                print(
+                    f" {updated}/{remaining} lignes ({errors} erreurs, {skipped} modifiées entre-temps)"
+                    f" | {updated / elapsed:.0f} lignes/s", flush=True
+                )
+    finally:
+        db.close()
+    return updated, errors
+
+
+def index_missing_signatures(batch_size: int) -> int:
+    """
+    Calcule et indexe les signatures MinHash manquantes.
+
+    Returns:
+        Le nombre de lignes indexées
+    """
+    db = SessionLocal()
+    indexed = 0
+    try:
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(CVExtraction.id, CVExtraction.normalized_text)
+                .where(CVExtraction.minhash.is_(None), CVExtraction.normalized_text.isnot(None),
+                       CVExtraction.id > last_id)
+                .order_by(CVExtraction.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            values = []
+            for row_id, compressed in rows:
+                signature = minhash.compute_signature(decompress_text(compressed))
+                if signature:
+                    values.append({"id": row_id, "minhash": minhash.pack(signature)})
+            if values:
+                db.execute(update(CVExtraction), values)
+                index_signatures(db, [value["id"] for value in values])
+            db.commit()
+            indexed += len(values)
+            print(f" {indexed} signatures indexées", flush=True)
+    finally:
+        db.close()
+    return indexed
+
+
+def rebuild_all_stats() -> None:
+    """Recalcule les compteurs de statistiques depuis cv_extractions"""
+    db = SessionLocal()
+    try:
+        rebuild_stats(db)
+        db.commit()
+        print(" Statistiques recalculées")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ré-extraction des CV stockés avec une ancienne version de l'extracteur")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Nombre de lignes par lot (un commit par lot)")
+    parser.add_argument("--signatures", action="store_true",
+                        help="Indexe aussi les signatures MinHash manquantes (quasi-doublons)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Recalcule aussi les compteurs de statistiques")
+    args = parser.parse_args()
+
+    init_database()
+    reprocess(workers=args.workers, batch_size=args.batch_size)
+    if args.signatures:
+        index_missing_signatures(batch_size=args.batch_size)
+    if args.stats:
+        rebuild_all_stats()
+
+
+if __name__ == "__main__":
+    main()
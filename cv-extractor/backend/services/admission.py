@@ -0,0 +1,349 @@
+"""
+Contrôle d'admission pour l'endpoint d'upload.
+
+- Limitation de débit par client avec un token bucket : un script qui
+  inonde l'API reçoit des 429 au lieu d'affamer les autres. Les buckets
+  sont stockés dans un fichier SQLite partagé par tous les workers du
+  serveur (RATE_LIMIT_PATH) : la limite vaut pour le serveur entier, pas
+  pour chaque worker.
+- File d'attente équitable pondérée (weighted fair queuing) devant l'étape
+  de parsing : les uploads interactifs (Streamlit) passent devant
+  l'ingestion en masse, et au sein d'une même classe chaque client a sa
+  part des slots de parsing. La file est propre à chaque worker, comme
+  les slots qu'elle répartit (PARSE_CONCURRENCY processus de parsing par
+  worker) : l'équité vaut entre les demandes d'un même worker.
+
+Un client est identifié par sa clé d'API (X-API-Key) si elle est déclarée
+dans API_CLIENTS, qui fixe aussi sa classe ; sinon par son IP, en classe
+"bulk". Une clé inconnue est ignorée : changer de clé ne donne ni un
+nouveau bucket ni une autre classe. Un client déclaré "interactive" (le
+frontend) peut transmettre l'identifiant de son utilisateur final
+(X-End-User) : chaque utilisateur a alors son propre bucket, au lieu de
+partager celui de l'IP du frontend.
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from services.metrics import Counter, Histogram
+
+# Limitation de débit par client
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "2"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+# Buckets partagés entre workers (vide : un bucket par worker, en mémoire)
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", "cache/rate_limit.sqlite3")
+
+def default_parse_concurrency(cpu_count: int, web_workers: int) -> int:
+    """
+    Parsings simultanés par worker web : les CPU répartis entre les workers,
+    pour que le serveur entier ait au plus un processus de parsing par CPU.
+    """
+    return max(1, cpu_count // max(1, web_workers))
+
+
+# Nombre de workers web (fixé par gunicorn_conf.py, 1 sans gunicorn)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# File d'attente devant le parsing
+PARSE_CONCURRENCY = int(os.getenv(
+    "PARSE_CONCURRENCY", str(default_parse_concurrency(os.cpu_count() or 2, WEB_CONCURRENCY))
+))
+PARSE_QUEUE_MAX = int(os.getenv("PARSE_QUEUE_MAX", "100"))
+
+# Poids des classes de clients
+CLIENT_CLASS_WEIGHTS = {
+    "interactive": float(os.getenv("WEIGHT_INTERACTIVE", "8")),
+    "bulk": float(os.getenv("WEIGHT_BULK", "1")),
+}
+DEFAULT_CLIENT_CLASS = "bulk"
+INTERACTIVE_CLIENT_CLASS = "interactive"
+
+# Métriques exportées sur /metrics
+QUEUE_WAIT_SECONDS = Histogram(
+    "cv_parse_queue_wait_seconds",
+    "Temps d'attente dans la file avant le parsing",
+    labels=("client_class",)
+)
+REJECTIONS_TOTAL = Counter(
+    "cv_admission_rejections_total",
+    "Uploads refusés par le contrôle d'admission",
+    labels=("reason", "client_class")
+)
+
+# Longueur maximale de l'identifiant d'utilisateur final
+_END_USER_MAX_CHARS = 64
+# Nettoyage des buckets pleins toutes les N requêtes
+_PRUNE_EVERY = 1000
+
+
+def parse_api_clients(spec: str) -> Dict[str, str]:
+    """
+    Table des clés d'API déclarées, au format "clé:classe,clé:classe".
+
+    Raises:
+        ValueError: Si une classe est inconnue
+    """
+    clients = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        key, _, client_class = entry.strip().rpartition(":")
+        if not key or client_class not in CLIENT_CLASS_WEIGHTS:
+            raise ValueError(
+                f"API_CLIENTS : entrée invalide {entry.strip()!r} (classes : {', '.join(CLIENT_CLASS_WEIGHTS)})"
+            )
+        clients[key] = client_class
+    return clients
+
+
+# Clés d'API déclarées côté serveur et leur classe
+API_CLIENTS = parse_api_clients(os.getenv("API_CLIENTS", ""))
+
+
+def identify_client(api_key: Optional[str], end_user: Optional[str], ip: str,
+                    clients: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+    """
+    Identité et classe d'un client, d'après la table des clés d'API (jamais
+    d'après un en-tête libre).
+
+    Returns:
+        (clé du bucket, classe du client)
+    """
+    clients = API_CLIENTS if clients is None else clients
+    client_class = clients.get(api_key) if api_key else None
+    if client_class is None:
+        return f"ip:{ip}", DEFAULT_CLIENT_CLASS
+    # La clé elle-même n'est pas conservée dans les buckets
+    client_key = f"key:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+    if client_class == INTERACTIVE_CLIENT_CLASS and end_user:
+        client_key += f":user:{end_user[:_END_USER_MAX_CHARS]}"
+    return client_key, client_class
+
+class TokenBucket:
+    """
+    Token bucket classique : `rate` jetons par seconde, au plus `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """
+        Consomme un jeton si possible.
+
+        Returns:
+            0 si le jeton est accordé, sinon le délai (s) avant le prochain jeton
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Un token bucket par client, en mémoire du worker (RATE_LIMIT_PATH vide) :
+    la limite effective est alors multipliée par le nombre de workers.
+    Les clients inactifs sont oubliés (LRU) pour borner la mémoire.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client_key: str, now: Optional[float] = None) -> float:
+        """
+        Returns:
+            0 si la requête est admise, sinon le délai Retry-After en secondes
+        """
+        bucket = self._buckets.get(client_key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets[client_key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_key)
+        return bucket.try_acquire(now)
+
+
+class SharedRateLimiter:
+    """
+    Un token bucket par client, stocké dans un fichier SQLite (mode WAL)
+    partagé par tous les processus du serveur : la lecture et la mise à
+    jour d'un bucket se font dans une transaction d'écriture, les workers
+    consomment donc les mêmes jetons.
+
+    Un bucket plein équivaut à un bucket absent : ceux des clients
+    inactifs sont supprimés périodiquement.
+    """
+
+    def __init__(self, path: str, rate: float, burst: float):
+        self.path = Path(path)
+        self.rate = rate
+        self.burst = burst
+        self._local = threading.local()
+        self._checks = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (recréée après un fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " key TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def check(self, client_key: str, now: Optional[float] = None) -> float:
+        """
+        Returns:
+            0 si la requête est admise, sinon le délai Retry-After en secondes
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (client_key,)).fetchone()
+            bucket = TokenBucket(self.rate, self.burst, now)
+            if row is not None:
+                bucket.tokens, bucket.updated = row
+            retry_after = bucket.try_acquire(now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (client_key, bucket.tokens, bucket.updated)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._checks += 1
+        if self._checks % _PRUNE_EVERY == 0:
+            self.prune(now)
+        return retry_after
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Supprime les buckets redevenus pleins"""
+        now = time.time() if now is None else now
+        self._connection().execute(
+            "DELETE FROM buckets WHERE updated + (? - tokens) / ? <= ?", (self.burst, self.rate, now)
+        )
+
+
+class QueueFullError(Exception):
+    """La file d'attente du parsing est pleine"""
+
+
+class FairScheduler:
+    """
+    File d'attente équitable pondérée devant une ressource limitée
+    (`max_concurrent` parsings simultanés).
+
+    Chaque flux (un client) reçoit une étiquette de fin virtuelle
+    `max(temps_virtuel, dernière_fin_du_flux) + 1 / poids` ; le slot libéré
+    va à la demande dont l'étiquette est la plus petite. Un flux de poids 8
+    obtient donc 8 fois plus de slots qu'un flux de poids 1 quand les deux
+    sont en attente, sans que le flux léger ne soit jamais affamé.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int = 100):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.active = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._heap if not future.done())
+
+    def _dispatch(self) -> None:
+        """Attribue les slots libres aux demandes en tête de file"""
+        while self.active < self.max_concurrent and self._heap:
+            finish, _, future = heapq.heappop(self._heap)
+            if future.done():  # demande annulée entre-temps
+                continue
+            self._virtual_time = finish
+            self.active += 1
+            future.set_result(None)
+        if not self._heap:
+            # File vide : l'historique des flux ne sert plus à rien
+            self._last_finish.clear()
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    async def acquire(self, flow: str, weight: float) -> None:
+        """Attend un slot de parsing pour le flux donné"""
+        if self.active < self.max_concurrent and not self._heap:
+            self.active += 1
+            return
+        if self.queued >= self.max_queued:
+            raise QueueFullError()
+
+        start = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+        finish = start + 1.0 / weight
+        self._last_finish[flow] = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (finish, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Le slot a pu être attribué juste avant l'annulation
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, flow: str, client_class: str):
+        """
+        Context manager : attend un slot, l'occupe, puis le libère.
+        Le temps d'attente est exporté dans les métriques.
+        """
+        weight = CLIENT_CLASS_WEIGHTS.get(client_class, CLIENT_CLASS_WEIGHTS[DEFAULT_CLIENT_CLASS])
+        started = time.perf_counter()
+        try:
+            await self.acquire(f"{client_class}:{flow}", weight)
+        except QueueFullError:
+            REJECTIONS_TOTAL.inc(reason="queue_full", client_class=client_class)
+            raise
+        QUEUE_WAIT_SECONDS.observe(time.perf_counter() - started, client_class=client_class)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+rate_limiter = (
+    SharedRateLimiter(RATE_LIMIT_PATH, RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST) if RATE_LIMIT_PATH
+    else RateLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+)
+parse_scheduler = FairScheduler(PARSE_CONCURRENCY, PARSE_QUEUE_MAX)
@@ -0,0 +1,157 @@
+"""
+Détection structurée des diplômes à partir d'une taxonomie.
+
+Un automate d'Aho-Corasick, construit une seule fois depuis
+`data/degree_taxonomy.json`, trouve toutes les mentions de diplômes
+en une passe. Chaque mention est rattachée à un niveau canonique
+(Bac+N), un libellé (Licence, Master, Ingénieur...) et un domaine
+(le texte qui suit : "Informatique et réseaux").
+
+Une entrée peut être réservée à certaines locales ("locales": ["fr"]) :
+chaque locale a son automate, construit à sa première utilisation.
+"""
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from services.keyword_automaton import KeywordAutomaton
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEGREE_TAXONOMY_PATH = os.getenv("DEGREE_TAXONOMY_PATH", str(BACKEND_DIR / "data" / "degree_taxonomy.json"))
+
+# Le domaine s'arrête au premier délimiteur, à la mention suivante ou après N caractères
+FIELD_MAX_LENGTH = 80
+FIELD_DELIMITERS = "\n.;,(|•"
+# Mots de liaison ignorés entre le diplôme et son domaine
+FIELD_CONNECTORS = ("en ", "de ", "d'", "d’", "du ", "des ", "in ", "of ", ": ", "- ", "– ")
+# Longueur maximale d'une précision entre parenthèses, ex. "(Bac+3)"
+PARENTHESIS_MAX_LENGTH = 15
+DISPLAY_MAX_LENGTH = 120
+
+
+class DegreeMention(NamedTuple):
+    label: str
+    level: Optional[int]
+    generic: bool
+    start: int
+    end: int
+    field: Optional[str]
+    text: str
+
+
+@lru_cache(maxsize=None)
+def load_automaton(path: str = DEGREE_TAXONOMY_PATH, locale: Optional[str] = None) -> KeywordAutomaton:
+    """
+    Construit (une fois par processus et par locale) l'automate de la taxonomie.
+    Sans locale, toutes les entrées sont retenues.
+    """
+    with open(path, encoding="utf-8") as source:
+        taxonomy = json.load(source)
+
+    keywords = {}
+    for entry in taxonomy["degrees"]:
+        if locale is not None and locale not in entry.get("locales", (locale,)):
+            continue
+        for keyword in entry["keywords"]:
+            keywords[keyword] = {
+                "label": entry["label"],
+                "level": entry.get("level"),
+                "generic": entry.get("generic", False),
+                "case_sensitive": entry.get("case_sensitive", False),
+            }
+    return KeywordAutomaton(keywords)
+
+
+def _strip_connectors(field: str) -> str:
+    changed = True
+    while changed:
+        changed = False
+        for connector in FIELD_CONNECTORS:
+            if field.lower().startswith(connector):
+                field = field[len(connector):].lstrip()
+                changed = True
+    return field
+
+
+def find_degrees(text: str, locale: Optional[str] = None) -> List[DegreeMention]:
+    """
+    Toutes les mentions de diplômes du texte, dans l'ordre du texte
+    (entrées de la taxonomie valables pour la locale).
+    """
+    matches = [
+        match for match in load_automaton(locale=locale).find_all(text)
+        if not match.value["case_sensitive"] or text[match.start:match.end] == match.keyword
+    ]
+
+    mentions = []
+    for i, match in enumerate(matches):
+        limit = min(match.end + FIELD_MAX_LENGTH, len(text))
+        if i + 1 < len(matches):
+            limit = min(limit, matches[i + 1].start)
+
+        # Domaine : jusqu'au premier délimiteur (parcours borné)
+        field_end = match.end
+        while field_end < limit and text[field_end] not in FIELD_DELIMITERS:
+            field_end += 1
+        if field_end == match.end + FIELD_MAX_LENGTH and " " in text[match.end:field_end]:
+            # Coupé par la limite de longueur : on s'arrête au dernier mot complet
+            field_end = text.rindex(" ", match.end, field_end)
+        field = _strip_connectors(text[match.end:field_end].strip()).rstrip(",;:- ") or None
+
+        # Affichage : mention + domaine (+ précision entre parenthèses)
+        display_end = field_end
+        if display_end < len(text) and text[display_end] == "(":
+            closing = text.find(")", display_end, display_end + PARENTHESIS_MAX_LENGTH)
+            if closing != -1:
+                display_end = closing + 1
+        display = text[match.start:display_end].strip().rstrip(",;: ")
+        if len(display) > DISPLAY_MAX_LENGTH:
+            display = display[:DISPLAY_MAX_LENGTH].rsplit(" ", 1)[0]
+
+        mentions.append(DegreeMention(
+            label=match.value["label"],
+            level=match.value["level"],
+            generic=match.value["generic"],
+            start=match.start,
+            end=match.end,
+            field=field,
+            text=display,
+        ))
+    return mentions
+
+
+def main_degree(mentions: List[DegreeMention]) -> Optional[DegreeMention]:
+    """
+    Le diplôme principal : le plus haut niveau, un libellé précis
+    ("Master") plutôt qu'un niveau générique ("Bac+5"), puis le premier cité.
+    """
+    if not mentions:
+        return None
+    return max(mentions, key=lambda mention: (
+        mention.level if mention.level is not None else -1,
+        not mention.generic,
+    ))
+
+
+def classify_degree(text: str, locale: Optional[str] = None) -> Optional[Dict]:
+    """
+    Diplôme principal du texte sous forme structurée.
+
+    Args:
+        text: Le texte à analyser
+        locale: Locale du CV (toutes les entrées de la taxonomie si None)
+
+    Returns:
+        {"degree", "degree_level", "degree_label", "degree_field"} ou None
+    """
+    mention = main_degree(find_degrees(text, locale))
+    if mention is None:
+        return None
+    return {
+        "degree": mention.text,
+        "degree_level": mention.level,
+        "degree_label": mention.label,
+        "degree_field": mention.field,
+    }
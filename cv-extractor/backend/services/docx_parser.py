@@ -1,13 +1,20 @@
-from docx import Document
 from typing import Optional
 
 
+def preload() -> None:
+    """
+    Importe python-docx à l'avance.
+    Appelé par le warm-up pour ne pas payer ce coût au premier upload.
+    """
+    import docx  # noqa: F401
+
+
 def extract_text_from_docx(file_path: str) -> Optional[str]:
     """
     Extrait le texte brut d'un fichier DOCX (Word).
     
     Args:
-        file_path: Chemin vers le fichier DOCX
+        file_path: Chemin vers le fichier DOCX, ou flux binaire ouvert
         
     Returns:
         Le texte extrait ou None si erreur
@@ -15,6 +22,9 @@ def extract_text_from_docx(file_path: str) -> Optional[str]:
     Raises:
         Exception: Si le fichier ne peut pas être lu
     """
+    # Import paresseux : python-docx charge lxml au démarrage
+    from docx import Document
+
     try:
         # Ouvre le document Word
         doc = Document(file_path)
@@ -40,6 +50,9 @@ def extract_text_from_docx(file_path: str) -> Optional[str]:
             
         return text
         
+    except MemoryError:
+        # Plafond mémoire du processus de parsing atteint : propagé tel quel
+        raise
     except Exception as e:
         raise Exception(f"Erreur lors de l'extraction du DOCX : {str(e)}")
 
@@ -1,5 +1,32 @@
-import re
-from typing import Optional, Dict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from services import regex_engine
+from services.gazetteer import get_lexicon, normalize_token
+from services.locales import LocalePack, detect_locale, get_pack
+from services.scanners import find_email, remove_letter_spacing
+from services.degree_taxonomy import classify_degree
+from services.sections import CONTACT, EDUCATION, EXPERIENCE, HEADER, SectionIndex, segment_sections
+
+# Valeur retournée pour un champ non détecté
+NOT_FOUND = "Non trouvé"
+
+# Version des règles d'extraction : à incrémenter à chaque modification de
+# ce module pour que `reprocess.py` mette à jour les lignes existantes
+EXTRACTOR_VERSION = 3
+
+# Les patterns propres à une langue (téléphone, nom, diplômes) sont dans
+# les packs de services/locales.py : chaque CV n'exécute que ceux de sa
+# locale, compilés à la première utilisation avec google-re2 si
+# REGEX_ENGINE=re2 (voir services/regex_engine.py).
+# L'email et les lettres espacées sont cherchés par des scanners linéaires
+# (services/scanners.py) : leurs patterns coûtent un temps quadratique
+# avec le module re sur un texte hostile.
+
+# Le nom est cherché dans le début du texte uniquement
+NAME_HEAD_CHARS = 500
+
+# Mots capitalisés du lexique (toutes langues latines)
+NAME_TOKEN_PATTERN = regex_engine.compile(r"[A-ZÀ-ÖØ-Þ][A-ZÀ-ÖØ-Þa-zß-öø-ÿ'’-]+")
 
 
 def extract_email(text: str) -> Optional[str]:
@@ -12,37 +39,24 @@ def extract_email(text: str) -> Optional[str]:
     Returns:
         L'email trouvé ou None
     """
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    
-    match = re.search(email_pattern, text)
-    
-    if match:
-        return match.group(0)
-    
-    return None
+    return find_email(text)
 
 
-def extract_phone(text: str) -> Optional[str]:
+def extract_phone(text: str, pack: Optional[LocalePack] = None) -> Optional[str]:
     """
     Extrait le numéro de téléphone du texte.
-    Supporte les formats français et internationaux.
+    Formats nationaux et internationaux du pays de la locale.
     
     Args:
         text: Le texte du CV
+        pack: Patterns de la locale du CV (détectée sur le texte si absent)
         
     Returns:
         Le téléphone trouvé ou None
     """
-    phone_patterns = [
-        r'\+33\s?[1-9](?:\s?\d{2}){4}',
-        r'0[1-9](?:\s?\d{2}){4}',
-        r'\+33[1-9]\d{8}',
-        r'0[1-9]\d{8}',
-        r'\(\+33\)\s?[1-9](?:\s?\d{2}){4}',
-    ]
-    
-    for pattern in phone_patterns:
-        match = re.search(pattern, text)
+    pack = pack or get_pack(detect_locale(text))
+    for pattern in pack.phone_patterns:
+        match = pattern.search(text)
         if match:
             phone = match.group(0).replace(" ", "")
             return phone
@@ -61,17 +75,61 @@ def clean_spaced_text(text: str) -> str:
     Returns:
         Texte nettoyé
     """
-    cleaned = re.sub(r'(?<=[A-ZÀ-Ÿa-zà-ÿ])\s+(?=[A-ZÀ-Ÿa-zà-ÿ](?:\s|$))', '', text)
-    return cleaned
+    return remove_letter_spacing(text)
 
 
-def extract_name(text: str) -> Dict[str, Optional[str]]:
+def _is_name_stopword(pack: LocalePack, *words: str) -> bool:
+    return any(normalize_token(word) in pack.name_stopwords for word in words)
+
+
+def _display_name(word: str) -> str:
+    """Les mots en majuscules sont remis en casse de nom propre"""
+    return word.capitalize() if word.isupper() else word
+
+
+def extract_name_with_lexicon(text: str, pack: LocalePack) -> Dict[str, Optional[str]]:
+    """
+    Cherche deux mots capitalisés consécutifs dont l'un est un prénom connu
+    du lexique ("Prénom NOM", "Prénom Nom" ou "NOM Prénom"). Le lexique
+    n'est pas exhaustif : sans prénom connu, extract_name passe aux patterns.
+    
+    Args:
+        text: Le début du texte du CV
+        pack: Patterns de la locale du CV
+        
+    Returns:
+        Dictionnaire avec first_name et last_name (None si non trouvé)
+    """
+    lexicon = get_lexicon()
+    previous = None
+    
+    for match in NAME_TOKEN_PATTERN.finditer(text):
+        # Les deux mots ne doivent être séparés que par des espaces
+        if previous is not None and not text[previous.end():match.start()].strip():
+            first, second = previous.group(0), match.group(0)
+            
+            if not _is_name_stopword(pack, first, second):
+                if lexicon.is_first_name(first) and (
+                    second.isupper() or lexicon.is_surname(second) or not lexicon.is_first_name(second)
+                ):
+                    return {"first_name": _display_name(first), "last_name": _display_name(second)}
+                
+                if first.isupper() and not second.isupper() and lexicon.is_first_name(second):
+                    return {"first_name": _display_name(second), "last_name": _display_name(first)}
+        
+        previous = match
+    
+    return {"first_name": None, "last_name": None}
+
+
+def extract_name(text: str, pack: Optional[LocalePack] = None) -> Dict[str, Optional[str]]:
     """
     Tente d'extraire le nom et prénom du texte.
     Amélioration: gère les noms avec espaces entre lettres et les PDF sur une seule ligne.
     
     Args:
         text: Le texte du CV
+        pack: Patterns de la locale du CV (détectée sur le texte si absent)
         
     Returns:
         Dictionnaire avec first_name et last_name
@@ -86,19 +144,25 @@ def extract_name(text: str) -> Dict[str, Optional[str]]:
     print(text[:200])
     print("=" * 50)
     
-    # Stratégie 1: Chercher "Prénom NOM" au tout début du texte (500 premiers caractères)
-    text_start = text[:500]
+    pack = pack or get_pack(detect_locale(text))
+    text_start = text[:NAME_HEAD_CHARS]
     
-    name_pattern = r'\b([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ][a-zàâäéèêëïîôùûüç]{2,})\s+([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ]{2,})\b'
-    match = re.search(name_pattern, text_start)
+    # Stratégie 1: un prénom connu du lexique suivi/précédé du nom
+    lexicon_result = extract_name_with_lexicon(text_start, pack)
+    if lexicon_result["first_name"]:
+        print(f" Nom trouvé avec le lexique: {lexicon_result['first_name']} {lexicon_result['last_name']}")
+        return lexicon_result
     
-    if match:
+    # Stratégie 2: Chercher "Prénom NOM" au tout début du texte (500 premiers caractères)
+    for match in pack.name_start.finditer(text_start):
+        if _is_name_stopword(pack, match.group(1), match.group(2)):
+            continue
         print(f" Nom trouvé au début du texte: {match.group(1)} {match.group(2)}")
         result["first_name"] = match.group(1)
         result["last_name"] = match.group(2).capitalize()
         return result
     
-    # Stratégie 2: Si échec, essayer avec les lignes
+    # Stratégie 3: Si échec, essayer avec les lignes
     lines = text.split("\n")[:15]
     
     for line in lines:
@@ -112,19 +176,17 @@ def extract_name(text: str) -> Dict[str, Optional[str]]:
         
         cleaned_line = clean_spaced_text(line)
         
-        name_pattern1 = r'^([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ][a-zàâäéèêëïîôùûüç]+)\s+([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ][A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇa-zàâäéèêëïîôùûüç]+)'
-        match = re.search(name_pattern1, cleaned_line)
+        match = pack.name_line.search(cleaned_line)
         
-        if match:
+        if match and not _is_name_stopword(pack, match.group(1), match.group(2)):
             print(f" Nom trouvé avec pattern 1: {match.group(1)} {match.group(2)}")
             result["first_name"] = match.group(1)
             result["last_name"] = match.group(2)
             return result
         
-        name_pattern2 = r'^([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ]{2,})\s+([A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ]{2,})'
-        match = re.search(name_pattern2, cleaned_line)
+        match = pack.name_upper_line.search(cleaned_line)
         
-        if match:
+        if match and not _is_name_stopword(pack, match.group(1), match.group(2)):
             print(f" Nom trouvé avec pattern 2: {match.group(1)} {match.group(2)}")
             result["first_name"] = match.group(1).capitalize()
             result["last_name"] = match.group(2).capitalize()
@@ -134,10 +196,33 @@ def extract_name(text: str) -> Dict[str, Optional[str]]:
     return result
 
 
+def extract_degree_info(text: str, index: Optional[SectionIndex] = None,
+                        pack: Optional[LocalePack] = None) -> Optional[Dict]:
+    """
+    Extrait le diplôme principal sous forme structurée.
+    Toutes les mentions sont trouvées en une passe (automate de mots-clés)
+    puis rattachées à la taxonomie : le plus haut niveau l'emporte.
+    Seule la section Formation est lue si le CV en a une ; sinon (ou si
+    elle ne cite aucun diplôme), tout le texte sauf les expériences.
+    
+    Args:
+        text: Le texte du CV
+        index: Sections du texte, si elles sont déjà calculées
+        pack: Locale du CV (détectée sur le texte si absente)
+        
+    Returns:
+        {"degree", "degree_level", "degree_label", "degree_field"} ou None
+    """
+    pack = pack or get_pack(detect_locale(text))
+    info = search_sections(EXTRACTORS["degree"], index or segment_sections(text, pack.code), pack) or None
+    if info:
+        print(f" Diplôme trouvé: {info['degree']} ({info['degree_label']})")
+    return info
+
+
 def extract_degree(text: str) -> Optional[str]:
     """
     Extrait le diplôme principal du texte.
-    Amélioration: meilleure détection des diplômes français.
     
     Args:
         text: Le texte du CV
@@ -145,80 +230,191 @@ def extract_degree(text: str) -> Optional[str]:
     Returns:
         Le diplôme trouvé ou None
     """
-    degree_patterns = [
-        r'Bachelor\s+[^\n.;]{3,80}(?:\(Bac\+\d\))?',
-        r'Master\s+[^\n.;]{3,80}(?:\(Bac\+\d\))?',
-        r'Licence\s+(?:professionnelle\s+)?[^\n.;]{3,80}',
-        r'Doctorat\s+(?:en\s+)?[^\n.;]{3,80}',
-        r'Ingénieur\s+[^\n.;]{3,80}',
-        r"Diplôme\s+d['']ingénieur\s+[^\n.;]{3,80}",
-        r'MBA\s+[^\n.;]{0,50}',
-        r'BTS\s+[^\n.;]{3,60}',
-        r'DUT\s+[^\n.;]{3,60}',
-        r'BUT\s+[^\n.;]{3,60}',
-        r'Bac\+\d\s+en\s+[^\n.;]{3,80}',
-        r'BAC\+\d\s+en\s+[^\n.;]{3,80}',
-        r'Certificat\s+[^\n.;]{3,60}',
-    ]
-    
-    found_degrees = []
-    
-    for pattern in degree_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            degree = match.group(0).strip()
-            degree = re.sub(r'[,;:\s]+$', '', degree)
-            
-            if degree.endswith((' à', ' de', ' en', ' l')):
-                extended_pattern = re.escape(degree) + r'\s*[\w\s]{0,30}'
-                extended_match = re.search(extended_pattern, text, re.IGNORECASE)
-                if extended_match:
-                    degree = extended_match.group(0).strip()
-            
-            if len(degree) > 120:
-                degree = degree[:120].rsplit(' ', 1)[0]
-            
-            if degree not in found_degrees and len(degree) > 5:
-                found_degrees.append(degree)
-    
-    if found_degrees:
-        print(f" Diplômes trouvés: {found_degrees}")
-        return found_degrees[0]
-    
-    simple_patterns = [
-        r'Bac\+\d',
-        r'BAC\+\d',
-        r'Baccalauréat\s+\w+',
-        r'Baccalauréat',
-    ]
-    
-    for pattern in simple_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    
-    return None
+    info = extract_degree_info(text)
+    return info["degree"] if info else None
+
+
+def _extract_email_fields(text: str, pack: LocalePack) -> Dict[str, Optional[str]]:
+    return {"email": extract_email(text)}
+
+
+def _extract_phone_fields(text: str, pack: LocalePack) -> Dict[str, Optional[str]]:
+    return {"phone": extract_phone(text, pack)}
+
+
+def _classify_degree_fields(text: str, pack: LocalePack) -> Dict:
+    return classify_degree(text, pack.code) or {}
+
+
+# Portion du document dont un extracteur a besoin
+SCOPE_HEAD = "head"                # les NAME_HEAD_CHARS premiers caractères
+SCOPE_FIRST_MATCH = "first_match"  # jusqu'à la première occurrence
+SCOPE_DOCUMENT = "document"        # tout le document (le plus haut diplôme l'emporte)
+
+
+class FieldExtractor(NamedTuple):
+    """
+    Extracteur d'un champ demandable : fonction (texte, pack de la locale),
+    clés produites, coût relatif, portée, sections lues en priorité et
+    sections ignorées (voir search_sections).
+    """
+    extract: Callable[[str, LocalePack], Dict]
+    outputs: Tuple[str, ...]
+    cost: int
+    scope: str
+    sections: Tuple[str, ...] = ()
+    skip_sections: Tuple[str, ...] = ()
 
 
-def extract_cv_info(text: str) -> Dict[str, Optional[str]]:
+# Registre des extracteurs, appelés du moins coûteux au plus coûteux
+EXTRACTORS: Dict[str, FieldExtractor] = {
+    "email": FieldExtractor(
+        _extract_email_fields, ("email",), cost=1, scope=SCOPE_FIRST_MATCH, sections=(HEADER, CONTACT)
+    ),
+    "phone": FieldExtractor(
+        _extract_phone_fields, ("phone",), cost=1, scope=SCOPE_FIRST_MATCH, sections=(HEADER, CONTACT)
+    ),
+    "name": FieldExtractor(extract_name, ("first_name", "last_name"), cost=2, scope=SCOPE_HEAD),
+    "degree": FieldExtractor(
+        _classify_degree_fields, ("degree", "degree_level", "degree_label", "degree_field"),
+        cost=3, scope=SCOPE_DOCUMENT, sections=(EDUCATION,), skip_sections=(EXPERIENCE,)
+    ),
+}
+
+
+def search_sections(extractor: FieldExtractor, index: SectionIndex, pack: LocalePack) -> Dict:
+    """
+    Exécute l'extracteur sur ses sections prioritaires si le CV en contient,
+    puis, à défaut de résultat, sur le texte privé des sections ignorées.
     """
-    Fonction principale qui extrait toutes les informations du CV.
+    if extractor.sections and index.has(*extractor.sections):
+        values = extractor.extract(index.select(extractor.sections), pack)
+        if any(value is not None for value in values.values()):
+            return values
+    return extractor.extract(index.without(extractor.skip_sections), pack)
+
+# Champs retournés "Non trouvé" (et non None) quand ils ne sont pas détectés
+_TEXT_FIELDS = ("first_name", "last_name", "email", "phone", "degree")
+
+
+def resolve_fields(fields: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    Valide une liste de champs demandés ("email", "phone", "name", "degree",
+    ou une clé du résultat comme "first_name") et la convertit en noms
+    d'extracteurs, du moins coûteux au plus coûteux.
+
+    Returns:
+        Les extracteurs à exécuter, ou None pour tous
+
+    Raises:
+        ValueError: Si un champ est inconnu
+    """
+    if fields is None:
+        return None
+    names = set()
+    for field in fields:
+        field = field.strip()
+        if not field:
+            continue
+        name = next(
+            (name for name, extractor in EXTRACTORS.items() if field == name or field in extractor.outputs),
+            None
+        )
+        if name is None:
+            raise ValueError(f"Champ inconnu : {field} (champs disponibles : {', '.join(EXTRACTORS)})")
+        names.add(name)
+    if not names:
+        return None
+    return tuple(sorted(names, key=lambda name: (EXTRACTORS[name].cost, name)))
+
+
+class FieldResolver:
+    """
+    Résolution incrémentale des champs demandés, morceau par morceau (une
+    page d'un PDF) : chaque morceau n'est lu qu'une fois, par les seuls
+    extracteurs des champs encore inconnus. La locale est détectée une
+    fois, sur le premier morceau.
+    """
+
+    def __init__(self, fields: Tuple[str, ...]):
+        # Le diplôme le plus élevé peut apparaître n'importe où : rien à résoudre avant la fin
+        self.complete = any(EXTRACTORS[name].scope == SCOPE_DOCUMENT for name in fields)
+        self.pending = list(fields)
+        self.pack: Optional[LocalePack] = None
+        self.length = 0
+
+    def feed(self, text: str, overlap: int = 0) -> bool:
+        """
+        Lit un nouveau morceau de texte nettoyé.
+
+        Args:
+            text: Le morceau, précédé des `overlap` derniers caractères déjà
+                lus (une occurrence à cheval sur deux pages reste trouvée)
+            overlap: Longueur du recouvrement en tête de `text`
+
+        Returns:
+            True si tous les champs demandés sont définitivement connus
+        """
+        if self.complete:
+            return False
+        if self.pack is None:
+            self.pack = get_pack(detect_locale(text))
+        self.length += len(text) - overlap
+        pending = []
+        for name in self.pending:
+            extractor = EXTRACTORS[name]
+            if extractor.scope == SCOPE_HEAD:
+                resolved = self.length >= NAME_HEAD_CHARS
+            else:
+                resolved = any(extractor.extract(text, self.pack).values())
+            if not resolved:
+                pending.append(name)
+        self.pending = pending
+        return not pending
+
+
+def select_fields(cv_data: Dict, fields: Optional[Tuple[str, ...]]) -> Dict:
+    """Restreint un résultat complet aux champs demandés (les autres valent None, sauf la locale)"""
+    if fields is None:
+        return cv_data
+    requested = {key for name in fields for key in EXTRACTORS[name].outputs} | {"locale"}
+    return {key: (value if key in requested else None) for key, value in cv_data.items()}
+
+
+def extract_cv_info(text: str, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Optional[str]]:
+    """
+    Fonction principale qui extrait les informations du CV.
     
     Args:
         text: Le texte brut du CV
+        fields: Extracteurs à exécuter (voir resolve_fields), None pour tous
         
     Returns:
         Dictionnaire avec toutes les informations extraites
+        (None pour les champs non demandés) et la locale détectée
     """
-    email = extract_email(text)
-    phone = extract_phone(text)
-    name_info = extract_name(text)
-    degree = extract_degree(text)
-    
-    return {
-        "first_name": name_info["first_name"] or "Non trouvé",
-        "last_name": name_info["last_name"] or "Non trouvé",
-        "email": email or "Non trouvé",
-        "phone": phone or "Non trouvé",
-        "degree": degree or "Non trouvé"
-    }
\ No newline at end of file
+    fields = resolve_fields(fields) if fields is not None else tuple(EXTRACTORS)
+    # Locale détectée sur le début du texte : seul son pack est exécuté
+    pack = get_pack(detect_locale(text))
+    
+    cv_data: Dict = {
+        "first_name": None,
+        "last_name": None,
+        "email": None,
+        "phone": None,
+        "degree": None,
+        "degree_level": None,
+        "degree_label": None,
+        "degree_field": None,
+        "locale": pack.code,
+    }
+    # Découpage en sections (une passe), partagé par les extracteurs
+    index = segment_sections(text, pack.code)
+    for name in fields:
+        extractor = EXTRACTORS[name]
+        values = search_sections(extractor, index, pack)
+        for key in extractor.outputs:
+            value = values.get(key)
+            cv_data[key] = (value or NOT_FOUND) if key in _TEXT_FIELDS else value
+    
+    return cv_data
@@ -0,0 +1,179 @@
+"""
+Lexique de prénoms et de noms de famille (gazetteer) pour la détection du nom.
+
+Le lexique est compilé en un trie binaire compact, stocké dans un fichier
+et projeté en mémoire (mmap) une seule fois par processus : les pages du
+fichier sont partagées par tous les workers via le cache du noyau, sans
+coût RSS propre à chaque worker. Une recherche coûte O(longueur du mot).
+
+Format du fichier (entiers little-endian) :
+    en-tête : MAGIC (8 octets) | offset de la racine (uint32)
+    noeud   : flags (uint8) | nombre d'enfants (uint16) | enfants triés
+    enfant  : octet (uint8) | offset du noeud enfant (uint32)
+
+Les listes fournies (data/lexicon/*.seed.txt) ne sont qu'un échantillon de
+départ : le lexique accélère la détection des noms courants et lève les
+ambiguïtés (NOM Prénom), mais les patterns de extract_name restent la
+voie principale. Une liste complète se branche avec FIRST_NAMES_PATH et
+SURNAMES_PATH, ou se compile à la main (sinon compilation automatique
+au premier chargement) :
+    python -m services.gazetteer [fichier_prenoms] [fichier_noms] [sortie]
+"""
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Sources texte (un nom par ligne, lignes "#" ignorées) et fichier compilé ;
+# par défaut l'échantillon de départ versionné
+FIRST_NAMES_PATH = Path(os.getenv("FIRST_NAMES_PATH", BACKEND_DIR / "data" / "lexicon" / "first_names.seed.txt"))
+SURNAMES_PATH = Path(os.getenv("SURNAMES_PATH", BACKEND_DIR / "data" / "lexicon" / "surnames.seed.txt"))
+NAME_LEXICON_PATH = Path(os.getenv("NAME_LEXICON_PATH", BACKEND_DIR / "data" / "names.lex"))
+
+MAGIC = b"CVLEX01\0"
+FIRST_NAME = 1
+SURNAME = 2
+
+_HEADER = struct.Struct("<8sI")
+_NODE = struct.Struct("<BH")
+_EDGE = struct.Struct("<BI")
+
+
+def normalize_token(token: str) -> bytes:
+    """
+    Clé de recherche : minuscules, sans accents, encodée en UTF-8.
+    "François" -> b"francois"
+    """
+    decomposed = unicodedata.normalize("NFKD", token.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return stripped.encode("utf-8")
+
+
+def _read_entries(path: Path) -> Iterable[str]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as source:
+        return [line.strip() for line in source if line.strip() and not line.startswith("#")]
+
+
+def build_lexicon(first_names: Iterable[str], surnames: Iterable[str], output_path: Path) -> int:
+    """
+    Compile les listes de noms en trie binaire.
+    L'écriture est atomique (fichier temporaire puis renommage).
+
+    Returns:
+        Le nombre d'entrées distinctes
+    """
+    # Trie en mémoire : {octet: noeud}, flags stockés sous la clé None
+    root: Dict = {}
+    entries = set()
+    for flag, names in ((FIRST_NAME, first_names), (SURNAME, surnames)):
+        for name in names:
+            key = normalize_token(name)
+            if not key:
+                continue
+            entries.add(key)
+            node = root
+            for byte in key:
+                node = node.setdefault(byte, {})
+            node[None] = node.get(None, 0) | flag
+
+    # Sérialisation post-ordre : les offsets des enfants sont connus avant le parent
+    buffer = bytearray(_HEADER.size)
+
+    def write(node: Dict) -> int:
+        children = sorted((byte, write(child)) for byte, child in node.items() if byte is not None)
+        offset = len(buffer)
+        buffer.extend(_NODE.pack(node.get(None, 0), len(children)))
+        for byte, child_offset in children:
+            buffer.extend(_EDGE.pack(byte, child_offset))
+        return offset
+
+    root_offset = write(root)
+    _HEADER.pack_into(buffer, 0, MAGIC, root_offset)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(f".tmp{os.getpid()}")
+    tmp_path.write_bytes(buffer)
+    os.replace(tmp_path, output_path)
+    return len(entries)
+
+
+class Lexicon:
+    """
+    Trie en lecture seule projeté en mémoire.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._root = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Fichier de lexique invalide : {path}")
+
+    def _flags(self, token: str) -> int:
+        data = self._data
+        offset = self._root
+        for byte in normalize_token(token):
+            _, count = _NODE.unpack_from(data, offset)
+            # Recherche dichotomique parmi les enfants (triés par octet)
+            low, high = 0, count
+            edges = offset + _NODE.size
+            while low < high:
+                middle = (low + high) // 2
+                if data[edges + middle * _EDGE.size] < byte:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == count or data[edges + low * _EDGE.size] != byte:
+                return 0
+            _, offset = _EDGE.unpack_from(data, edges + low * _EDGE.size)
+        return _NODE.unpack_from(data, offset)[0]
+
+    def is_first_name(self, token: str) -> bool:
+        """Vrai si le mot (ou chaque partie d'un prénom composé) est un prénom connu"""
+        if self._flags(token) & FIRST_NAME:
+            return True
+        parts = token.split("-")
+        return len(parts) > 1 and all(self._flags(part) & FIRST_NAME for part in parts)
+
+    def is_surname(self, token: str) -> bool:
+        """Vrai si le mot est un nom de famille connu"""
+        return bool(self._flags(token) & SURNAME)
+
+
+def _is_stale(path: Path) -> bool:
+    """Le fichier compilé est absent ou plus ancien que ses sources"""
+    if not path.exists():
+        return True
+    built = path.stat().st_mtime
+    return any(source.exists() and source.stat().st_mtime > built for source in (FIRST_NAMES_PATH, SURNAMES_PATH))
+
+
+_lexicon: Optional[Lexicon] = None
+
+
+def get_lexicon() -> Lexicon:
+    """
+    Retourne le lexique du processus (compilé si nécessaire, puis projeté
+    en mémoire une seule fois).
+    """
+    global _lexicon
+    if _lexicon is None:
+        if _is_stale(NAME_LEXICON_PATH):
+            build_lexicon(_read_entries(FIRST_NAMES_PATH), _read_entries(SURNAMES_PATH), NAME_LEXICON_PATH)
+        _lexicon = Lexicon(NAME_LEXICON_PATH)
+    return _lexicon
+
+
+if __name__ == "__main__":
+    first_names_path = Path(sys.argv[1]) if len(sys.argv) > 1 else FIRST_NAMES_PATH
+    surnames_path = Path(sys.argv[2]) if len(sys.argv) > 2 else SURNAMES_PATH
+    output = Path(sys.argv[3]) if len(sys.argv) > 3 else NAME_LEXICON_PATH
+    count = build_lexicon(_read_entries(first_names_path), _read_entries(surnames_path), output)
+    print(f" Lexique compilé : {count} entrées -> {output} ({output.stat().st_size} octets)")
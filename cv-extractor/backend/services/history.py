@@ -0,0 +1,207 @@
+"""
+Lecture et sérialisation de l'historique (GET /api/v1/history).
+
+- les lignes sont lues en tuples de colonnes (pas d'objets ORM) et
+  sérialisées directement par orjson ;
+- les réponses volumineuses sont compressées (br si disponible, sinon gzip)
+  selon l'en-tête Accept-Encoding ;
+- l'ETag est la version de la table cv_extractions (table_versions),
+  lue par clé primaire : un client qui renvoie l'ETag d'un historique
+  inchangé reçoit un 304 sans que l'historique soit relu ;
+- pagination, tri et recherche sont faits par la base : le frontend ne
+  reçoit que la page affichée, quelle que soit la taille de l'historique.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from models.cv_database import CVExtraction, TableVersion
+
+try:
+    import orjson
+except ImportError:  # sérialisation par le module json standard
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # compression gzip uniquement
+    brotli = None
+
+# Taille minimale d'une réponse compressée (octets)
+HISTORY_COMPRESS_MIN_BYTES = int(os.getenv("HISTORY_COMPRESS_MIN_BYTES", "1024"))
+
+# Taille maximale d'une page de l'historique (et d'une suppression groupée)
+HISTORY_MAX_LIMIT = int(os.getenv("HISTORY_MAX_LIMIT", "500"))
+
+# Colonnes de l'historique, dans l'ordre des clés de CVExtraction.to_dict()
+HISTORY_FIELDS = (
+    "id", "first_name", "last_name", "email", "phone", "degree",
+    "degree_level", "degree_label", "degree_field", "filename", "created_at",
+    "upload_count", "last_seen_at", "extractor_version", "duplicate_of",
+)
+HISTORY_COLUMNS = tuple(getattr(CVExtraction, field) for field in HISTORY_FIELDS)
+
+# Colonnes de tri autorisées ("-" en préfixe : ordre décroissant)
+SORT_FIELDS = (
+    "last_seen_at", "created_at", "last_name", "first_name", "email",
+    "degree_level", "degree_label", "filename", "upload_count",
+)
+DEFAULT_SORT = "-last_seen_at"
+
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def dumps(value) -> bytes:
+    """JSON compact en UTF-8 (dates au format ISO 8601, comme to_dict)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_isoformat).encode("utf-8")
+
+
+def table_version(db: Session) -> int:
+    """Version courante de cv_extractions (0 tant qu'aucune écriture n'a eu lieu)"""
+    version = db.scalar(
+        select(TableVersion.version).where(TableVersion.table_name == CVExtraction.__tablename__)
+    )
+    return version or 0
+
+
+def history_etag(version: int) -> str:
+    # ETag faible : le même contenu peut être servi compressé ou non
+    return f'W/"cv-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible de If-None-Match avec l'ETag courant"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    """
+    Décode un paramètre de tri ("last_name", "-degree_level"...).
+
+    Returns:
+        (colonne, ordre décroissant)
+
+    Raises:
+        ValueError: Si la colonne n'est pas triable
+    """
+    sort = sort or DEFAULT_SORT
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Tri inconnu : {field}. Colonnes triables : {', '.join(SORT_FIELDS)}")
+    return field, descending
+
+
+def _filters(min_level: Optional[int], degree_label: Optional[str], search: Optional[str],
+             group_versions: bool = False, versions_of: Optional[int] = None) -> list:
+    conditions = []
+    if group_versions:
+        # Un CV d'origine par groupe de versions
+        conditions.append(CVExtraction.duplicate_of.is_(None))
+    if versions_of is not None:
+        conditions.append(or_(CVExtraction.id == versions_of, CVExtraction.duplicate_of == versions_of))
+    if min_level is not None:
+        conditions.append(CVExtraction.degree_level >= min_level)
+    if degree_label:
+        conditions.append(CVExtraction.degree_label == degree_label)
+    if search and search.strip():
+        term = search.strip()
+        conditions.append(or_(*(
+            column.icontains(term, autoescape=True)
+            for column in (CVExtraction.first_name, CVExtraction.last_name, CVExtraction.email, CVExtraction.filename)
+        )))
+    return conditions
+
+
+def fetch_history(db: Session, limit: int, min_level: Optional[int] = None,
+                  degree_label: Optional[str] = None, offset: int = 0,
+                  sort: Optional[str] = None, search: Optional[str] = None,
+                  group_versions: bool = False, versions_of: Optional[int] = None) -> List[Dict]:
+    """
+    Page de l'historique (par défaut, dernier upload en premier), en
+    dictionnaires de colonnes. `search` cherche dans le nom, le prénom,
+    l'email et le nom de fichier (sans tenir compte de la casse).
+
+    `group_versions` ne garde que les CV d'origine, avec leur nombre de
+    versions (clé "versions") ; `versions_of` liste un CV et ses versions.
+    """
+    field, descending = parse_sort(sort)
+    column = getattr(CVExtraction, field)
+    # L'identifiant départage les égalités : pages stables d'une requête à l'autre
+    if descending:
+        order = (column.desc().nullslast(), CVExtraction.id.desc())
+    else:
+        order = (column.asc().nullslast(), CVExtraction.id.asc())
+    query = (
+        select(*HISTORY_COLUMNS)
+        .where(*_filters(min_level, degree_label, search, group_versions, versions_of))
+        .order_by(*order)
+        .offset(offset)
+        .limit(limit)
+    )
+    rows = [dict(zip(HISTORY_FIELDS, row)) for row in db.execute(query)]
+    if group_versions and rows:
+        # Versions des seules lignes de la page (index sur duplicate_of)
+        counts = dict(db.execute(
+            select(CVExtraction.duplicate_of, func.count())
+            .where(CVExtraction.duplicate_of.in_([row["id"] for row in rows]))
+            .group_by(CVExtraction.duplicate_of)
+        ).all())
+        for row in rows:
+            row["versions"] = 1 + counts.get(row["id"], 0)
+    return rows
+
+
+def count_history(db: Session, min_level: Optional[int] = None, degree_label: Optional[str] = None,
+                  search: Optional[str] = None, group_versions: bool = False,
+                  versions_of: Optional[int] = None) -> int:
+    """Nombre de lignes correspondant aux filtres (toutes pages confondues)"""
+    query = select(func.count()).select_from(CVExtraction).where(
+        *_filters(min_level, degree_label, search, group_versions, versions_of)
+    )
+    return db.scalar(query)
+
+
+def render_history(rows: List[Dict], total: Optional[int] = None, offset: int = 0) -> bytes:
+    page = {"count": len(rows), "data": rows}
+    if total is not None:
+        page.update(total=total, offset=offset)
+    return dumps(page)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Compression acceptée par le client : "br", "gzip" ou None"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
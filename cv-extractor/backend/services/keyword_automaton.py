@@ -0,0 +1,113 @@
+"""
+Automate d'Aho-Corasick : recherche de nombreux mots-clés en une passe.
+
+L'automate est construit une seule fois à partir d'un dictionnaire
+{mot-clé: valeur} ; une recherche parcourt le texte une seule fois,
+quel que soit le nombre de mots-clés. La comparaison ignore la casse et
+les accents, et seules les occurrences de mots entiers sont retournées.
+"""
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple
+
+
+@lru_cache(maxsize=4096)
+def fold_char(char: str) -> str:
+    """
+    Minuscule sans accent, en conservant exactement un caractère
+    (les positions dans le texte plié sont celles du texte d'origine).
+    """
+    lowered = char.lower()
+    if len(lowered) != 1:
+        return char
+    base = unicodedata.normalize("NFKD", lowered)[0]
+    return base if base.isascii() else lowered
+
+
+def fold(text: str) -> str:
+    """Applique fold_char à tout le texte (même longueur que l'original)"""
+    return "".join(map(fold_char, text))
+
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    value: Any
+
+
+class KeywordAutomaton:
+    """
+    Automate construit à partir d'un dictionnaire {mot-clé: valeur}.
+    """
+
+    def __init__(self, keywords: Dict[str, Any]):
+        # Transitions, lien d'échec et sorties (longueur, mot-clé) par état
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[tuple]] = [[]]
+        self._values: Dict[str, Any] = {}
+
+        for keyword, value in keywords.items():
+            folded = fold(keyword)
+            self._values[keyword] = value
+            state = 0
+            for char in folded:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((len(folded), keyword))
+
+        # Liens d'échec calculés en largeur d'abord
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """
+        Toutes les occurrences (mots entiers) des mots-clés, en une passe.
+        Les occurrences qui se chevauchent sont résolues au profit de la
+        plus longue (puis de la plus à gauche).
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = []
+        state = 0
+        for position, char in enumerate(text):
+            char = fold_char(char)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, keyword in outputs[state]:
+                start = position - length + 1
+                end = position + 1
+                if self._is_word(text, start, end):
+                    found.append(KeywordMatch(start, end, keyword, self._values[keyword]))
+
+        found.sort(key=lambda match: (match.start, -(match.end - match.start)))
+        result = []
+        last_end = -1
+        for match in found:
+            if match.start >= last_end:
+                result.append(match)
+                last_end = match.end
+        return result
+
+    @staticmethod
+    def _is_word(text: str, start: int, end: int) -> bool:
+        """L'occurrence n'est pas collée à une lettre ou un chiffre"""
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
@@ -0,0 +1,253 @@
+"""
+Détection de la langue d'un CV et patterns d'extraction propres à chaque locale.
+
+Chaque locale (fr, en, de, es) a son pack : formats de téléphone du pays,
+lettres accentuées des noms, mots de tête de CV qui ne sont jamais un nom
+et règles des numéros nationaux (indicatif du préfixe "0", numéros écrits
+sans préfixe). Un CV n'exécute que le pack de sa
+locale : ajouter une locale n'ajoute rien au coût des autres CV.
+
+- detect_locale lit les LOCALE_DETECT_CHARS premiers caractères : les
+  mots sont comptés en une passe (str.split et Counter, sans regex), puis
+  chaque mot courant distinct (articles, prépositions, titres de section)
+  et chaque indicatif téléphonique (+33, +44...) compte pour sa langue.
+  Sans indice suffisant, DEFAULT_LOCALE l'emporte ;
+- get_pack compile les patterns d'une locale à sa première utilisation
+  (avec le moteur de services/regex_engine.py), puis les garde en cache
+  pour le processus.
+"""
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Tuple
+
+from services import regex_engine
+from services.gazetteer import normalize_token
+
+# Locales disponibles pour la détection (ordre de préférence en cas d'égalité)
+EXTRACTION_LOCALES = [
+    code.strip() for code in os.getenv("EXTRACTION_LOCALES", "fr,en,de,es").split(",") if code.strip()
+]
+# Locale des CV sans indice de langue suffisant
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "fr")
+# Taille du début de texte lu par la détection
+LOCALE_DETECT_CHARS = int(os.getenv("LOCALE_DETECT_CHARS", "2048"))
+# Score minimal (mots reconnus) pour s'écarter de la locale par défaut
+LOCALE_MIN_SCORE = 3
+# Poids d'un indicatif téléphonique du pays
+PHONE_PREFIX_WEIGHT = 3
+
+# Mots de tête de CV qui ne sont jamais un nom, quelle que soit la langue
+COMMON_NAME_STOPWORDS = (
+    "curriculum", "vitae", "cv", "resume", "profil", "profile", "contact", "coordonnées",
+    "formation", "formations", "éducation", "education", "expérience", "expériences",
+    "experience", "professionnelle", "professionnelles", "compétences", "skills",
+    "langues", "loisirs", "centres", "intérêts", "objectif", "diplômes", "projets",
+    "références", "email", "mail", "téléphone", "tel", "adresse", "permis",
+    "développeur", "ingénieur", "étudiant", "stage", "alternance", "consultant",
+)
+
+
+class LocaleSpec(NamedTuple):
+    """Définition d'une locale (patterns sous forme de texte, compilés par get_pack)"""
+    country_code: str                  # indicatif des numéros nationaux (0X...)
+    national_numbers: Tuple[Tuple[str, str], ...]  # numéros sans "0" : (chiffres, indicatif)
+    phone_patterns: Tuple[str, ...]    # du plus précis au plus permissif
+    phone_prefixes: Tuple[str, ...]    # indicatifs qui désignent la locale
+    upper: str                         # classe des majuscules d'un nom
+    lower: str                         # classe des minuscules d'un nom
+    name_stopwords: Tuple[str, ...]
+    detect_words: Tuple[str, ...]      # mots courants, en minuscules
+
+
+LOCALE_SPECS: Dict[str, LocaleSpec] = {
+    "fr": LocaleSpec(
+        country_code="33",
+        national_numbers=(),
+        phone_patterns=(
+            r'\+33\s?[1-9](?:\s?\d{2}){4}',
+            r'0[1-9](?:\s?\d{2}){4}',
+            r'\+33[1-9]\d{8}',
+            r'0[1-9]\d{8}',
+            r'\(\+33\)\s?[1-9](?:\s?\d{2}){4}',
+        ),
+        phone_prefixes=("+33", "(+33)"),
+        upper="A-ZÀÂÄÉÈÊËÏÎÔÙÛÜÇ",
+        lower="a-zàâäéèêëïîôùûüç",
+        name_stopwords=(),
+        detect_words=(
+            "le", "la", "les", "des", "du", "et", "une", "pour", "avec", "dans", "sur", "au", "aux",
+            "chez", "est", "expérience", "expériences", "formation", "compétences", "langues",
+            "stage", "diplôme", "école", "français", "anglais",
+        ),
+    ),
+    "en": LocaleSpec(
+        country_code="44",
+        # Numéros nord-américains : indicatif régional sans préfixe (1 facultatif)
+        national_numbers=((r'1?([2-9]\d{9})', "1"),),
+        phone_patterns=(
+            r'\+44\s?\(?0?\)?\s?7\d{3}\s?\d{3}\s?\d{3}',
+            r'\+44\s?\(?0?\)?\s?[1-9]\d{2,3}\s?\d{3}\s?\d{3,4}',
+            r'\b07\d{3}\s?\d{3}\s?\d{3}\b',
+            r'\+1[\s.-]?\(?[2-9]\d{2}\)?[\s.-]?\d{3}[\s.-]?\d{4}',
+            r'\([2-9]\d{2}\)\s?\d{3}[\s.-]\d{4}',
+            r'\b[2-9]\d{2}[.-]\d{3}[.-]\d{4}\b',
+        ),
+        phone_prefixes=("+44", "+1"),
+        upper="A-Z",
+        lower="a-z",
+        name_stopwords=(
+            "summary", "work", "history", "employment", "languages", "interests", "hobbies",
+            "developer", "engineer", "student", "internship", "manager", "address", "phone",
+            "mobile", "linkedin", "objective", "qualifications",
+        ),
+        detect_words=(
+            "the", "and", "of", "with", "for", "to", "at", "on", "from", "my", "is", "as", "an", "by",
+            "experience", "education", "skills", "languages", "university", "degree", "english",
+        ),
+    ),
+    "de": LocaleSpec(
+        country_code="49",
+        national_numbers=(),
+        phone_patterns=(
+            r'\+49\s?\(?0?\)?\s?1[5-7]\d(?:[\s/-]?\d){7,8}',
+            r'\+49\s?\(?0?\)?\s?[2-9]\d{1,4}(?:[\s/-]?\d){4,8}',
+            r'\b01[5-7]\d(?:[\s/-]?\d){7,8}\b',
+            r'\b0[2-9]\d{1,4}[\s/-]\d(?:[\s-]?\d){3,7}\b',
+        ),
+        phone_prefixes=("+49",),
+        upper="A-ZÄÖÜ",
+        lower="a-zäöüß",
+        name_stopwords=(
+            "lebenslauf", "persönliche", "daten", "berufserfahrung", "ausbildung", "kenntnisse",
+            "sprachen", "anschrift", "telefon", "entwickler", "ingenieur", "praktikum", "studium",
+        ),
+        detect_words=(
+            "und", "der", "die", "das", "mit", "für", "bei", "von", "im", "zu", "ist", "ein", "eine",
+            "den", "dem", "auf", "als", "berufserfahrung", "ausbildung", "kenntnisse", "sprachen",
+            "deutsch", "englisch",
+        ),
+    ),
+    "es": LocaleSpec(
+        country_code="34",
+        # Pas de préfixe "0" en Espagne : 9 chiffres, mobiles 6/7, fixes 8/9
+        national_numbers=((r'([6-9]\d{8})', "34"),),
+        phone_patterns=(
+            r'\+34\s?[6-9]\d{2}(?:\s?\d{2}){3}',
+            r'\+34\s?[6-9]\d{2}(?:\s?\d{3}){2}',
+            r'\b[6-9]\d{2}(?:\s?\d{3}){2}\b',
+            r'\b[6-9]\d{2}(?:\s\d{2}){3}\b',
+        ),
+        phone_prefixes=("+34",),
+        upper="A-ZÁÉÍÓÚÑÜ",
+        lower="a-záéíóúñü",
+        name_stopwords=(
+            "currículum", "datos", "personales", "experiencia", "formación", "habilidades",
+            "idiomas", "dirección", "teléfono", "desarrollador", "ingeniero", "prácticas", "perfil",
+        ),
+        detect_words=(
+            "y", "el", "los", "las", "del", "con", "para", "por", "una", "al", "su", "como",
+            "experiencia", "formación", "habilidades", "idiomas", "universidad", "español", "inglés",
+        ),
+    ),
+}
+
+
+class LocalePack(NamedTuple):
+    """Patterns compilés d'une locale"""
+    code: str
+    country_code: str
+    national_numbers: Tuple  # (pattern sur les chiffres, indicatif)
+    phone_patterns: Tuple
+    name_start: object       # "Prénom NOM" au début du texte
+    name_line: object        # "Prénom Nom" en début de ligne
+    name_upper_line: object  # "PRÉNOM NOM" en début de ligne
+    name_stopwords: FrozenSet[str]
+
+
+@lru_cache(maxsize=None)
+def get_pack(code: str) -> LocalePack:
+    """
+    Pack de la locale, compilé à la première demande (une fois par processus).
+
+    Raises:
+        KeyError: Si la locale n'a pas de pack
+    """
+    spec = LOCALE_SPECS[code]
+    upper, lower = spec.upper, spec.lower
+    return LocalePack(
+        code=code,
+        country_code=spec.country_code,
+        national_numbers=tuple((re.compile(digits), code) for digits, code in spec.national_numbers),
+        phone_patterns=tuple(regex_engine.compile(pattern) for pattern in spec.phone_patterns),
+        name_start=regex_engine.compile(rf'\b([{upper}][{lower}]{{2,}})\s+([{upper}]{{2,}})\b'),
+        name_line=regex_engine.compile(rf'^([{upper}][{lower}]+)\s+([{upper}][{upper}{lower}]+)'),
+        name_upper_line=regex_engine.compile(rf'^([{upper}]{{2,}})\s+([{upper}]{{2,}})'),
+        name_stopwords=frozenset(
+            normalize_token(word) for word in COMMON_NAME_STOPWORDS + spec.name_stopwords
+        ),
+    )
+
+
+def _enabled_locales() -> List[str]:
+    locales = [code for code in EXTRACTION_LOCALES if code in LOCALE_SPECS]
+    if DEFAULT_LOCALE in LOCALE_SPECS and DEFAULT_LOCALE not in locales:
+        locales.append(DEFAULT_LOCALE)
+    return locales
+
+
+ENABLED_LOCALES = _enabled_locales()
+
+if DEFAULT_LOCALE not in LOCALE_SPECS:
+    raise ValueError(f"DEFAULT_LOCALE inconnue : {DEFAULT_LOCALE} (locales : {', '.join(LOCALE_SPECS)})")
+
+
+def _build_word_index() -> Dict[str, Tuple[int, ...]]:
+    """Mot courant -> rangs des locales qui l'utilisent"""
+    index: Dict[str, List[int]] = {}
+    for rank, code in enumerate(ENABLED_LOCALES):
+        for word in LOCALE_SPECS[code].detect_words:
+            index.setdefault(word, []).append(rank)
+    return {word: tuple(ranks) for word, ranks in index.items()}
+
+
+_WORD_INDEX = _build_word_index()
+# Ponctuation collée aux mots ("expérience," "Teléfono:")
+_PUNCTUATION = ".,;:!?()[]{}|/\"'’«»•·-–—"
+# Indicatif précédé de "+" (les plus longs d'abord : +44 avant +4)
+_PHONE_PREFIXES = sorted(
+    ((prefix.strip("()"), rank) for rank, code in enumerate(ENABLED_LOCALES)
+     for prefix in LOCALE_SPECS[code].phone_prefixes),
+    key=lambda item: -len(item[0])
+)
+_PHONE_PREFIX = re.compile(r"\+\d{1,3}")
+
+
+def detect_locale(text: str) -> str:
+    """
+    Locale du CV d'après son début : une passe sur les mots, une sur les indicatifs.
+
+    Returns:
+        Le code de la locale (DEFAULT_LOCALE sans indice suffisant)
+    """
+    head = text[:LOCALE_DETECT_CHARS]
+    scores = [0] * len(ENABLED_LOCALES)
+    # Chaque mot distinct n'est cherché qu'une fois
+    for word, count in Counter(head.lower().split()).items():
+        ranks = _WORD_INDEX.get(word) or _WORD_INDEX.get(word.strip(_PUNCTUATION), ())
+        for rank in ranks:
+            scores[rank] += count
+    for match in _PHONE_PREFIX.finditer(head):
+        found = match.group(0)
+        for prefix, rank in _PHONE_PREFIXES:
+            if found.startswith(prefix):
+                scores[rank] += PHONE_PREFIX_WEIGHT
+                break
+
+    best = max(range(len(scores)), key=lambda rank: scores[rank])
+    default = ENABLED_LOCALES.index(DEFAULT_LOCALE)
+    if scores[best] < LOCALE_MIN_SCORE or scores[best] == scores[default]:
+        return DEFAULT_LOCALE
+    return ENABLED_LOCALES[best]
+
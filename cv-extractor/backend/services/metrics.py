@@ -0,0 +1,120 @@
+"""
+Métriques applicatives exposées au format texte Prometheus.
+
+Registre minimal (compteurs et histogrammes) sans dépendance externe.
+Les valeurs sont propres à chaque processus : avec plusieurs workers,
+chaque worker expose ses propres compteurs sur /metrics.
+"""
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Bornes par défaut des histogrammes (en secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_registry: List["_Metric"] = []
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formate les labels Prometheus : {nom="valeur",...}"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base commune : nom, description et noms de labels"""
+
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets, somme et nombre d'observations)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            # [compteurs par bucket..., +Inf, somme]
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(state[-2]) if state else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with _lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.label_names + ("le",), key + (le,))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            base = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{base} {state[-1]}")
+            lines.append(f"{self.name}_count{base} {state[-2]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Exporte toutes les métriques enregistrées au format texte Prometheus"""
+    with _lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,112 @@
+"""
+Signatures MinHash des CV et index LSH par bandes (quasi-doublons).
+
+Un candidat renvoie souvent une version légèrement différente de son CV
+(nouveau téléphone, nouvelle expérience) : le hash du fichier change,
+mais les deux textes partagent la plupart de leurs shingles (suites de
+SHINGLE_WORDS mots). La signature MinHash estime leur similarité de
+Jaccard :
+- une seule passe de hachage par shingle (one permutation hashing :
+  le hash choisit la case et la valeur), les cases vides sont remplies
+  par densification ;
+- NUM_HASHES valeurs de 32 bits, stockées en binaire (512 octets) dans
+  la colonne cv_extractions.minhash.
+
+Index LSH : la signature est découpée en LSH_BANDS bandes de LSH_ROWS
+valeurs ; chaque bande est hachée en un bucket (table cv_minhash_bands,
+clé primaire (band, bucket, cv_id)). Deux CV de similarité s partagent au
+moins un bucket avec une probabilité 1 - (1 - s^LSH_ROWS)^LSH_BANDS
+(95 % à 0,8, plus de 99,9 % à 0,9, 6 % à 0,5) : la recherche se fait en
+LSH_BANDS lectures d'index, quel que soit le nombre de CV stockés, puis
+la similarité des seuls candidats est vérifiée sur leurs signatures.
+"""
+import hashlib
+import os
+import re
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+# Quasi-doublons : "off", "flag" (la version est liée au CV d'origine) ou
+# "merge" (fusionnée dans la ligne du CV d'origine)
+NEAR_DUPLICATE_MODE = os.getenv("NEAR_DUPLICATE_MODE", "flag").lower()
+# Similarité de Jaccard estimée à partir de laquelle deux CV sont des versions
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+NUM_HASHES = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_HASHES // LSH_BANDS
+SHINGLE_WORDS = 4
+
+_SIGNATURE_FORMAT = struct.Struct(f"<{NUM_HASHES}I")
+_BAND_FORMAT = struct.Struct(f"<{LSH_ROWS}I")
+_TOKEN = re.compile(r"\w+")
+# Décalage de densification (constante du nombre d'or sur 32 bits)
+_DENSIFY_STEP = 0x9E3779B1
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str) -> Iterator[str]:
+    """Suites de SHINGLE_WORDS mots consécutifs (minuscules, sans ponctuation)"""
+    words = _TOKEN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        if words:
+            yield " ".join(words)
+        return
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        yield " ".join(words[i:i + SHINGLE_WORDS])
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def compute_signature(text: Optional[str]) -> Optional[Signature]:
+    """Signature MinHash du texte (None s'il ne contient aucun mot)"""
+    if not text:
+        return None
+    empty = 1 << 32
+    values = [empty] * NUM_HASHES
+    for shingle in set(shingles(text)):
+        hashed = _hash64(shingle.encode("utf-8"))
+        slot = hashed % NUM_HASHES
+        value = (hashed >> 32) & 0xFFFFFFFF
+        if value < values[slot]:
+            values[slot] = value
+    if values.count(empty) == NUM_HASHES:
+        return None
+
+    # Densification : une case vide reprend la valeur de la première case
+    # pleine à sa droite (circulairement), décalée selon la distance
+    signature = list(values)
+    for slot in range(NUM_HASHES):
+        distance = 1
+        while signature[slot] == empty:
+            source = values[(slot + distance) % NUM_HASHES]
+            if source != empty:
+                signature[slot] = (source + distance * _DENSIFY_STEP) & 0xFFFFFFFF
+            distance += 1
+    return tuple(signature)
+
+
+def pack(signature: Signature) -> bytes:
+    return _SIGNATURE_FORMAT.pack(*signature)
+
+
+def unpack(data: bytes) -> Signature:
+    return _SIGNATURE_FORMAT.unpack(data)
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Similarité de Jaccard estimée (part des valeurs identiques)"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+
+def band_buckets(signature: Signature) -> List[Tuple[int, int]]:
+    """Buckets LSH de la signature : [(bande, bucket signé sur 64 bits)]"""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = _BAND_FORMAT.pack(*signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+        bucket = int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "little", signed=True)
+        buckets.append((band, bucket))
+    return buckets
@@ -0,0 +1,93 @@
+"""
+Normalisation des coordonnées pour identifier un candidat.
+
+Deux uploads du même candidat doivent produire la même clé, quelle que
+soit la mise en forme (majuscules dans l'email, espaces ou indicatif
+dans le numéro de téléphone).
+"""
+import os
+import re
+from typing import Optional
+
+from services.extractor import NOT_FOUND
+from services.locales import DEFAULT_LOCALE, LocalePack
+
+# Indicatif pays utilisé pour les numéros nationaux (0X XX XX XX XX)
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "33")
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Normalise un email (minuscules, sans espaces).
+
+    Returns:
+        L'email normalisé ou None si absent/invalide
+    """
+    if not email or email == NOT_FOUND:
+        return None
+    email = email.strip().lower()
+    return email if "@" in email else None
+
+
+def _country_code(pack: Optional[LocalePack]) -> str:
+    """Indicatif des numéros à préfixe "0" : celui de la locale (DEFAULT_COUNTRY_CODE pour la locale par défaut)"""
+    if pack is None or pack.code == DEFAULT_LOCALE:
+        return DEFAULT_COUNTRY_CODE
+    return pack.country_code
+
+
+def normalize_phone_e164(phone: Optional[str], pack: Optional[LocalePack] = None) -> Optional[str]:
+    """
+    Convertit un numéro au format E.164 (+33612345678).
+    Un numéro national prend l'indicatif de la locale du CV (`pack`,
+    locale par défaut si absent) : préfixe "0", ou formats du pays écrits
+    sans préfixe (numéros espagnols, nord-américains).
+
+    Exemples :
+        "06 12 34 56 78"   -> "+33612345678"
+        "(+33) 6 12 34 56 78" -> "+33612345678"
+        "0033612345678"    -> "+33612345678"
+        "612 345 678" (es) -> "+34612345678"
+        "(415) 555-1234" (en) -> "+14155551234"
+
+    Returns:
+        Le numéro au format E.164 ou None si absent/invalide
+    """
+    if not phone or phone == NOT_FOUND:
+        return None
+
+    international = "+" in phone
+    digits = _NON_DIGITS.sub("", phone)
+
+    if not international:
+        if digits.startswith("00"):
+            digits = digits[2:]
+        elif digits.startswith("0"):
+            digits = _country_code(pack) + digits[1:]
+        else:
+            for pattern, country_code in (pack.national_numbers if pack else ()):
+                match = pattern.fullmatch(digits)
+                if match:
+                    digits = country_code + match.group(1)
+                    break
+            else:
+                return None
+
+    # E.164 : 15 chiffres au maximum, indicatif compris
+    if not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+
+def candidate_key(email_normalized: Optional[str], phone_e164: Optional[str]) -> Optional[str]:
+    """
+    Clé d'identité d'un candidat : l'email si connu, sinon le téléphone.
+    Sans aucune coordonnée, le candidat ne peut pas être dédoublonné (None).
+    """
+    if email_normalized:
+        return f"email:{email_normalized}"
+    if phone_e164:
+        return f"tel:{phone_e164}"
+    return None
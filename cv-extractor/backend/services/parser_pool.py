@@ -0,0 +1,360 @@
+"""
+Pool de processus de parsing à mémoire bornée.
+
+pdfplumber peut faire monter la mémoire d'un processus à plusieurs Go sur
+un gros PDF, et cette mémoire n'est jamais entièrement rendue au système.
+Le parsing est donc fait dans des processus dédiés :
+
+- chaque processus a un plafond d'espace d'adressage (RLIMIT_AS) : un
+  document trop gourmand échoue avec une MemoryError au lieu de faire
+  tomber le serveur ;
+- un processus est recyclé après PARSER_MAX_DOCS documents, ou dès que
+  sa mémoire résidente dépasse PARSER_MAX_RSS_MB ;
+- le pic de mémoire résidente de chaque document est exporté sur /metrics ;
+- un document qui dépasse PARSE_DOC_TIMEOUT est abandonné : le processus
+  est tué et les pages déjà extraites (envoyées au fil de l'eau) sont
+  retournées comme résultat partiel ;
+- un processus mort au repos (OOM killer, recyclage) est remplacé et le
+  document est confié au nouveau : seul un arrêt pendant le parsing est
+  imputé au document (ParserCrashError).
+
+Le document est désigné par son chemin, ou par un segment de mémoire
+partagée (services/upload_buffer.py) : seul son nom traverse le Pipe.
+"""
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import time
+from multiprocessing import resource_tracker
+from typing import Optional, Tuple
+
+from services.admission import PARSE_CONCURRENCY
+from services.metrics import Counter, Histogram
+from services.pipeline import clean_raw_text, iter_raw_text, until_resolved
+from services.profiling import RequestProfile, collect_stats
+from services.upload_buffer import SourceHandle, open_source
+
+PARSER_POOL_ENABLED = os.getenv("PARSER_POOL_ENABLED", "true").lower() == "true"
+# Plafond mémoire d'un processus de parsing (0 : pas de plafond)
+PARSER_MEMORY_LIMIT_MB = int(os.getenv("PARSER_MEMORY_LIMIT_MB", "2048"))
+# Recyclage d'un processus après N documents ou au-delà d'une mémoire résidente
+PARSER_MAX_DOCS = int(os.getenv("PARSER_MAX_DOCS", "50"))
+PARSER_MAX_RSS_MB = int(os.getenv("PARSER_MAX_RSS_MB", "512"))
+# "forkserver" : les processus sont créés à partir d'un serveur léger,
+# pas par fork du worker web (multi-thread)
+PARSER_START_METHOD = os.getenv("PARSER_START_METHOD", "forkserver")
+# Délai maximal de parsing d'un document en secondes
+PARSE_DOC_TIMEOUT = float(os.getenv("PARSE_DOC_TIMEOUT", "20"))
+
+MB = 1024 * 1024
+
+PEAK_RSS_BYTES = Histogram(
+    "cv_parse_peak_rss_bytes",
+    "Pic de mémoire résidente du processus de parsing par document",
+    buckets=tuple(size * MB for size in (64, 128, 256, 512, 1024, 2048, 4096))
+)
+RECYCLES_TOTAL = Counter(
+    "cv_parser_recycles_total",
+    "Processus de parsing recyclés",
+    labels=("reason",)
+)
+
+
+class ParserError(Exception):
+    """Échec du parsing d'un document dans un processus du pool"""
+
+
+class ParserCrashError(ParserError):
+    """Processus de parsing arrêté pendant le traitement du document"""
+
+
+class ParseTimeoutError(ParserError):
+    """
+    Délai de parsing du document dépassé.
+    `partial_text` contient le texte nettoyé des pages extraites avant l'arrêt.
+    """
+
+    def __init__(self, message: str, partial_text: str = ""):
+        super().__init__(message)
+        self.partial_text = partial_text
+
+
+def limit_memory(limit_mb: int) -> None:
+    """Plafonne l'espace d'adressage du processus courant (0 : sans effet)"""
+    if limit_mb > 0:
+        limit = limit_mb * MB
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _status_kb(field: str) -> Optional[int]:
+    """Valeur (en ko) d'un champ de /proc/self/status (Linux uniquement)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> None:
+    """Remet à zéro le pic de mémoire résidente (VmHWM) du processus"""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass  # non supporté : le pic mesuré est alors celui depuis le démarrage
+
+
+def _peak_rss_bytes() -> int:
+    peak_kb = _status_kb("VmHWM")
+    if peak_kb is None:
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_kb * 1024
+
+
+def _worker_main(conn, memory_limit_mb: int, max_docs: int, max_rss_mb: int) -> None:
+    """
+    Boucle d'un processus de parsing : reçoit (chemin ou segment de mémoire
+    partagée, extension, profilage, champs demandés), envoie ("page", texte brut) pour chaque page extraite
+    (jusqu'à ce que les champs demandés soient résolus), ("profile",
+    statistiques cProfile) si demandé, puis
+    (statut, message d'erreur ou None, pic RSS, motif de recyclage ou None).
+    Le processus s'arrête après avoir signalé un recyclage.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    limit_memory(memory_limit_mb)
+    docs = 0
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:  # arrêt demandé par le pool
+            return
+        handle, file_extension, profile, fields = request
+
+        def parse() -> None:
+            with open_source(handle) as source:
+                chunks = iter_raw_text(source, file_extension)
+                if fields:
+                    chunks = until_resolved(chunks, file_extension, fields)
+                for chunk in chunks:
+                    conn.send(("page", chunk))
+
+        _reset_peak_rss()
+        recycle = None
+        try:
+            if profile:
+                conn.send(("profile", collect_stats(parse)[1]))
+            else:
+                parse()
+            status, error = "ok", None
+        except MemoryError:
+            status, error = "error", f"Plafond mémoire du parsing dépassé ({memory_limit_mb} Mo)"
+            recycle = "memory_limit"
+        except Exception as e:
+            status, error = "error", str(e)
+        peak = _peak_rss_bytes()
+
+        docs += 1
+        if recycle is None:
+            if docs >= max_docs:
+                recycle = "max_docs"
+            elif (_status_kb("VmRSS") or 0) > max_rss_mb * 1024:
+                recycle = "max_rss"
+        conn.send((status, error, peak, recycle))
+        if recycle:
+            return
+
+
+class ParserWorker:
+    """Processus de parsing et son canal de communication"""
+
+    def __init__(self, context, memory_limit_mb: int, max_docs: int, max_rss_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb, max_docs, max_rss_mb),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, handle: SourceHandle, file_extension: str, profile: bool,
+             fields: Optional[Tuple[str, ...]] = None) -> None:
+        """
+        Confie un document au processus.
+
+        Raises:
+            EOFError, OSError: Si le processus est déjà arrêté
+        """
+        if not self.process.is_alive():
+            raise BrokenPipeError("processus de parsing arrêté")
+        self.pages = []
+        self.conn.send((handle, file_extension, profile, fields))
+
+    def receive(self, timeout: float, profile: Optional[RequestProfile] = None) -> Tuple[str, str, int, Optional[str]]:
+        """
+        Attend le résultat du document envoyé. Les pages reçues sont accumulées
+        dans `self.pages` ; le profil du processus est ajouté à `profile` si fourni.
+
+        Returns:
+            (statut, message d'erreur ou None, pic RSS, motif de recyclage ou None)
+
+        Raises:
+            TimeoutError: Si le document n'est pas terminé dans le délai
+            EOFError, OSError: Si le processus s'arrête pendant le parsing
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                raise TimeoutError()
+            message = self.conn.recv()
+            if message[0] == "page":
+                self.pages.append(message[1])
+            elif message[0] == "profile":
+                profile.add_stats(message[1])
+            else:
+                return message
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass  # processus déjà arrêté
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class ParserPool:
+    """
+    Pool de `size` processus de parsing, créés à la demande.
+    extract_text est bloquant : il est appelé depuis un thread (run_in_threadpool).
+    """
+
+    def __init__(self, size: int, memory_limit_mb: int = PARSER_MEMORY_LIMIT_MB,
+                 max_docs: int = PARSER_MAX_DOCS, max_rss_mb: int = PARSER_MAX_RSS_MB,
+                 start_method: str = PARSER_START_METHOD, doc_timeout: float = PARSE_DOC_TIMEOUT):
+        self.doc_timeout = doc_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_docs = max_docs
+        self.max_rss_mb = max_rss_mb
+        self._context = multiprocessing.get_context(start_method)
+        # Démarré avant les processus de parsing pour leur être commun : il
+        # supprime les segments de mémoire partagée si l'API meurt
+        resource_tracker.ensure_running()
+        if start_method == "forkserver":
+            # Les bibliothèques de parsing sont importées une fois dans le serveur
+            self._context.set_forkserver_preload(["services.pipeline", "pdfplumber", "docx"])
+        # Emplacements libres : None tant que le processus n'est pas créé
+        self._idle: "queue.Queue[Optional[ParserWorker]]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def extract_text(self, handle: SourceHandle, file_extension: str, profile: Optional[RequestProfile] = None,
+                     fields: Optional[Tuple[str, ...]] = None) -> str:
+        """
+        Équivalent de pipeline.extract_text, exécuté dans un processus du pool.
+        `handle` est un chemin ou la référence d'un segment de mémoire partagée
+        (UploadBuffer.handle), qui reste à la charge de l'appelant.
+        Si `profile` est fourni, le parsing est profilé dans le processus.
+        Avec `fields`, la lecture s'arrête dès que ces champs sont résolus.
+
+        Raises:
+            ParseTimeoutError: Si le délai du document est dépassé (résultat partiel joint)
+            ParserCrashError: Si le processus s'arrête pendant le parsing du document
+            ParserError: Si le document n'a pas pu être parsé
+        """
+        worker = self._idle.get()
+        try:
+            worker = self._send(worker, handle, file_extension, profile is not None, fields)
+            if worker is None:
+                raise ParserError("Aucun processus de parsing n'a pu recevoir le document")
+            try:
+                status, error, peak, recycle = worker.receive(self.doc_timeout, profile)
+            except TimeoutError:
+                # Seul moyen fiable d'interrompre pdfminer : tuer le processus
+                partial_text = clean_raw_text("".join(worker.pages), file_extension)
+                worker.kill()
+                worker = None
+                RECYCLES_TOTAL.inc(reason="timeout")
+                raise ParseTimeoutError(
+                    f"Délai de parsing dépassé ({self.doc_timeout:g} s)", partial_text
+                )
+            except (EOFError, OSError):
+                # Processus tué pendant le parsing (OOM killer, crash natif...)
+                worker.close()
+                worker = None
+                RECYCLES_TOTAL.inc(reason="crashed")
+                raise ParserCrashError("Le processus de parsing s'est arrêté pendant le traitement du document")
+
+            raw_text = "".join(worker.pages)
+            PEAK_RSS_BYTES.observe(peak)
+            if recycle:
+                worker.close()
+                worker = None
+                RECYCLES_TOTAL.inc(reason=recycle)
+        finally:
+            self._idle.put(worker)
+
+        if status != "ok":
+            raise ParserError(error)
+        cleaned_text = clean_raw_text(raw_text, file_extension)
+        if not cleaned_text:
+            raise ParserError("Aucun texte extrait du fichier")
+        return cleaned_text
+
+    def _send(self, worker: Optional[ParserWorker], *request) -> Optional[ParserWorker]:
+        """
+        Confie le document à `worker` (créé s'il n'existe pas encore). Un
+        processus mort au repos n'est pas imputé au document : il est
+        remplacé et l'envoi retenté une fois.
+
+        Returns:
+            Le processus qui a reçu le document, ou None si l'envoi a échoué deux fois
+        """
+        for _ in range(2):
+            if worker is None:
+                worker = ParserWorker(self._context, self.memory_limit_mb, self.max_docs, self.max_rss_mb)
+            try:
+                worker.send(*request)
+                return worker
+            except (EOFError, OSError):
+                worker.close()
+                worker = None
+                RECYCLES_TOTAL.inc(reason="died_idle")
+        return None
+
+    def close(self) -> None:
+        """Arrête les processus inactifs (appelé à l'arrêt de l'application)"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.close()
+
+
+_parser_pool: Optional[ParserPool] = None
+
+
+def get_parser_pool() -> Optional[ParserPool]:
+    """Pool du processus courant, ou None si désactivé (parsing dans un thread)"""
+    global _parser_pool
+    if PARSER_POOL_ENABLED and _parser_pool is None:
+        _parser_pool = ParserPool(PARSE_CONCURRENCY)
+    return _parser_pool
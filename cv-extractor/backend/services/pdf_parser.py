@@ -1,42 +1,114 @@
-import pdfplumber
-from typing import Optional
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
+# Délai maximal d'extraction d'une page en secondes (0 : pas de délai)
+PARSE_PAGE_TIMEOUT = float(os.getenv("PARSE_PAGE_TIMEOUT", "5"))
 
-def extract_text_from_pdf(file_path: str) -> Optional[str]:
+
+def preload() -> None:
     """
-    Extrait le texte brut d'un fichier PDF.
+    Importe pdfplumber (et sa pile pdfminer/PIL) à l'avance.
+    Appelé par le warm-up pour ne pas payer ce coût au premier upload.
+    """
+    import pdfplumber  # noqa: F401
+
+
+class PageTimeoutError(Exception):
+    """Délai d'extraction d'une page dépassé"""
+
+
+@contextmanager
+def page_deadline(seconds: float):
+    """
+    Interrompt le bloc (PageTimeoutError) au-delà de `seconds` secondes.
+    Repose sur SIGALRM : sans effet hors du thread principal d'un processus
+    (le parsing dans un thread du serveur n'a pas de délai par page).
+    """
+    if seconds <= 0 or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise PageTimeoutError()
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[str]:
+    """
+    Extrait le texte brut d'un PDF page par page.
+    Une page qui dépasse PARSE_PAGE_TIMEOUT est ignorée.
     
     Args:
-        file_path: Chemin vers le fichier PDF
+        file_path: Chemin vers le fichier PDF, ou flux binaire ouvert
         
-    Returns:
-        Le texte extrait ou None si erreur
+    Yields:
+        Le texte de chaque page non vide
         
     Raises:
         Exception: Si le fichier ne peut pas être lu
     """
+    # Import paresseux : pdfplumber est lourd à charger
+    import pdfplumber
+
     try:
-        text = ""
-        
         # Ouvre le PDF avec pdfplumber
         with pdfplumber.open(file_path) as pdf:
             # Parcourt toutes les pages
             for page in pdf.pages:
                 # Extrait le texte de chaque page
-                page_text = page.extract_text()
+                try:
+                    with page_deadline(PARSE_PAGE_TIMEOUT):
+                        page_text = page.extract_text()
+                except PageTimeoutError:
+                    print(f" Page {page.page_number} ignorée : plus de {PARSE_PAGE_TIMEOUT} s d'extraction")
+                    page_text = None
+                finally:
+                    # Libère les objets de mise en page de la page, sinon
+                    # conservés jusqu'à la fermeture du PDF
+                    page.close()
+                    page.get_textmap.cache_clear()
                 if page_text:
-                    text += page_text + "\n"
-        
-        # Vérifie qu'on a bien extrait du texte
-        if not text.strip():
-            raise ValueError("Le PDF ne contient pas de texte extractible")
-            
-        return text
+                    yield page_text + "\n"
         
+    except MemoryError:
+        # Plafond mémoire du processus de parsing atteint : propagé tel quel
+        raise
     except Exception as e:
         raise Exception(f"Erreur lors de l'extraction du PDF : {str(e)}")
 
 
+def extract_text_from_pdf(file_path: str) -> Optional[str]:
+    """
+    Extrait le texte brut d'un fichier PDF.
+    
+    Args:
+        file_path: Chemin vers le fichier PDF, ou flux binaire ouvert
+        
+    Returns:
+        Le texte extrait
+        
+    Raises:
+        Exception: Si le fichier ne peut pas être lu ou ne contient pas de texte
+    """
+    text = "".join(iter_pdf_pages(file_path))
+    
+    # Vérifie qu'on a bien extrait du texte
+    if not text.strip():
+        raise Exception("Erreur lors de l'extraction du PDF : Le PDF ne contient pas de texte extractible")
+        
+    return text
+
+
 def clean_text(text: str) -> str:
     """
     Nettoie le texte extrait :
@@ -0,0 +1,100 @@
+"""
+Pipeline de traitement d'un CV : extraction du texte puis des informations.
+
+Fonctions synchrones (CPU), partagées par l'API et les outils en ligne
+de commande. L'API les exécute hors de la boucle asyncio.
+"""
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from services.pdf_parser import extract_text_from_pdf, iter_pdf_pages, clean_text as clean_pdf_text
+from services.docx_parser import extract_text_from_docx, clean_text as clean_docx_text
+from services.extractor import FieldResolver, extract_cv_info
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx")
+
+# Texte brut de la page précédente relu avec la suivante (email ou numéro
+# coupé par un changement de page)
+RESOLVE_OVERLAP_CHARS = 256
+
+
+def extract_text(file_path: str, file_extension: str, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Extrait et nettoie le texte d'un fichier selon son format.
+
+    Args:
+        file_path: Chemin vers le fichier, ou flux binaire ouvert (mémoire partagée)
+        file_extension: "pdf" ou "docx"
+        fields: Extracteurs demandés (extractor.resolve_fields) : la lecture
+            s'arrête dès qu'ils sont résolus. None : document entier
+
+    Returns:
+        Le texte nettoyé
+
+    Raises:
+        ValueError: Si aucun texte n'a pu être extrait
+    """
+    if fields:
+        chunks = until_resolved(iter_raw_text(file_path, file_extension), file_extension, fields)
+        cleaned_text = clean_raw_text("".join(chunks), file_extension)
+    elif file_extension == "pdf":
+        cleaned_text = clean_pdf_text(extract_text_from_pdf(file_path))
+    else:  # docx
+        cleaned_text = clean_docx_text(extract_text_from_docx(file_path))
+
+    if not cleaned_text:
+        raise ValueError("Aucun texte extrait du fichier")
+
+    return cleaned_text
+
+
+def iter_raw_text(file_path: str, file_extension: str) -> Iterator[str]:
+    """
+    Texte brut du fichier par morceaux : une page pour un PDF, le document
+    entier pour un DOCX. Permet de conserver les pages déjà extraites si
+    le parsing est interrompu.
+    """
+    if file_extension == "pdf":
+        yield from iter_pdf_pages(file_path)
+    else:  # docx
+        yield extract_text_from_docx(file_path)
+
+
+def clean_raw_text(raw_text: str, file_extension: str) -> str:
+    """Nettoie le texte brut assemblé à partir de iter_raw_text"""
+    if file_extension == "pdf":
+        return clean_pdf_text(raw_text)
+    return clean_docx_text(raw_text)
+
+
+def until_resolved(chunks: Iterable[str], file_extension: str, fields: Tuple[str, ...]) -> Iterator[str]:
+    """
+    Transmet les morceaux de texte brut jusqu'à ce que les champs demandés
+    soient résolus, puis arrête la lecture (les pages suivantes ne sont
+    pas parsées). Chaque page n'est nettoyée et analysée qu'une fois, avec
+    la fin de la précédente : le coût reste linéaire en nombre de pages
+    quand un champ est absent du document.
+    """
+    resolver = FieldResolver(fields)
+    if resolver.complete:
+        yield from chunks
+        return
+    tail = ""
+    for chunk in chunks:
+        yield chunk
+        window = clean_raw_text(tail + chunk, file_extension)
+        if resolver.feed(window, len(clean_raw_text(tail, file_extension))):
+            break
+        tail = (tail + chunk)[-RESOLVE_OVERLAP_CHARS:]
+    if hasattr(chunks, "close"):
+        chunks.close()
+
+
+def process_file(file_path: str, file_extension: str) -> Tuple[Dict[str, Optional[str]], str]:
+    """
+    Traite un fichier de bout en bout : texte puis informations du CV.
+
+    Returns:
+        (informations extraites, texte nettoyé à conserver en base)
+    """
+    cleaned_text = extract_text(file_path, file_extension)
+    return extract_cv_info(cleaned_text), cleaned_text
@@ -0,0 +1,153 @@
+"""
+Profilage des requêtes d'upload (cProfile).
+
+Deux modes :
+- à la demande : une requête portant l'en-tête `X-Profile-Token` égal à
+  PROFILING_TOKEN est profilée, le profil est enregistré et son
+  identifiant renvoyé dans l'en-tête `X-Profile-Id` ;
+- échantillonnage continu : une fraction PROFILE_SAMPLE_RATE des requêtes
+  est profilée et seuls les profils des PROFILE_KEEP_SLOWEST requêtes les
+  plus lentes sont conservés sur disque.
+
+Le parsing ayant lieu dans un processus du pool, le profil de ce processus
+est renvoyé à l'API et fusionné avec celui de l'extraction : un seul
+fichier pstats couvre pdfplumber et les regex.
+Lecture : `python -m pstats profiles/<id>.pstats` ou GET /api/v1/profiles/<id>.
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Profilage à la demande : désactivé tant qu'aucun jeton n'est configuré
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# Échantillonnage continu (0 : désactivé)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_KEEP_SLOWEST = int(os.getenv("PROFILE_KEEP_SLOWEST", "20"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+
+# Identifiants de profils : "request_<horodatage>_<id>" ou "slow_<ms>_<id>"
+PROFILE_ID_PATTERN = re.compile(r"^(request|slow)_\d+_[0-9a-f]{12}$")
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Le jeton fourni correspond au jeton de profilage configuré"""
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+def should_sample() -> bool:
+    """Tirage de l'échantillonnage continu"""
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class _RawStats:
+    """Adaptateur : pstats.Stats accepte tout objet exposant create_stats() et stats"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def collect_stats(func: Callable, *args) -> tuple:
+    """
+    Exécute func sous cProfile dans le processus courant.
+
+    Returns:
+        (résultat, statistiques brutes sérialisables)
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+class RequestProfile:
+    """
+    Profil d'une requête : statistiques cProfile accumulées depuis un ou
+    plusieurs processus.
+    """
+
+    def __init__(self):
+        self._stats: Optional[pstats.Stats] = None
+
+    def add_stats(self, raw_stats: Dict) -> None:
+        """Ajoute les statistiques brutes d'un autre processus (pool de parsing)"""
+        if self._stats is None:
+            self._stats = pstats.Stats(_RawStats(raw_stats))
+        else:
+            self._stats.add(_RawStats(raw_stats))
+
+    def call(self, func: Callable, *args):
+        """Exécute func sous le profileur (dans le thread courant)"""
+        result, raw_stats = collect_stats(func, *args)
+        self.add_stats(raw_stats)
+        return result
+
+    def save(self, profile_id: str) -> Path:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{profile_id}.pstats"
+        if self._stats is not None:
+            self._stats.dump_stats(path)
+        return path
+
+
+def save_on_demand(profile: RequestProfile) -> str:
+    """Enregistre le profil d'une requête demandée par un administrateur"""
+    profile_id = f"request_{int(time.time())}_{uuid.uuid4().hex[:12]}"
+    profile.save(profile_id)
+    return profile_id
+
+
+def keep_if_slow(profile: RequestProfile, duration: float) -> Optional[str]:
+    """
+    Conserve le profil s'il fait partie des PROFILE_KEEP_SLOWEST requêtes
+    les plus lentes. La durée est dans le nom du fichier : l'état est porté
+    par le dossier lui-même, partagé par tous les workers. Une requête
+    servie par un cache n'a rien profilé : aucun profil n'est écrit ni supprimé.
+    """
+    if profile._stats is None:
+        return None
+    duration_ms = int(duration * 1000)
+    kept = sorted(PROFILE_DIR.glob("slow_*.pstats"), key=lambda path: int(path.stem.split("_")[1]))
+    if len(kept) >= PROFILE_KEEP_SLOWEST and kept and duration_ms <= int(kept[0].stem.split("_")[1]):
+        return None
+
+    profile_id = f"slow_{duration_ms:09d}_{uuid.uuid4().hex[:12]}"
+    profile.save(profile_id)
+    for path in kept[:max(0, len(kept) + 1 - PROFILE_KEEP_SLOWEST)]:
+        path.unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles() -> List[str]:
+    """Identifiants des profils enregistrés (les plus récents d'abord)"""
+    paths = sorted(PROFILE_DIR.glob("*.pstats"), key=lambda path: path.stat().st_mtime, reverse=True)
+    return [path.stem for path in paths]
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Chemin du profil, ou None si l'identifiant est invalide ou inconnu"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = PROFILE_DIR / f"{profile_id}.pstats"
+    return path if path.exists() else None
+
+
+def render_summary(path: Path, limit: int = 40) -> str:
+    """Fonctions les plus coûteuses (temps cumulé), au format texte de pstats"""
+    output = io.StringIO()
+    pstats.Stats(str(path), stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,39 @@
+"""
+Moteur d'expressions régulières de l'extraction.
+
+Les CV uploadés ne sont pas fiables : avec le module `re` (retour arrière),
+certains patterns peuvent coûter un temps quadratique sur un texte
+construit pour (longues suites de "a.a.a." sans "@" pour le pattern
+d'email). Deux protections :
+- les cas à risque sont traités par des scanners en temps linéaire
+  (services/scanners.py), quel que soit le moteur ;
+- REGEX_ENGINE=re2 compile les autres patterns avec google-re2 (automate,
+  temps linéaire garanti). Ils n'utilisent donc que la syntaxe commune aux
+  deux moteurs : ni lookaround, ni référence arrière.
+
+Si google-re2 n'est pas installé, le module `re` est utilisé.
+"""
+import os
+import re
+
+try:
+    import re2
+except ImportError:  # moteur re uniquement
+    re2 = None
+
+REGEX_ENGINE = os.getenv("REGEX_ENGINE", "re").lower()
+
+if REGEX_ENGINE == "re2" and re2 is None:
+    print(" REGEX_ENGINE=re2 mais google-re2 n'est pas installé : module re utilisé")
+
+
+def active_engine() -> str:
+    """Moteur effectivement utilisé : "re2" ou "re" """
+    return "re2" if REGEX_ENGINE == "re2" and re2 is not None else "re"
+
+
+def compile(pattern: str):
+    """Compile un pattern avec le moteur configuré (même interface que re.Pattern)"""
+    if active_engine() == "re2":
+        return re2.compile(pattern)
+    return re.compile(pattern)
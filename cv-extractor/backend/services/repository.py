@@ -0,0 +1,555 @@
+"""
+Accès en écriture à la table cv_extractions.
+
+Les extractions sont enregistrées par upsert : un seul
+`INSERT ... ON CONFLICT (candidate_key) DO UPDATE` fusionne le nouvel
+upload dans la ligne existante du candidat (PostgreSQL et SQLite).
+
+Le texte normalisé du CV est conservé (compressé) avec la version de
+l'extracteur : `reprocess.py` ré-extrait les lignes obsolètes sans
+reparser les fichiers.
+
+Chaque écriture incrémente la version de la table (table_versions) dans
+la même transaction : c'est l'ETag de l'historique.
+
+La signature MinHash du texte est stockée avec la ligne ; celle des CV
+d'origine est indexée par bandes (cv_minhash_bands) : un nouvel upload
+proche d'un CV existant est lié à ce CV (duplicate_of) ou fusionné dans
+sa ligne selon NEAR_DUPLICATE_MODE (voir services/minhash.py). Seuls les
+CV d'origine étant indexés, un bucket ne grossit pas avec les versions
+d'un même CV.
+
+Les compteurs de statistiques (services/stats.py) sont mis à jour dans la
+même transaction : cv_stats_daily à chaque upload, cv_stats_totals par
+différence entre l'état des lignes avant et après chaque écriture.
+"""
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from models.cv_database import CVExtraction, MinHashBand, StatsDaily, StatsTotal, TableVersion
+from services import minhash
+from services.extractor import EXTRACTOR_VERSION, NOT_FOUND
+from services.locales import LOCALE_SPECS, LocalePack, get_pack
+from services.normalize import normalize_email, normalize_phone_e164, candidate_key
+
+# Champs extraits : une nouvelle valeur "Non trouvé" ne remplace pas une valeur connue
+MERGED_FIELDS = ("first_name", "last_name", "email", "phone", "degree", "email_normalized", "phone_e164")
+# Champs structurés du diplôme : remplacés en bloc avec le diplôme
+DEGREE_FIELDS = ("degree_level", "degree_label", "degree_field")
+# Champs produits par extract_cv_info (hors diplôme structuré)
+EXTRACTED_FIELDS = ("first_name", "last_name", "email", "phone", "degree")
+# Champs dont les statistiques comptent les "Non trouvé"
+STATS_FIELDS = EXTRACTED_FIELDS
+# Colonnes qui déterminent la contribution d'une ligne aux statistiques
+STATS_COLUMNS = [CVExtraction.__table__.c[field] for field in STATS_FIELDS + ("degree_label",)]
+
+
+def compress_text(text: str) -> bytes:
+    """Texte normalisé compressé pour le stockage en base"""
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _insert(db: Session, model=CVExtraction):
+    """Retourne la construction INSERT propre au dialecte (ON CONFLICT)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert non supporté pour le dialecte {dialect}")
+    return insert(model)
+
+
+def bump_version(db: Session, table_name: str = CVExtraction.__tablename__) -> None:
+    """Incrémente la version de la table (ne commit pas)"""
+    statement = _insert(db, TableVersion).values(table_name=table_name, version=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[TableVersion.table_name],
+        set_={"version": TableVersion.version + 1}
+    ))
+
+
+def lock_candidate_keys(db: Session, keys: Iterable[str]) -> None:
+    """
+    Sérialise les écritures concurrentes d'un même candidat jusqu'à la fin
+    de la transaction (ne commit pas).
+
+    Un SELECT ... FOR UPDATE ne verrouille que les lignes existantes : deux
+    uploads simultanés d'un nouveau candidat liraient tous deux un état
+    "avant" vide et compteraient deux fois sa contribution. Sous PostgreSQL,
+    un verrou consultatif par clé (pris dans l'ordre des clés, sans
+    interblocage) couvre aussi les clés absentes. Sous SQLite, la base
+    entière est déjà verrouillée en écriture par le premier INSERT de la
+    transaction (record_upload_stats).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for key in sorted(set(keys)):
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+
+def stats_contributions(row: Mapping) -> Counter:
+    """
+    Contribution d'une ligne aux compteurs : {(metric, value): nombre}.
+    Un champ à None n'a pas été demandé (analyse sélective) : il ne compte
+    ni comme extrait ni comme "Non trouvé".
+    """
+    counts = Counter({("cvs", ""): 1})
+    for field in STATS_FIELDS:
+        if row[field] is None:
+            continue
+        counts[("extracted", field)] += 1
+        if row[field] == NOT_FOUND:
+            counts[("missing", field)] += 1
+    if row["degree"] is not None:
+        counts[("degree", row["degree_label"] or NOT_FOUND)] += 1
+    return counts
+
+
+def _add_counts(db: Session, model, values: List[Dict]) -> None:
+    """Ajoute des deltas aux compteurs (upsert count = count + delta, ne commit pas)"""
+    if not values:
+        return
+    statement = _insert(db, model).values(values)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns),
+        set_={"count": model.count + statement.excluded["count"]}
+    ))
+
+
+def record_upload_stats(db: Session, rows: List[Dict]) -> None:
+    """Compte les uploads du lot dans cv_stats_daily, au jour de chaque upload (ne commit pas)"""
+    counts = Counter()
+    for row in rows:
+        day = row["last_seen_at"].date()
+        counts[(day, "uploads", "")] += 1
+        for (metric, value), count in stats_contributions(row).items():
+            if metric != "cvs":
+                counts[(day, metric, value)] += count
+    # Ordre stable des clés : deux transactions verrouillent les compteurs dans le même ordre
+    _add_counts(db, StatsDaily, [
+        {"day": day, "metric": metric, "value": value, "count": count}
+        for (day, metric, value), count in sorted(counts.items())
+    ])
+
+
+def update_totals(db: Session, before: Iterable[Mapping], after: Iterable[Mapping]) -> None:
+    """Met à jour cv_stats_totals par différence entre l'état des lignes avant et après écriture (ne commit pas)"""
+    delta = Counter()
+    for row in after:
+        delta.update(stats_contributions(row))
+    for row in before:
+        delta.subtract(stats_contributions(row))
+    _add_counts(db, StatsTotal, [
+        {"metric": metric, "value": value, "count": count}
+        for (metric, value), count in sorted(delta.items()) if count
+    ])
+
+
+def rebuild_stats(db: Session) -> None:
+    """
+    Recalcule cv_stats_totals depuis cv_extractions (ne commit pas).
+    cv_stats_daily n'est pas recalculée : les uploads fusionnés ne sont plus
+    distingués dans cv_extractions.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Les écritures concurrentes appliquent leur delta après le recalcul
+        db.execute(text(f"LOCK TABLE {StatsTotal.__tablename__} IN EXCLUSIVE MODE"))
+    # Même règle que stats_contributions : None = champ non demandé
+    columns = STATS_COLUMNS[:len(STATS_FIELDS)]
+    extracted = [func.count(column) for column in columns]
+    missing = [func.sum(case((column == NOT_FOUND, 1), else_=0)) for column in columns]
+    totals = db.execute(select(func.count(), *extracted, *missing).select_from(CVExtraction)).one()
+    counts = Counter({("cvs", ""): totals[0]})
+    for field, extracted_count, missing_count in zip(
+        STATS_FIELDS, totals[1:1 + len(STATS_FIELDS)], totals[1 + len(STATS_FIELDS):]
+    ):
+        counts[("extracted", field)] = extracted_count or 0
+        counts[("missing", field)] = missing_count or 0
+    for label, count in db.execute(
+        select(CVExtraction.degree_label, func.count())
+        .where(CVExtraction.degree.isnot(None)).group_by(CVExtraction.degree_label)
+    ):
+        counts[("degree", label or NOT_FOUND)] += count
+
+    db.execute(delete(StatsTotal))
+    values = [
+        {"metric": metric, "value": value, "count": count}
+        for (metric, value), count in sorted(counts.items()) if count
+    ]
+    if values:
+        db.execute(StatsTotal.__table__.insert(), values)
+
+
+def phone_pack(cv_data: Mapping) -> Optional[LocalePack]:
+    """Pack de la locale du CV, dont les règles normalisent le téléphone (None : locale par défaut)"""
+    locale = cv_data.get("locale")
+    return get_pack(locale) if locale in LOCALE_SPECS else None
+
+
+def candidate_identity(cv_data: Mapping) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Email normalisé, téléphone E.164 et clé candidat d'un résultat d'extraction"""
+    email_normalized = normalize_email(cv_data.get("email"))
+    phone_e164 = normalize_phone_e164(cv_data.get("phone"), phone_pack(cv_data))
+    return email_normalized, phone_e164, candidate_key(email_normalized, phone_e164)
+
+
+def build_row(cv_data: Dict[str, Optional[str]], filename: str, seen_at: Optional[datetime] = None,
+              text: Optional[str] = None) -> Dict:
+    """
+    Prépare une ligne cv_extractions à partir du résultat d'extraction.
+    `text` est le texte nettoyé dont le résultat est issu (absent si le
+    résultat vient du cache : le texte déjà stocké est alors conservé).
+    """
+    seen_at = seen_at or datetime.utcnow()
+    signature = minhash.compute_signature(text)
+    email_normalized, phone_e164, key = candidate_identity(cv_data)
+    return {
+        "first_name": cv_data.get("first_name"),
+        "last_name": cv_data.get("last_name"),
+        "email": cv_data.get("email"),
+        "phone": cv_data.get("phone"),
+        "degree": cv_data.get("degree"),
+        "degree_level": cv_data.get("degree_level"),
+        "degree_label": cv_data.get("degree_label"),
+        "degree_field": cv_data.get("degree_field"),
+        "filename": filename,
+        "email_normalized": email_normalized,
+        "phone_e164": phone_e164,
+        "candidate_key": key,
+        "upload_count": 1,
+        "created_at": seen_at,
+        "last_seen_at": seen_at,
+        "normalized_text": compress_text(text) if text else None,
+        "extractor_version": EXTRACTOR_VERSION,
+        "minhash": minhash.pack(signature) if signature else None,
+        "duplicate_of": None,
+    }
+
+
+def _is_known(value) -> bool:
+    return value is not None and value != NOT_FOUND
+
+
+def _merge_batch(rows: List[Dict]) -> List[Dict]:
+    """
+    Fusionne les lignes d'un même candidat au sein d'un lot.
+    PostgreSQL refuse qu'un même INSERT ... ON CONFLICT touche deux fois la même ligne.
+    """
+    merged: Dict[str, Dict] = {}
+    result = []
+    for row in rows:
+        key = row["candidate_key"]
+        if key is None:
+            result.append(row)
+            continue
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(row)
+            result.append(merged[key])
+            continue
+        for field in MERGED_FIELDS:
+            if _is_known(row.get(field)):
+                current[field] = row[field]
+        if _is_known(row.get("degree")):
+            for field in DEGREE_FIELDS:
+                current[field] = row[field]
+        if row["normalized_text"] is not None:
+            current["normalized_text"] = row["normalized_text"]
+            current["minhash"] = row["minhash"]
+        current["filename"] = row["filename"]
+        current["extractor_version"] = row["extractor_version"]
+        current["upload_count"] += row["upload_count"]
+        current["last_seen_at"] = max(current["last_seen_at"], row["last_seen_at"])
+    return result
+
+
+def find_near_duplicates(db: Session, rows: List[Dict]) -> List[Optional[Tuple[int, Optional[str]]]]:
+    """
+    Cherche dans l'index LSH (CV d'origine uniquement) le CV dont chaque
+    ligne est une version : une lecture d'index pour tout le lot, puis les
+    signatures des seuls candidats.
+    Les lignes du même candidat (même clé) sont ignorées : l'upsert les
+    fusionne déjà.
+
+    Returns:
+        Pour chaque ligne : (id du CV d'origine, sa clé candidat), ou None
+    """
+    buckets = [
+        minhash.band_buckets(minhash.unpack(row["minhash"])) if row.get("minhash") else []
+        for row in rows
+    ]
+    wanted = {bucket for row_buckets in buckets for bucket in row_buckets}
+    if not wanted:
+        return [None] * len(rows)
+
+    # Une condition par bande (band = ? AND bucket IN (...)) : SQLite
+    # n'utilise pas la clé primaire pour un IN sur (band, bucket)
+    by_band: Dict[int, List[int]] = {}
+    for band, bucket in wanted:
+        by_band.setdefault(band, []).append(bucket)
+    matches: Dict[Tuple[int, int], List[int]] = {}
+    for band, bucket, cv_id in db.execute(
+        select(MinHashBand.band, MinHashBand.bucket, MinHashBand.cv_id)
+        .where(or_(*(
+            and_(MinHashBand.band == band, MinHashBand.bucket.in_(band_buckets))
+            for band, band_buckets in sorted(by_band.items())
+        )))
+    ):
+        matches.setdefault((band, bucket), []).append(cv_id)
+    candidate_ids = {cv_id for ids in matches.values() for cv_id in ids}
+    if not candidate_ids:
+        return [None] * len(rows)
+    candidates = {
+        row.id: row for row in db.execute(
+            select(CVExtraction.id, CVExtraction.minhash, CVExtraction.candidate_key)
+            .where(CVExtraction.id.in_(candidate_ids))
+        )
+    }
+
+    results = []
+    for row, row_buckets in zip(rows, buckets):
+        best, best_similarity = None, minhash.NEAR_DUPLICATE_THRESHOLD
+        ids = {cv_id for bucket in row_buckets for cv_id in matches.get(bucket, ())}
+        for cv_id in sorted(ids):
+            candidate = candidates.get(cv_id)
+            if candidate is None or candidate.minhash is None:
+                continue
+            if row["candidate_key"] is not None and candidate.candidate_key == row["candidate_key"]:
+                continue
+            score = minhash.similarity(minhash.unpack(row["minhash"]), minhash.unpack(candidate.minhash))
+            if score >= best_similarity:
+                best, best_similarity = candidate, score
+        results.append((best.id, best.candidate_key) if best is not None else None)
+    return results
+
+
+def link_near_duplicates(db: Session, rows: List[Dict]) -> None:
+    """
+    Rattache les lignes qui sont des versions d'un CV existant (modifie
+    les lignes) : lien duplicate_of, ou fusion dans la ligne d'origine en
+    mode "merge" (si elle a une clé candidat).
+    """
+    if minhash.NEAR_DUPLICATE_MODE not in ("flag", "merge"):
+        return
+    for row, found in zip(rows, find_near_duplicates(db, rows)):
+        if found is None:
+            continue
+        root_id, root_key = found
+        if minhash.NEAR_DUPLICATE_MODE == "merge" and root_key is not None:
+            row["candidate_key"] = root_key
+        else:
+            row["duplicate_of"] = root_id
+
+
+def index_signatures(db: Session, cv_ids: List[int]) -> None:
+    """
+    Réécrit les bandes LSH des lignes à partir de leur signature stockée,
+    pour les CV d'origine uniquement (ne commit pas).
+    """
+    if not cv_ids:
+        return
+    db.execute(delete(MinHashBand).where(MinHashBand.cv_id.in_(cv_ids)))
+    bands = [
+        {"band": band, "bucket": bucket, "cv_id": cv_id}
+        for cv_id, data in db.execute(
+            select(CVExtraction.id, CVExtraction.minhash)
+            .where(CVExtraction.id.in_(cv_ids), CVExtraction.minhash.isnot(None),
+                   CVExtraction.duplicate_of.is_(None))
+        )
+        for band, bucket in minhash.band_buckets(minhash.unpack(data))
+    ]
+    if bands:
+        db.execute(MinHashBand.__table__.insert(), bands)
+
+
+def _unlink_versions(db: Session, cv_ids: List[int]) -> None:
+    """Supprime les bandes des lignes supprimées ; leurs versions deviennent des CV d'origine"""
+    db.execute(delete(MinHashBand).where(MinHashBand.cv_id.in_(cv_ids)))
+    versions = list(db.scalars(select(CVExtraction.id).where(CVExtraction.duplicate_of.in_(cv_ids))))
+    if versions:
+        db.execute(
+            update(CVExtraction).where(CVExtraction.id.in_(versions))
+            .values(duplicate_of=None).execution_options(synchronize_session=False)
+        )
+        index_signatures(db, versions)
+
+
+def upsert_rows(db: Session, rows: List[Dict]) -> List[int]:
+    """
+    Enregistre un lot de lignes en une seule requête INSERT ... ON CONFLICT DO UPDATE.
+    Les versions d'un CV existant sont d'abord rattachées (link_near_duplicates),
+    puis les bandes LSH des lignes écrites sont mises à jour.
+    Ne commit pas : la transaction est gérée par l'appelant.
+
+    Returns:
+        Les identifiants des lignes insérées ou mises à jour
+    """
+    return [row["id"] for row in _upsert(db, rows)]
+
+
+def _upsert(db: Session, rows: List[Dict]) -> List[Mapping]:
+    """
+    Corps de upsert_rows.
+
+    Le lien duplicate_of est fixé à la création de la ligne : un nouvel
+    upload d'un candidat existant ne le modifie pas (une ligne d'origine
+    indexée ne devient pas une version, une version garde son CV d'origine).
+
+    Returns:
+        Pour chaque ligne écrite : id, duplicate_of enregistré et colonnes des statistiques
+    """
+    link_near_duplicates(db, rows)
+    record_upload_stats(db, rows)
+    rows = _merge_batch(rows)
+    if not rows:
+        return []
+
+    # État avant écriture des lignes existantes, pour la différence des statistiques
+    keys = [row["candidate_key"] for row in rows if row["candidate_key"] is not None]
+    lock_candidate_keys(db, keys)
+    before = db.execute(
+        select(*STATS_COLUMNS).where(CVExtraction.candidate_key.in_(keys)).with_for_update()
+    ).mappings().all() if keys else []
+
+    table = CVExtraction.__table__
+    statement = _insert(db).values(rows)
+    excluded = statement.excluded
+
+    updates = {
+        field: case(
+            (or_(excluded[field].is_(None), excluded[field] == NOT_FOUND), table.c[field]),
+            else_=excluded[field]
+        )
+        for field in MERGED_FIELDS
+    }
+    degree_unknown = or_(excluded.degree.is_(None), excluded.degree == NOT_FOUND)
+    updates.update({
+        field: case((degree_unknown, table.c[field]), else_=excluded[field])
+        for field in DEGREE_FIELDS
+    })
+    updates.update(
+        normalized_text=case(
+            (excluded.normalized_text.is_(None), table.c.normalized_text),
+            else_=excluded.normalized_text
+        ),
+        minhash=case(
+            (excluded.minhash.is_(None), table.c.minhash),
+            else_=excluded.minhash
+        ),
+        extractor_version=excluded.extractor_version,
+        filename=excluded.filename,
+        upload_count=table.c.upload_count + excluded.upload_count,
+        last_seen_at=excluded.last_seen_at,
+    )
+
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.candidate_key],
+        set_=updates
+    ).returning(table.c.id, table.c.duplicate_of, *STATS_COLUMNS)
+    after = db.execute(statement).mappings().all()
+    update_totals(db, before, after)
+    if any(row["minhash"] is not None for row in rows):
+        index_signatures(db, [row["id"] for row in after])
+    bump_version(db)
+    return after
+
+
+def record_upload(db: Session, cv_data: Dict[str, Optional[str]], filename: str,
+                  text: Optional[str] = None) -> Tuple[int, Optional[int]]:
+    """
+    Enregistre le résultat d'un upload (fusionné avec le candidat existant) et commit.
+
+    Returns:
+        (identifiant de la ligne du candidat, CV d'origine dont elle est une version ou None)
+    """
+    written = _upsert(db, [build_row(cv_data, filename, text=text)])[0]
+    db.commit()
+    # Lien enregistré (celui de la ligne existante si le candidat est connu)
+    return written["id"], written["duplicate_of"]
+
+
+def save_extraction(db: Session, cv_data: Dict[str, Optional[str]], filename: str,
+                    text: Optional[str] = None) -> int:
+    """
+    Enregistre le résultat d'un upload (fusionné avec le candidat existant) et commit.
+
+    Returns:
+        L'identifiant de la ligne du candidat
+    """
+    return record_upload(db, cv_data, filename, text)[0]
+
+
+def reextracted_values(row: Dict, cv_data: Dict[str, Optional[str]]) -> Dict:
+    """
+    Nouvelles valeurs d'une ligne existante après ré-extraction de son texte.
+
+    Une ligne issue d'un seul upload prend le nouveau résultat tel quel.
+    Pour une ligne fusionnée, le texte stocké n'est que celui du dernier
+    upload : comme pour l'upsert, "Non trouvé" ne remplace pas une valeur
+    connue. La clé candidat n'est pas recalculée (identité de la ligne stable).
+
+    Args:
+        row: Valeurs actuelles (id, upload_count et champs extraits)
+        cv_data: Résultat de extract_cv_info sur le texte stocké
+    """
+    replace_all = row["upload_count"] <= 1
+    values = {"id": row["id"], "extractor_version": EXTRACTOR_VERSION}
+    for field in EXTRACTED_FIELDS:
+        values[field] = cv_data[field] if replace_all or _is_known(cv_data[field]) else row[field]
+    for field in DEGREE_FIELDS:
+        values[field] = cv_data[field] if replace_all or _is_known(cv_data["degree"]) else row[field]
+    values["email_normalized"] = normalize_email(values["email"])
+    values["phone_e164"] = normalize_phone_e164(values["phone"], phone_pack(cv_data))
+    return values
+
+
+def delete_extraction(db: Session, cv_id: int) -> bool:
+    """
+    Supprime la ligne d'un candidat et commit.
+
+    Returns:
+        False si aucune ligne ne porte cet identifiant
+    """
+    deleted = db.execute(
+        delete(CVExtraction).where(CVExtraction.id == cv_id).returning(*STATS_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).mappings().all()
+    if deleted:
+        _unlink_versions(db, [cv_id])
+        update_totals(db, deleted, [])
+        bump_version(db)
+    db.commit()
+    return len(deleted) > 0
+
+
+def delete_extractions(db: Session, cv_ids: Iterable[int]) -> int:
+    """
+    Supprime plusieurs candidats en une requête et commit.
+
+    Returns:
+        Le nombre de lignes supprimées (les identifiants inconnus sont ignorés)
+    """
+    cv_ids = list(set(cv_ids))
+    if not cv_ids:
+        return 0
+    deleted = db.execute(
+        delete(CVExtraction).where(CVExtraction.id.in_(cv_ids)).returning(*STATS_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).mappings().all()
+    if deleted:
+        _unlink_versions(db, cv_ids)
+        update_totals(db, deleted, [])
+        bump_version(db)
+    db.commit()
+    return len(deleted)
@@ -0,0 +1,127 @@
+"""
+Cache des résultats d'extraction, partagé entre les workers.
+
+Le cache est stocké dans un fichier SQLite (mode WAL) : tous les
+processus du serveur (workers gunicorn/uvicorn) voient donc les mêmes
+entrées, au lieu d'avoir chacun un cache en mémoire séparé.
+La clé est le hash SHA-256 du contenu du fichier uploadé.
+
+Le même mécanisme sert de cache "poison" (TTL court) : les fichiers dont
+le parsing a dépassé le délai y sont inscrits, un nouvel upload du même
+fichier est refusé immédiatement au lieu de bloquer un slot de parsing.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Configuration du cache
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "cache/results.sqlite3")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "86400"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+
+# Fichiers en échec de parsing (délai dépassé)
+POISON_CACHE_PATH = os.getenv("POISON_CACHE_PATH", "cache/poison.sqlite3")
+POISON_CACHE_TTL = int(os.getenv("POISON_CACHE_TTL", "600"))
+
+# Nettoyage des entrées expirées toutes les N écritures
+_PRUNE_EVERY = 100
+
+
+class ResultCache:
+    """
+    Cache clé/valeur sur disque, sûr entre processus et entre threads.
+
+    Chaque processus ouvre ses propres connexions SQLite, à la demande :
+    aucune connexion n'est partagée à travers un fork.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (recréée après un fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retourne la valeur associée à la clé, ou None si absente/expirée"""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict, ttl_seconds: Optional[int] = None) -> None:
+        """Enregistre une valeur (écrase l'entrée existante)"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Supprime les entrées expirées puis les plus anciennes au-delà de la limite"""
+        conn = self._connection()
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM entries WHERE key IN ("
+            " SELECT key FROM entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Retourne le cache de résultats du processus, ou None s'il est désactivé.
+    """
+    global _cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+_poison_cache: Optional[ResultCache] = None
+
+
+def get_poison_cache() -> Optional[ResultCache]:
+    """
+    Retourne le cache des fichiers en échec de parsing, ou None si désactivé
+    (POISON_CACHE_TTL=0).
+    """
+    global _poison_cache
+    if POISON_CACHE_TTL <= 0:
+        return None
+    if _poison_cache is None:
+        _poison_cache = ResultCache(POISON_CACHE_PATH, POISON_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES)
+    return _poison_cache
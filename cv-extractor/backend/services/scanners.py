@@ -0,0 +1,97 @@
+"""
+Scanners écrits à la main pour les patterns d'extraction à risque.
+
+Chaque caractère du texte est lu un nombre borné de fois : le coût est
+linéaire quelle que soit l'entrée, y compris un texte construit pour
+faire exploser le retour arrière du module `re` (voir
+benchmarks/bench_adversarial.py). Les résultats sont ceux des patterns
+d'origine, rappelés dans chaque docstring.
+"""
+import re
+import string
+from typing import Optional
+
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+ASCII_LETTERS = frozenset(string.ascii_letters)
+
+# Une suite d'espaces est trouvée en une passe, sans retour arrière
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def _is_word(char: str) -> bool:
+    # Équivalent de \w (Unicode)
+    return char.isalnum() or char == "_"
+
+
+def _is_boundary(text: str, position: int) -> bool:
+    # Équivalent de \b
+    before = position > 0 and _is_word(text[position - 1])
+    after = position < len(text) and _is_word(text[position])
+    return before != after
+
+
+def find_email(text: str) -> Optional[str]:
+    """
+    Première adresse email du texte, comme
+    `\\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}\\b`.
+
+    Pour chaque "@" : la partie locale est la suite de caractères autorisés
+    qui le précède (à partir de la première frontière de mot), le domaine
+    la suite qui le suit, terminée par le dernier "." suivi d'au moins
+    deux lettres et d'une frontière de mot. Les parties locales et les
+    domaines de deux "@" successifs ne se chevauchent pas au-delà de l'un
+    d'eux : chaque caractère est lu au plus quelques fois.
+    """
+    length = len(text)
+    at = text.find("@")
+    while at != -1:
+        local_start = at
+        while local_start > 0 and text[local_start - 1] in EMAIL_LOCAL_CHARS:
+            local_start -= 1
+        start = next((position for position in range(local_start, at) if _is_boundary(text, position)), None)
+
+        domain_start = domain_end = at + 1
+        while domain_end < length and text[domain_end] in EMAIL_DOMAIN_CHARS:
+            domain_end += 1
+
+        if start is not None:
+            # Dernier "." (au moins un caractère avant, deux lettres après) qui convient
+            dot = text.rfind(".", domain_start + 1, domain_end - 2)
+            while dot != -1:
+                end = dot + 1
+                while end < domain_end and text[end] in ASCII_LETTERS:
+                    end += 1
+                if end - dot > 2 and (end == length or not _is_word(text[end])):
+                    return text[start:end]
+                dot = text.rfind(".", domain_start + 1, dot)
+
+        at = text.find("@", at + 1)
+    return None
+
+
+def _is_spaced_letter(char: str) -> bool:
+    # Équivalent de [A-ZÀ-Ÿa-zà-ÿ]
+    return "A" <= char <= "Z" or "a" <= char <= "z" or "À" <= char <= "Ÿ"
+
+
+def remove_letter_spacing(text: str) -> str:
+    """
+    Supprime les espaces entre lettres isolées ("Y a n n" -> "Yann"), comme
+    `re.sub(r'(?<=[A-ZÀ-Ÿa-zà-ÿ])\\s+(?=[A-ZÀ-Ÿa-zà-ÿ](?:\\s|$))', '', text)`,
+    en examinant chaque suite d'espaces une seule fois.
+    """
+    length = len(text)
+    parts = []
+    last = 0
+    for match in _WHITESPACE_RUN.finditer(text):
+        start, end = match.span()
+        if (
+            start > 0 and _is_spaced_letter(text[start - 1])
+            and end < length and _is_spaced_letter(text[end])
+            and (end + 1 == length or text[end + 1].isspace())
+        ):
+            parts.append(text[last:start])
+            last = end
+    parts.append(text[last:])
+    return "".join(parts)
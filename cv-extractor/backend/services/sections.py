@@ -0,0 +1,165 @@
+"""
+Découpage d'un CV en sections (Formation, Expérience, Compétences...).
+
+Les titres de sections sont trouvés en une passe par un automate
+d'Aho-Corasick, puis l'index des positions permet aux extracteurs de ne
+lire que la partie utile du CV : le diplôme dans la formation (et pas le
+"Scrum Master" d'une expérience), les coordonnées dans l'en-tête.
+
+Le texte nettoyé tient souvent sur une seule ligne : un mot-clé n'est un
+titre que s'il est écrit en majuscules, suivi de ":", en début de ligne,
+ou s'il n'est pas précédé d'un mot en minuscules (phrase en cours).
+
+Les titres français et anglais valent pour tous les CV ; ceux des autres
+langues (LOCALE_SECTION_HEADINGS) n'entrent que dans l'automate de leur
+locale, compilé à la première demande : un CV français garde l'automate
+qu'il avait, quel que soit le nombre de locales.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from services.keyword_automaton import KeywordAutomaton
+
+# Texte avant le premier titre (nom, coordonnées, accroche)
+HEADER = "header"
+EDUCATION = "education"
+EXPERIENCE = "experience"
+SKILLS = "skills"
+CONTACT = "contact"
+
+SECTION_HEADINGS: Dict[str, tuple] = {
+    EDUCATION: (
+        "Formation", "Formations", "Formation académique", "Formations et diplômes", "Diplômes",
+        "Diplômes et formations", "Cursus", "Parcours académique", "Études", "Scolarité",
+        "Education", "Éducation", "Academic background",
+    ),
+    EXPERIENCE: (
+        "Expérience", "Expériences", "Expérience professionnelle", "Expériences professionnelles",
+        "Parcours professionnel", "Emplois", "Stages", "Experience", "Work experience",
+        "Professional experience", "Employment",
+    ),
+    SKILLS: (
+        "Compétences", "Compétences techniques", "Compétences clés", "Savoir-faire",
+        "Skills", "Technical skills",
+    ),
+    CONTACT: ("Contact", "Coordonnées", "Informations personnelles", "Contact information"),
+    "languages": ("Langues", "Languages"),
+    "interests": ("Centres d'intérêt", "Centres d’intérêt", "Loisirs", "Hobbies", "Interests"),
+    "projects": ("Projets", "Projets personnels", "Projects"),
+    "profile": ("Profil", "Profile", "À propos", "A propos", "Summary", "Objectif"),
+}
+
+# Titres propres à une locale, en plus de SECTION_HEADINGS
+LOCALE_SECTION_HEADINGS: Dict[str, Dict[str, tuple]] = {
+    "de": {
+        EDUCATION: ("Ausbildung", "Bildungsweg", "Studium", "Schulbildung"),
+        EXPERIENCE: ("Berufserfahrung", "Berufliche Erfahrung", "Praktika"),
+        SKILLS: ("Kenntnisse", "Fähigkeiten"),
+        CONTACT: ("Kontakt", "Persönliche Daten"),
+        "languages": ("Sprachen",),
+    },
+    "es": {
+        EDUCATION: ("Formación", "Formación académica", "Educación", "Estudios"),
+        EXPERIENCE: ("Experiencia", "Experiencia laboral", "Experiencia profesional"),
+        SKILLS: ("Habilidades", "Competencias", "Conocimientos"),
+        CONTACT: ("Contacto", "Datos personales"),
+        "languages": ("Idiomas",),
+    },
+}
+
+# Distance maximale entre un titre et le ":" qui le suit
+_COLON_LOOKAHEAD = 3
+
+
+class Section(NamedTuple):
+    name: str
+    heading_start: int  # début du titre (égal à start pour l'en-tête)
+    start: int          # début du contenu, après le titre
+    end: int
+
+
+def load_heading_automaton(locale: Optional[str] = None) -> KeywordAutomaton:
+    """Automate des titres de la locale (fr, en et les locales sans titres propres partagent le même)"""
+    return _build_heading_automaton(locale if locale in LOCALE_SECTION_HEADINGS else None)
+
+
+@lru_cache(maxsize=None)
+def _build_heading_automaton(locale: Optional[str]) -> KeywordAutomaton:
+    """Construit (une fois par processus et par locale) l'automate des titres de sections"""
+    groups = [SECTION_HEADINGS, LOCALE_SECTION_HEADINGS.get(locale, {})]
+    return KeywordAutomaton({
+        heading: name for group in groups for name, headings in group.items() for heading in headings
+    })
+
+
+def _is_heading(text: str, start: int, end: int) -> bool:
+    """Le mot-clé est employé comme titre, et non dans une phrase"""
+    word = text[start:end]
+    if not word[0].isupper():
+        return False
+    if word.isupper() and len(word) > 3:
+        return True
+
+    after = text[end:end + _COLON_LOOKAHEAD].lstrip(" \t")
+    if after.startswith(":"):
+        return True
+
+    position = start - 1
+    while position >= 0 and text[position] in " \t":
+        position -= 1
+    if position < 0 or text[position] == "\n":
+        return True
+    # Précédé d'un mot en minuscules : phrase en cours ("une expérience de...")
+    return not text[position].islower()
+
+
+class SectionIndex:
+    """
+    Sections d'un texte, dans l'ordre. Une section va de la fin de son
+    titre au titre suivant ; le texte avant le premier titre est l'en-tête.
+    """
+
+    def __init__(self, text: str, sections: List[Section]):
+        self.text = text
+        self.sections = sections
+
+    def has(self, *names: str) -> bool:
+        return any(section.name in names for section in self.sections)
+
+    def select(self, names: Iterable[str]) -> str:
+        """Contenu des sections demandées (dans l'ordre du texte)"""
+        names = set(names)
+        return "\n".join(
+            self.text[section.start:section.end] for section in self.sections if section.name in names
+        )
+
+    def without(self, names: Iterable[str]) -> str:
+        """Texte complet privé des sections indiquées (titres compris)"""
+        names = set(names)
+        if not any(section.name in names for section in self.sections):
+            return self.text
+        return "\n".join(
+            self.text[section.heading_start:section.end] for section in self.sections if section.name not in names
+        )
+
+
+def segment_sections(text: str, locale: Optional[str] = None) -> SectionIndex:
+    """Index des sections du texte, en une passe"""
+    headings = [
+        match for match in load_heading_automaton(locale).find_all(text)
+        if _is_heading(text, match.start, match.end)
+    ]
+
+    sections = []
+    first_heading = headings[0].start if headings else len(text)
+    if text[:first_heading].strip():
+        sections.append(Section(HEADER, 0, 0, first_heading))
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start if i + 1 < len(headings) else len(text)
+        # Le ":" qui suit le titre n'appartient pas au contenu
+        content_start = match.end
+        after = text[content_start:content_start + _COLON_LOOKAHEAD]
+        if after.lstrip(" \t").startswith(":"):
+            content_start += after.index(":") + 1
+        sections.append(Section(match.value, match.start, content_start, end))
+    return SectionIndex(text, sections)
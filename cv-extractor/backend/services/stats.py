@@ -0,0 +1,94 @@
+"""
+Statistiques d'extraction (GET /api/v1/stats).
+
+Les agrégats sont lus dans deux tables de compteurs tenues à jour par
+services/repository.py, dans la transaction de chaque écriture :
+- cv_stats_daily : uploads par jour, champs extraits et "Non trouvé" et
+  types de diplôme de ces uploads (qualité de l'extraction au fil du temps) ;
+- cv_stats_totals : état courant de cv_extractions (nombre de CV, champs
+  extraits et "Non trouvé" par champ, répartition des diplômes).
+
+Un champ non demandé par une analyse sélective (?fields=) n'est pas
+compté : le taux de réussite d'un champ est rapporté aux analyses qui
+l'ont demandé.
+
+Une réponse lit quelques lignes par jour demandé et une vingtaine de
+compteurs par clé primaire, quel que soit le nombre de CV stockés.
+"""
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.cv_database import StatsDaily, StatsTotal
+from services.repository import STATS_FIELDS
+
+# Nombre maximal de jours de l'historique quotidien
+STATS_MAX_DAYS = int(os.getenv("STATS_MAX_DAYS", "366"))
+
+
+def stats_etag(version: int, today: date) -> str:
+    # Les compteurs changent avec la table (version) et la fenêtre de jours avec la date
+    return f'W/"stats-{version}-{today.isoformat()}"'
+
+
+def _fields(missing: Dict[str, int], extracted: Dict[str, int], total: int) -> Dict[str, Dict]:
+    """
+    "Non trouvé" et taux de réussite par champ, rapporté aux analyses qui
+    ont demandé le champ. Les compteurs antérieurs au décompte des champs
+    extraits (extracted vide) sont rapportés à tous les uploads.
+    """
+    result = {}
+    for field in STATS_FIELDS:
+        asked = extracted.get(field, 0) if extracted else total
+        result[field] = {
+            "missing": missing.get(field, 0),
+            "found_rate": round(1 - missing.get(field, 0) / asked, 4) if asked else None,
+        }
+    return result
+
+
+def fetch_stats(db: Session, days: int = 30, today: Optional[date] = None) -> Dict:
+    """
+    Agrégats courants et quotidiens.
+
+    Args:
+        days: Nombre de jours de l'historique quotidien (aujourd'hui compris)
+        today: Dernier jour de la fenêtre (date UTC du jour par défaut)
+
+    Returns:
+        {"cvs", "fields", "degrees", "daily"} ; "daily" ne contient que les
+        jours avec au moins un upload, du plus ancien au plus récent
+    """
+    today = today or datetime.utcnow().date()
+    totals: Dict[str, Dict[str, int]] = {"cvs": {}, "extracted": {}, "missing": {}, "degree": {}}
+    for metric, value, count in db.execute(select(StatsTotal.metric, StatsTotal.value, StatsTotal.count)):
+        if count and metric in totals:
+            totals[metric][value] = count
+    cvs = totals["cvs"].get("", 0)
+
+    daily: Dict[date, Dict[str, Dict[str, int]]] = {}
+    for day, metric, value, count in db.execute(
+        select(StatsDaily.day, StatsDaily.metric, StatsDaily.value, StatsDaily.count)
+        .where(StatsDaily.day > today - timedelta(days=days), StatsDaily.day <= today)
+        .order_by(StatsDaily.day)
+    ):
+        if count:
+            daily.setdefault(day, {"uploads": {}, "extracted": {}, "missing": {}, "degree": {}}).setdefault(metric, {})[value] = count
+
+    return {
+        "cvs": cvs,
+        "fields": _fields(totals["missing"], totals["extracted"], cvs),
+        "degrees": dict(sorted(totals["degree"].items(), key=lambda item: -item[1])),
+        "daily": [
+            {
+                "day": day.isoformat(),
+                "uploads": counts["uploads"].get("", 0),
+                "fields": _fields(counts["missing"], counts["extracted"], counts["uploads"].get("", 0)),
+                "degrees": dict(sorted(counts["degree"].items(), key=lambda item: -item[1])),
+            }
+            for day, counts in daily.items()
+        ],
+    }
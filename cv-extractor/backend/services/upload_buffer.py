@@ -0,0 +1,168 @@
+"""
+Transmission du contenu d'un upload aux processus de parsing.
+
+Le fichier uploadé est copié une seule fois, dans un segment de mémoire
+partagée (multiprocessing.shared_memory), au lieu d'être écrit sur disque
+puis relu. Le processus de parsing ne reçoit que le nom du segment et lit
+le document directement dans la mémoire partagée (flux en lecture seule
+sur un memoryview, ouvert par pdfplumber ou python-docx).
+
+Cycle de vie : le segment appartient au processus de l'API, qui le
+supprime une fois le parsing terminé, y compris si le processus de
+parsing a été tué (délai, plafond mémoire, crash). Si le processus de
+l'API meurt lui-même, le resource tracker de multiprocessing supprime
+les segments restants.
+
+Si la mémoire partagée est désactivée ou pleine (/dev/shm limité à
+64 Mo par défaut dans Docker), l'upload est écrit dans un fichier
+temporaire comme auparavant.
+"""
+import hashlib
+import io
+import os
+import uuid
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+SHARED_MEMORY_UPLOADS = os.getenv("SHARED_MEMORY_UPLOADS", "true").lower() == "true"
+
+CHUNK_SIZE = 1024 * 1024
+
+# Référence transmise au processus de parsing : chemin d'un fichier,
+# ou ("shm", nom du segment, taille du contenu)
+SourceHandle = Union[str, Tuple[str, str, int]]
+
+
+class MemoryReader(io.RawIOBase):
+    """Flux binaire en lecture seule sur un memoryview (sans copie du contenu)"""
+
+    def __init__(self, buffer: memoryview):
+        super().__init__()
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        size = max(0, min(len(target), len(self._buffer) - self._position))
+        target[:size] = self._buffer[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        if offset < 0:
+            raise ValueError("Position négative")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        # Libère la vue : le segment ne peut pas être fermé tant qu'elle existe
+        if not self.closed:
+            self._buffer.release()
+        super().close()
+
+
+@contextmanager
+def open_source(handle: SourceHandle) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Ouvre la source d'un document dans le processus de parsing : le chemin
+    tel quel, ou un flux sur le segment de mémoire partagée.
+    """
+    if isinstance(handle, str):
+        yield handle
+        return
+
+    _, name, size = handle
+    segment = shared_memory.SharedMemory(name=name)
+    reader = io.BufferedReader(MemoryReader(segment.buf[:size]))
+    try:
+        yield reader
+    finally:
+        reader.close()
+        segment.close()
+
+
+class UploadBuffer:
+    """Contenu d'un upload, en mémoire partagée ou dans un fichier temporaire"""
+
+    def __init__(self, segment: Optional[shared_memory.SharedMemory] = None,
+                 size: int = 0, path: Optional[Path] = None):
+        self._segment = segment
+        self.size = size
+        self.path = path
+
+    @property
+    def handle(self) -> SourceHandle:
+        if self._segment is not None:
+            return ("shm", self._segment.name, self.size)
+        return str(self.path)
+
+    @classmethod
+    def from_file(cls, source: BinaryIO, upload_dir: Path, extension: str) -> Tuple["UploadBuffer", str]:
+        """
+        Copie le contenu de `source` (lu par blocs) en calculant son hash au passage.
+
+        Returns:
+            (tampon, hash SHA-256 hexadécimal du contenu)
+        """
+        digest = hashlib.sha256()
+        source.seek(0, io.SEEK_END)
+        size = source.tell()
+        source.seek(0)
+
+        segment = None
+        if SHARED_MEMORY_UPLOADS and size > 0:
+            try:
+                segment = shared_memory.SharedMemory(create=True, size=size)
+            except OSError:
+                segment = None  # /dev/shm plein ou indisponible
+
+        if segment is not None:
+            buffer = cls(segment=segment, size=size)
+            try:
+                position = 0
+                while chunk := source.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    segment.buf[position:position + len(chunk)] = chunk
+                    position += len(chunk)
+            except BaseException:
+                buffer.close()
+                raise
+            return buffer, digest.hexdigest()
+
+        buffer = cls(size=size, path=upload_dir / f"{uuid.uuid4().hex}.{extension}")
+        try:
+            with open(buffer.path, "wb") as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    target.write(chunk)
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer, digest.hexdigest()
+
+    def close(self) -> None:
+        """Libère le segment ou supprime le fichier (idempotent)"""
+        if self._segment is not None:
+            segment, self._segment = self._segment, None
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        elif self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
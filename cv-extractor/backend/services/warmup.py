@@ -0,0 +1,35 @@
+"""
+Warm-up optionnel des dépendances lourdes.
+
+Les parseurs sont importés paresseusement au premier appel. Ce module
+permet de payer ce coût à l'avance (au démarrage du serveur) plutôt
+que sur la première requête d'un utilisateur.
+"""
+import time
+
+from services import pdf_parser, docx_parser, extractor  # noqa: F401
+from services.gazetteer import get_lexicon
+from services.degree_taxonomy import load_automaton
+from services.locales import ENABLED_LOCALES, get_pack
+from services.sections import load_heading_automaton
+
+
+def warm_up() -> float:
+    """
+    Précharge les bibliothèques de parsing, les packs de patterns des locales, le lexique
+    de noms et les automates des diplômes (par locale) et des titres de sections.
+    Appelé avant le fork des workers, la mémoire est partagée en copy-on-write.
+
+    Returns:
+        La durée du warm-up en secondes
+    """
+    start = time.perf_counter()
+    pdf_parser.preload()
+    docx_parser.preload()
+    # Compile le lexique si besoin et le projette en mémoire avant le fork
+    get_lexicon()
+    for locale in ENABLED_LOCALES:
+        get_pack(locale)
+        load_automaton(locale=locale)
+        load_heading_automaton(locale)
+    return time.perf_counter() - start
@@ -0,0 +1,96 @@
+"""
+File d'écriture unique pour le mode SQLite.
+
+SQLite n'accepte qu'un écrivain à la fois : des uploads concurrents qui
+écrivent chacun depuis un thread différent se disputent le verrou et
+finissent par échouer avec "database is locked". En mode SQLite, toutes
+les écritures de l'API passent donc par un thread dédié qui les exécute
+une par une, dans l'ordre d'arrivée, avec sa propre session.
+
+Entre processus (workers gunicorn, bulk_ingest.py, watch_folder.py), le
+verrou est attendu jusqu'à SQLITE_BUSY_TIMEOUT secondes (busy_timeout).
+"""
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from database import IS_SQLITE, SessionLocal
+
+
+class WriteQueue:
+    """
+    Exécute des fonctions d'écriture `func(db, *args)` dans un thread unique.
+    Le thread est démarré à la première écriture (après le fork des workers).
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal):
+        self._session_factory = session_factory
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            # Un thread ne survit pas au fork : le worker démarre le sien
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def _run(self) -> None:
+        db = self._session_factory()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                future, func, args = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(db, *args))
+                except BaseException as e:
+                    db.rollback()
+                    future.set_exception(e)
+        finally:
+            db.close()
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Met une écriture en file ; le résultat (ou l'exception) est porté par le Future"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def run(self, func: Callable, *args):
+        """Écriture bloquante (scripts, tests)"""
+        return self.submit(func, *args).result()
+
+    async def run_async(self, func: Callable, *args):
+        """Écriture attendue depuis la boucle asyncio sans bloquer un thread"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def close(self) -> None:
+        """Termine les écritures en file puis arrête le thread"""
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """File d'écriture du processus en mode SQLite, None avec PostgreSQL"""
+    global _write_queue
+    if IS_SQLITE and _write_queue is None:
+        _write_queue = WriteQueue()
+    return _write_queue
@@ -0,0 +1,146 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import pytest
+from services.admission import (
+    TokenBucket, RateLimiter, SharedRateLimiter, FairScheduler, QueueFullError, default_parse_concurrency,
+    identify_client, parse_api_clients
+)
+
+
+class TestTokenBucket:
+    """Tests pour le token bucket"""
+    
+    def test_rafale_puis_refus(self):
+        """Test qu'une rafale au-delà de la capacité est refusée"""
+        bucket = TokenBucket(rate=1, capacity=3, now=0)
+        assert [bucket.try_acquire(now=0) for _ in range(3)] == [0, 0, 0]
+        assert bucket.try_acquire(now=0) == pytest.approx(1.0)
+    
+    def test_recharge(self):
+        """Test que les jetons se rechargent avec le temps"""
+        bucket = TokenBucket(rate=2, capacity=1, now=0)
+        assert bucket.try_acquire(now=0) == 0
+        assert bucket.try_acquire(now=0.1) > 0
+        assert bucket.try_acquire(now=0.6) == 0
+
+
+class TestRateLimiter:
+    """Tests pour la limitation par client"""
+    
+    def test_clients_independants(self):
+        """Test qu'un client qui inonde l'API ne bloque pas les autres"""
+        limiter = RateLimiter(rate=1, burst=2)
+        for _ in range(2):
+            assert limiter.check("ip:1", now=0) == 0
+        assert limiter.check("ip:1", now=0) > 0
+        assert limiter.check("ip:2", now=0) == 0
+
+
+class TestLimiteurPartage:
+    """Tests pour les buckets partagés entre workers"""
+    
+    def test_workers_partagent_les_jetons(self, tmp_path):
+        """Test que deux workers (deux limiteurs sur le même fichier) consomment les mêmes jetons"""
+        path = tmp_path / "rate_limit.sqlite3"
+        workers = [SharedRateLimiter(path, rate=1, burst=4) for _ in range(2)]
+        granted = [workers[i % 2].check("ip:1", now=0) == 0 for i in range(8)]
+        assert granted == [True] * 4 + [False] * 4
+        assert workers[1].check("ip:2", now=0) == 0
+        # Recharge au rythme du serveur, pas de chaque worker
+        assert workers[0].check("ip:1", now=1) == 0
+        assert workers[1].check("ip:1", now=1) > 0
+    
+    def test_nettoyage(self, tmp_path):
+        """Test que les buckets redevenus pleins sont supprimés"""
+        limiter = SharedRateLimiter(tmp_path / "rate_limit.sqlite3", rate=1, burst=2)
+        limiter.check("ip:1", now=0)
+        limiter.check("ip:2", now=9)
+        limiter.prune(now=9.5)
+        keys = [row[0] for row in limiter._connection().execute("SELECT key FROM buckets")]
+        assert keys == ["ip:2"]
+
+
+class TestIdentification:
+    """Tests pour l'identité et la classe des clients"""
+    
+    CLIENTS = {"cle-frontend": "interactive", "cle-ats": "bulk"}
+    
+    def test_classe_par_cle(self):
+        """Test que la classe vient de la clé déclarée, pas d'un en-tête libre"""
+        assert identify_client("cle-frontend", None, "10.0.0.1", self.CLIENTS)[1] == "interactive"
+        assert identify_client("cle-ats", None, "10.0.0.1", self.CLIENTS)[1] == "bulk"
+        # Une clé inconnue ne donne ni classe ni bucket propre
+        assert identify_client("inventee", None, "10.0.0.1", self.CLIENTS) == ("ip:10.0.0.1", "bulk")
+        assert identify_client("autre", None, "10.0.0.1", self.CLIENTS) == ("ip:10.0.0.1", "bulk")
+    
+    def test_utilisateurs_du_frontend(self):
+        """Test que chaque utilisateur du frontend a son bucket, et non ceux d'un client bulk"""
+        alice = identify_client("cle-frontend", "alice", "10.0.0.1", self.CLIENTS)[0]
+        bob = identify_client("cle-frontend", "bob", "10.0.0.1", self.CLIENTS)[0]
+        assert alice != bob and "cle-frontend" not in alice
+        assert identify_client("cle-ats", "x", "10.0.0.1", self.CLIENTS) == identify_client(
+            "cle-ats", "y", "10.0.0.1", self.CLIENTS
+        )
+    
+    def test_configuration(self):
+        """Test du format de API_CLIENTS"""
+        assert parse_api_clients("a:interactive, b:bulk,") == {"a": "interactive", "b": "bulk"}
+        with pytest.raises(ValueError):
+            parse_api_clients("a:vip")
+
+
+class TestProcessusDeParsing:
+    """Tests pour le nombre de processus de parsing par worker"""
+    
+    def test_cpu_repartis_entre_workers(self):
+        """Test que le serveur entier a au plus un processus de parsing par CPU"""
+        assert default_parse_concurrency(cpu_count=8, web_workers=4) == 2
+        assert default_parse_concurrency(cpu_count=8, web_workers=1) == 8
+        # Au moins un processus par worker
+        assert default_parse_concurrency(cpu_count=2, web_workers=4) == 1
+
+
+class TestFairScheduler:
+    """Tests pour la file d'attente équitable pondérée"""
+    
+    def test_interactif_passe_devant(self):
+        """Test qu'un upload interactif passe devant une file d'ingestion en masse"""
+        async def scenario():
+            scheduler = FairScheduler(max_concurrent=1)
+            order = []
+            
+            async def job(flow, weight):
+                await scheduler.acquire(flow, weight)
+                order.append(flow)
+                await asyncio.sleep(0)
+                scheduler._release()
+            
+            await scheduler.acquire("occupant", 1)
+            tasks = [asyncio.create_task(job("bulk", 1)) for _ in range(5)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(job("interactive", 8)))
+            await asyncio.sleep(0)
+            scheduler._release()
+            await asyncio.gather(*tasks)
+            return order
+        
+        order = asyncio.run(scenario())
+        assert order.index("interactive") <= 1
+    
+    def test_file_pleine(self):
+        """Test du refus quand la file est pleine"""
+        async def scenario():
+            scheduler = FairScheduler(max_concurrent=1, max_queued=1)
+            await scheduler.acquire("a", 1)
+            waiting = asyncio.create_task(scheduler.acquire("b", 1))
+            await asyncio.sleep(0)
+            with pytest.raises(QueueFullError):
+                await scheduler.acquire("c", 1)
+            waiting.cancel()
+        
+        asyncio.run(scenario())
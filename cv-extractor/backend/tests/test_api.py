@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import init_db
+import main
+from database import create_database_engine, get_db
+from services import parser_pool, result_cache, write_queue
+from services.admission import QUEUE_WAIT_SECONDS, RateLimiter
+from services.parser_pool import ParserCrashError
+from services.result_cache import ResultCache
+from services.write_queue import WriteQueue
+
+
+@pytest.fixture
+def cv_docx(tmp_path):
+    """CV DOCX minimal"""
+    path = tmp_path / "cv.docx"
+    document = Document()
+    document.add_paragraph("Yann HOUNDJO")
+    document.add_paragraph("yannmgh@gmail.com")
+    document.add_paragraph("06 12 34 56 78")
+    document.add_paragraph("Master Informatique")
+    document.save(path)
+    return path
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """
+    Application démarrée par son lifespan, sur une base SQLite et des caches
+    temporaires ; parsing dans un thread (pool de processus désactivé).
+    """
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'cv.sqlite3'}")
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(init_db, "engine", engine)
+    monkeypatch.setattr(write_queue, "_write_queue", WriteQueue(Session))
+    monkeypatch.setattr(parser_pool, "PARSER_POOL_ENABLED", False)
+    monkeypatch.setattr(result_cache, "_cache", ResultCache(str(tmp_path / "results.sqlite3"), 3600, 100))
+    monkeypatch.setattr(result_cache, "_poison_cache", ResultCache(str(tmp_path / "poison.sqlite3"), 600, 100))
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter(100, 100))
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, get_test_db)
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+    engine.dispose()
+
+
+class TestApi:
+    """Test de fumée : l'application démarre et ses endpoints principaux répondent"""
+
+    def test_sante_et_metriques(self, client):
+        """/health répond, /metrics exporte les séries de l'admission"""
+        assert client.get("/health").json()["status"] == "healthy"
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "cv_parse_queue_wait_seconds" in response.text
+        assert "cv_admission_rejections_total" in response.text
+
+    def test_upload_historique_stats(self, client, cv_docx):
+        """Upload par la file d'attente, historique (puis 304 avec l'ETag) et statistiques"""
+        waits = QUEUE_WAIT_SECONDS.count(client_class="bulk")
+        with open(cv_docx, "rb") as file:
+            response = client.post("/api/v1/upload-cv", files={"file": ("cv.docx", file)})
+        assert response.status_code == 200
+        result = response.json()
+        assert result["email"] == "yannmgh@gmail.com"
+        assert result["first_name"] == "Yann"
+        # Le parsing est passé par FairScheduler.slot
+        assert QUEUE_WAIT_SECONDS.count(client_class="bulk") == waits + 1
+
+        response = client.get("/api/v1/history")
+        assert response.status_code == 200
+        assert response.json()["data"][0]["email"] == "yannmgh@gmail.com"
+        etag = response.headers["ETag"]
+        response = client.get("/api/v1/history", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.get("/api/v1/stats")
+        assert response.status_code == 200
+        assert response.json()["cvs"] == 1
+
+    def test_arret_du_parsing_empoisonne(self, client, cv_docx, monkeypatch):
+        """Un fichier qui fait tomber le processus de parsing est refusé d'emblée ensuite"""
+        class CrashingPool:
+            def extract_text(self, *args, **kwargs):
+                raise ParserCrashError("Le processus de parsing s'est arrêté")
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(main, "get_parser_pool", lambda: CrashingPool())
+        with open(cv_docx, "rb") as file:
+            assert client.post("/api/v1/upload-cv", files={"file": ("cv.docx", file)}).status_code == 500
+        with open(cv_docx, "rb") as file:
+            assert client.post("/api/v1/upload-cv", files={"file": ("cv.docx", file)}).status_code == 422
@@ -0,0 +1,153 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import bulk_ingest
+from database import Base
+from models.cv_database import CVExtraction
+from bulk_ingest import ingest, load_manifest
+
+
+class FakePool:
+    """Pool exécuté dans le processus du test"""
+
+    def __init__(self, workers, initializer=None, initargs=(), maxtasksperchild=None):
+        initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, func, items, chunksize=1):
+        return map(func, items)
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """Archive de trois CV, base en mémoire, parsing simulé et compté"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    parsed = []
+
+    def process_file(path, extension):
+        parsed.append(Path(path).name)
+        cv_data = {
+            "first_name": "Yann", "last_name": "Houndjo", "email": f"{Path(path).stem}@a.fr",
+            "phone": "Non trouvé", "degree": "Non trouvé",
+        }
+        return cv_data, f"texte de {path}"
+
+    monkeypatch.setattr(bulk_ingest, "SessionLocal", Session)
+    monkeypatch.setattr(bulk_ingest, "process_file", process_file)
+    monkeypatch.setattr(bulk_ingest.multiprocessing, "Pool", FakePool)
+    monkeypatch.setattr(bulk_ingest.sys, "stdout", sys.stdout)
+    root = tmp_path / "archive"
+    root.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.docx"):
+        (root / name).write_bytes(f"contenu {name}".encode())
+    return root, tmp_path / "manifest.jsonl", Session, parsed
+
+
+def count_rows(Session) -> int:
+    with Session() as db:
+        return db.scalar(select(func.count()).select_from(CVExtraction))
+
+
+class TestManifeste:
+    """Tests pour la lecture du manifeste de reprise"""
+
+    def test_derniere_ligne_tronquee(self, tmp_path):
+        """Test qu'une dernière ligne tronquée par une interruption est ignorée"""
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(
+            json.dumps({"hash": "h1", "path": "a.pdf", "status": "ok"}) + "\n"
+            + json.dumps({"hash": "h2", "path": "b.pdf", "status": "error"}) + "\n"
+            + '{"hash": "h3", "pa', encoding="utf-8"
+        )
+        assert set(load_manifest(manifest)) == {"h1", "h2"}
+
+    def test_manifeste_absent(self, tmp_path):
+        """Test d'une première exécution"""
+        assert load_manifest(tmp_path / "absent.jsonl") == {}
+
+
+class TestReprise:
+    """Tests pour la reprise d'une ingestion interrompue"""
+
+    def test_fichiers_deja_faits_non_reparses(self, archive):
+        """Test qu'une deuxième exécution ne reparse aucun fichier déjà ingéré"""
+        root, manifest, Session, parsed = archive
+        ingest(root, workers=1, batch_size=2, manifest_path=manifest)
+        assert sorted(parsed) == ["a.pdf", "b.pdf", "c.docx"]
+        assert count_rows(Session) == 3
+
+        parsed.clear()
+        stats = ingest(root, workers=1, batch_size=2, manifest_path=manifest)
+        assert parsed == [] and stats.skipped == 3
+        assert len(load_manifest(manifest)) == 3
+
+    def test_reprise_apres_ligne_tronquee(self, archive):
+        """Test que seul le fichier de la ligne tronquée est retraité, et que la suite reste lisible"""
+        root, manifest, Session, parsed = archive
+        ingest(root, workers=1, batch_size=10, manifest_path=manifest)
+        lines = manifest.read_text(encoding="utf-8").splitlines()
+        manifest.write_text("\n".join(lines[:2]) + "\n" + lines[2][:15], encoding="utf-8")
+        lost = json.loads(lines[2])["path"]
+
+        parsed.clear()
+        ingest(root, workers=1, batch_size=10, manifest_path=manifest)
+        assert parsed == [Path(lost).name]
+        assert len(load_manifest(manifest)) == 3
+        assert count_rows(Session) == 3
+
+    def test_commit_en_echec(self, archive, monkeypatch):
+        """Test qu'un lot dont le commit échoue n'est pas inscrit au manifeste"""
+        root, manifest, Session, parsed = archive
+        ingest(root, workers=1, batch_size=2, manifest_path=manifest)
+        before = manifest.read_bytes()
+        (root / "d.pdf").write_bytes(b"contenu d.pdf")
+
+        def failing_upsert(db, rows):
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(bulk_ingest, "upsert_rows", failing_upsert)
+        with pytest.raises(OperationalError):
+            ingest(root, workers=1, batch_size=2, manifest_path=manifest)
+        assert manifest.read_bytes() == before
+        assert "d.pdf" not in {Path(entry["path"]).name for entry in load_manifest(manifest).values()}
+
+    def test_fichier_illisible(self, archive, monkeypatch):
+        """Test qu'un fichier disparu ou illisible est inscrit en erreur sans interrompre l'ingestion"""
+        root, manifest, Session, parsed = archive
+        (root / "disparu.pdf").symlink_to(root / "absent.pdf")
+        real_hash = bulk_ingest.file_hash
+
+        def file_hash(path):
+            if path.name == "b.pdf":
+                raise PermissionError(13, "Permission denied", str(path))
+            return real_hash(path)
+
+        monkeypatch.setattr(bulk_ingest, "file_hash", file_hash)
+        stats = ingest(root, workers=1, batch_size=2, manifest_path=manifest)
+        assert sorted(parsed) == ["a.pdf", "c.docx"]
+        assert count_rows(Session) == 2 and stats.errors == 2
+
+        lines = [json.loads(line) for line in manifest.read_text(encoding="utf-8").splitlines()]
+        errors = {Path(entry["path"]).name: entry for entry in lines if entry["status"] == "error"}
+        assert set(errors) == {"b.pdf", "disparu.pdf"}
+        assert "Permission denied" in errors["b.pdf"]["error"]
+        assert errors["disparu.pdf"]["hash"] is None
+        # Les fichiers sans hash ne sont pas indexés : ils seront retentés
+        assert len(load_manifest(manifest)) == 2
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.keyword_automaton import KeywordAutomaton
+from services.degree_taxonomy import find_degrees, classify_degree
+
+
+class TestKeywordAutomaton:
+    """Tests pour l'automate d'Aho-Corasick"""
+    
+    def test_mots_cles_multiples(self):
+        """Test de plusieurs mots-clés trouvés en une passe"""
+        automaton = KeywordAutomaton({"master": 1, "licence": 2})
+        matches = automaton.find_all("Licence puis Master")
+        assert [match.value for match in matches] == [2, 1]
+    
+    def test_casse_et_accents_ignores(self):
+        """Test que la casse et les accents sont ignorés"""
+        automaton = KeywordAutomaton({"Ingénieur": 1})
+        assert len(automaton.find_all("diplome d'INGENIEUR")) == 1
+    
+    def test_mot_entier(self):
+        """Test qu'un mot-clé collé à d'autres lettres est ignoré"""
+        automaton = KeywordAutomaton({"bac": 1})
+        assert automaton.find_all("Bachelor") == []
+    
+    def test_plus_long_prioritaire(self):
+        """Test que la mention la plus longue l'emporte en cas de chevauchement"""
+        automaton = KeywordAutomaton({"Master": 1, "Master 1": 2})
+        matches = automaton.find_all("Master 1 MIAGE")
+        assert [match.keyword for match in matches] == ["Master 1"]
+
+
+class TestDegreeTaxonomy:
+    """Tests pour la classification des diplômes"""
+    
+    def test_niveau_et_domaine(self):
+        """Test du niveau canonique et du domaine"""
+        result = classify_degree("Master Informatique et réseaux; stage de 6 mois")
+        assert result["degree_level"] == 5
+        assert result["degree_label"] == "Master"
+        assert result["degree_field"] == "Informatique et réseaux"
+    
+    def test_plus_haut_niveau(self):
+        """Test que le diplôme de plus haut niveau est retenu"""
+        text = "BTS SIO (2018), Licence pro Réseaux (2019), Doctorat en Physique (2024)"
+        result = classify_degree(text)
+        assert result["degree_label"] == "Doctorat"
+        assert result["degree_level"] == 8
+        assert result["degree_field"] == "Physique"
+    
+    def test_toutes_les_mentions(self):
+        """Test que toutes les mentions sont trouvées"""
+        labels = [mention.label for mention in find_degrees("Bac S, DUT GEII, Diplôme d'ingénieur ENSEA")]
+        assert labels == ["Bac", "DUT", "Ingénieur"]
+    
+    def test_acronyme_sensible_a_la_casse(self):
+        """Test que le mot courant "but" n'est pas pris pour un BUT"""
+        assert classify_degree("Mon but est de progresser") is None
+        assert classify_degree("BUT Informatique")["degree_level"] == 3
+    
+    def test_libelle_prefere_au_generique(self):
+        """Test qu'à niveau égal, "Bachelor" l'emporte sur "(Bac+3)" """
+        result = classify_degree("Bachelor Développement d'application (Bac+3)")
+        assert result["degree_label"] == "Bachelor"
+        assert result["degree"] == "Bachelor Développement d'application (Bac+3)"
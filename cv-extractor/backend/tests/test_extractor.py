@@ -5,13 +5,20 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
+from services import extractor
 from services.extractor import (
+    EXTRACTORS,
     extract_email,
     extract_phone,
     extract_name,
     extract_degree,
-    extract_cv_info
+    extract_cv_info,
+    FieldResolver,
+    resolve_fields,
+    select_fields
 )
+from services.gazetteer import build_lexicon, Lexicon
+from services.pipeline import RESOLVE_OVERLAP_CHARS, until_resolved
 
 
 class TestExtractEmail:
@@ -112,6 +119,32 @@ class TestExtractName:
         assert result["first_name"] == "François"
         assert result["last_name"] in ["Léger", "LÉGER"]
     
+    def test_name_apres_entete(self):
+        """Test que "Curriculum VITAE" n'est pas pris pour un nom"""
+        text = "Curriculum VITAE Sophie MARTIN Développeuse Python"
+        result = extract_name(text)
+        assert result["first_name"] == "Sophie"
+        assert result["last_name"] == "Martin"
+    
+    def test_name_nom_avant_prenom(self):
+        """Test avec format NOM Prénom"""
+        text = "HOUNDJO Yann\nDéveloppeur Full Stack"
+        result = extract_name(text)
+        assert result["first_name"] == "Yann"
+        assert result["last_name"] == "Houndjo"
+    
+    def test_name_sans_lexique(self, tmp_path, monkeypatch):
+        """Le lexique n'est qu'un échantillon : les patterns trouvent les noms qu'il ignore"""
+        path = tmp_path / "names.lex"
+        build_lexicon([], [], path)
+        monkeypatch.setattr(extractor, "get_lexicon", lambda: Lexicon(path))
+        result = extract_name("Kofi ASANTE\nIngénieur")
+        assert result["first_name"] == "Kofi"
+        assert result["last_name"] == "Asante"
+        result = extract_name("Curriculum VITAE Sophie MARTIN Développeuse Python")
+        assert result["first_name"] == "Sophie"
+        assert result["last_name"] == "Martin"
+    
     def test_name_absent(self):
         """Test sans nom détectable"""
         text = "123456 Développeur Senior"
@@ -219,6 +252,79 @@ class TestExtractCVInfo:
         assert result["degree"] == "Non trouvé"
 
 
+class TestChampsSelectifs:
+    """Tests pour l'extraction limitée aux champs demandés"""
+    
+    def test_resolution_des_champs(self):
+        """Test des noms de champs acceptés et de l'ordre par coût"""
+        assert resolve_fields(["degree", "email"]) == ("email", "degree")
+        assert resolve_fields(["first_name", "last_name", " phone "]) == ("phone", "name")
+        assert resolve_fields(None) is None
+        with pytest.raises(ValueError):
+            resolve_fields(["adresse"])
+    
+    def test_extracteurs_non_demandes(self):
+        """Test que les champs non demandés valent None"""
+        text = "Yann HOUNDJO yannmgh@gmail.com 0771899574 Master Informatique"
+        result = extract_cv_info(text, ("email", "phone"))
+        
+        assert result["email"] == "yannmgh@gmail.com"
+        assert result["phone"] == "0771899574"
+        assert result["first_name"] is None
+        assert result["degree"] is None
+        assert select_fields(extract_cv_info(text), ("email", "phone")) == result
+    
+    def test_champs_resolus(self):
+        """Test de la détection des champs définitivement connus"""
+        assert FieldResolver(resolve_fields(["email"])).feed("Contact : john@example.com")
+        assert not FieldResolver(resolve_fields(["email", "phone"])).feed("Contact : john@example.com")
+        # Le diplôme le plus élevé peut apparaître plus loin
+        resolver = FieldResolver(resolve_fields(["degree"]))
+        assert resolver.complete and not resolver.feed("Master Informatique")
+    
+    def test_resolution_incrementale(self):
+        """Test que seuls les champs encore inconnus sont cherchés dans les morceaux suivants"""
+        resolver = FieldResolver(resolve_fields(["email", "phone"]))
+        assert not resolver.feed("Contact : john@example.com\n")
+        assert resolver.pending == ["phone"]
+        assert resolver.feed("Tél : 06 12 34 56 78\n")
+        assert resolver.pending == []
+    
+    def test_arret_de_la_lecture(self):
+        """Test que les pages suivantes ne sont pas lues une fois les champs trouvés"""
+        read = []
+        
+        def pages():
+            for page in ("Yann HOUNDJO\n", "yannmgh@gmail.com\n", "0771899574\n", "Master\n"):
+                read.append(page)
+                yield page
+        
+        chunks = list(until_resolved(pages(), "pdf", ("email",)))
+        assert chunks == ["Yann HOUNDJO\n", "yannmgh@gmail.com\n"]
+        assert len(read) == 2
+    
+    def test_champ_absent_cout_lineaire(self, monkeypatch):
+        """Test qu'un champ absent du document n'est cherché qu'une fois par page"""
+        scanned = []
+        email = EXTRACTORS["email"]
+        
+        def counting(text, pack):
+            scanned.append(len(text))
+            return email.extract(text, pack)
+        
+        monkeypatch.setitem(EXTRACTORS, "email", email._replace(extract=counting))
+        pages = [f"Page {index} : expérience chez CBX Group, Python et SQL.\n" * 40 for index in range(50)]
+        assert list(until_resolved(iter(pages), "pdf", ("email",))) == pages
+        assert len(scanned) == len(pages)
+        # Chaque page est lue une fois, avec la fin de la précédente
+        assert sum(scanned) <= sum(len(page) for page in pages) + len(pages) * RESOLVE_OVERLAP_CHARS
+    
+    def test_email_a_cheval_sur_deux_pages(self):
+        """Test qu'un email coupé par le changement de page est trouvé"""
+        chunks = list(until_resolved(iter(["Yann HOUNDJO yannmgh@gm", "ail.com\n", "Master\n"]), "pdf", ("email",)))
+        assert len(chunks) == 2
+
+
 if __name__ == "__main__":
     # Lance les tests avec pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from services.gazetteer import build_lexicon, Lexicon
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    """Petit lexique compilé dans un dossier temporaire"""
+    path = tmp_path / "names.lex"
+    build_lexicon(["Jean", "Pierre", "François", "Ann"], ["Dupont", "Martin"], path)
+    return Lexicon(path)
+
+
+class TestLexicon:
+    """Tests pour le trie de noms projeté en mémoire"""
+    
+    def test_prenom_connu(self, lexicon):
+        """Test d'un prénom présent, sans tenir compte de la casse"""
+        assert lexicon.is_first_name("JEAN")
+        assert lexicon.is_first_name("jean")
+    
+    def test_accents_ignores(self, lexicon):
+        """Test que les accents sont ignorés"""
+        assert lexicon.is_first_name("Francois")
+        assert lexicon.is_first_name("FRANÇOIS")
+    
+    def test_prefixe_non_reconnu(self, lexicon):
+        """Test qu'un préfixe ou un prolongement d'un prénom n'est pas reconnu"""
+        assert not lexicon.is_first_name("Jea")
+        assert not lexicon.is_first_name("Anne")
+    
+    def test_prenom_compose(self, lexicon):
+        """Test d'un prénom composé"""
+        assert lexicon.is_first_name("Jean-Pierre")
+    
+    def test_nom_de_famille(self, lexicon):
+        """Test de la distinction prénom / nom de famille"""
+        assert lexicon.is_surname("DUPONT")
+        assert not lexicon.is_first_name("Dupont")
+        assert not lexicon.is_surname("Jean")
@@ -0,0 +1,130 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gzip
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.cv_database import CVExtraction
+from services import history
+from services.repository import delete_extraction, delete_extractions, save_extraction
+
+
+@pytest.fixture
+def db():
+    """Session sur une base SQLite en mémoire"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_cv(index, degree="Master Informatique", level=5):
+    return {
+        "first_name": "Yann",
+        "last_name": f"Houndjo{index}",
+        "email": f"yann{index}@example.com",
+        "phone": "Non trouvé",
+        "degree": degree,
+        "degree_level": level,
+        "degree_label": "Master",
+        "degree_field": "Informatique",
+    }
+
+
+class TestHistorique:
+    """Tests pour la lecture et la sérialisation de l'historique"""
+
+    def test_meme_contenu_que_to_dict(self, db):
+        """Test que les colonnes sérialisées correspondent à to_dict()"""
+        for index in range(3):
+            save_extraction(db, make_cv(index), f"cv{index}.pdf")
+        rows = json.loads(history.render_history(history.fetch_history(db, limit=10)))
+        expected = [cv.to_dict() for cv in db.query(CVExtraction).order_by(CVExtraction.last_seen_at.desc())]
+        assert rows == {"count": 3, "data": expected}
+
+    def test_filtres(self, db):
+        """Test des filtres par niveau et par type de diplôme"""
+        save_extraction(db, make_cv(1, level=5), "master.pdf")
+        save_extraction(db, make_cv(2, degree="BTS SIO", level=2), "bts.pdf")
+        assert [row["filename"] for row in history.fetch_history(db, 10, min_level=3)] == ["master.pdf"]
+        assert len(history.fetch_history(db, 10, degree_label="Licence")) == 0
+
+    def test_version_de_la_table(self, db):
+        """Test que chaque écriture change l'ETag"""
+        assert history.table_version(db) == 0
+        cv_id = save_extraction(db, make_cv(1), "cv.pdf")
+        save_extraction(db, make_cv(1), "cv.pdf")
+        assert history.table_version(db) == 2
+        delete_extraction(db, cv_id)
+        assert history.table_version(db) == 3
+        # Une suppression sans effet ne change pas la version
+        delete_extraction(db, cv_id)
+        assert history.table_version(db) == 3
+
+    def test_if_none_match(self):
+        """Test de la comparaison faible des ETag"""
+        etag = history.history_etag(4)
+        assert history.etag_matches(etag, etag)
+        assert history.etag_matches('"cv-4"', etag)
+        assert history.etag_matches(f'W/"cv-3", {etag}', etag)
+        assert history.etag_matches("*", etag)
+        assert not history.etag_matches('W/"cv-3"', etag)
+        assert not history.etag_matches(None, etag)
+
+    def test_compression(self, monkeypatch):
+        """Test du choix de la compression selon Accept-Encoding"""
+        monkeypatch.setattr(history, "brotli", None)
+        assert history.choose_encoding("gzip, deflate, br") == "gzip"
+        assert history.choose_encoding("gzip;q=0, br") is None
+        assert history.choose_encoding(None) is None
+
+        body = history.render_history([{"id": 1, "email": "yann@example.com"}] * 100)
+        assert gzip.decompress(history.compress(body, "gzip")) == body
+
+
+class TestPagination:
+    """Tests pour la pagination, le tri et la recherche côté serveur"""
+
+    def test_pages(self, db):
+        """Test que les pages se suivent sans doublon ni trou"""
+        for index in range(7):
+            save_extraction(db, make_cv(index), f"cv{index}.pdf")
+        pages = [history.fetch_history(db, 3, offset=offset, sort="last_name") for offset in (0, 3, 6)]
+        names = [row["last_name"] for page in pages for row in page]
+        assert names == [f"Houndjo{index}" for index in range(7)]
+        assert history.count_history(db) == 7
+
+    def test_tri(self, db):
+        """Test du tri décroissant et des colonnes refusées"""
+        save_extraction(db, make_cv(1, degree="BTS SIO", level=2), "bts.pdf")
+        save_extraction(db, make_cv(2, level=5), "master.pdf")
+        rows = history.fetch_history(db, 10, sort="-degree_level")
+        assert [row["degree_level"] for row in rows] == [5, 2]
+        with pytest.raises(ValueError):
+            history.parse_sort("normalized_text")
+
+    def test_recherche(self, db):
+        """Test de la recherche sans casse, avec les jokers SQL échappés"""
+        save_extraction(db, make_cv(1), "cv_alice.pdf")
+        save_extraction(db, make_cv(2), "cv-bob.pdf")
+        assert [row["filename"] for row in history.fetch_history(db, 10, search="ALICE")] == ["cv_alice.pdf"]
+        assert history.count_history(db, search="cv_") == 1
+        assert history.count_history(db, search="yann2@") == 1
+
+    def test_suppression_groupee(self, db):
+        """Test de la suppression de plusieurs lignes en une requête"""
+        ids = [save_extraction(db, make_cv(index), f"cv{index}.pdf") for index in range(3)]
+        version = history.table_version(db)
+        assert delete_extractions(db, [ids[0], ids[1], 999]) == 2
+        assert history.table_version(db) == version + 1
+        assert [row["id"] for row in history.fetch_history(db, 10)] == [ids[2]]
+        assert delete_extractions(db, []) == 0
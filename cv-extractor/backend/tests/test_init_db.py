@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_database_engine
+from init_db import migrate_schema
+from models.cv_database import CVExtraction
+from services.repository import save_extraction
+
+# Schéma de cv_extractions avant le dédoublonnage des candidats
+BASELINE_SCHEMA = """
+CREATE TABLE cv_extractions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name VARCHAR(100),
+    last_name VARCHAR(100),
+    email VARCHAR(255),
+    phone VARCHAR(50),
+    degree VARCHAR(500),
+    filename VARCHAR(255),
+    created_at DATETIME
+)
+"""
+
+BASELINE_ROWS = [
+    # Deux uploads du même candidat (casse de l'email différente)
+    ("Yann", "Houndjo", "Yann@A.fr", "06 12 34 56 78", "Master", "ancien.pdf", "2024-01-01 10:00:00"),
+    ("Yann", "Houndjo", "yann@a.fr", "06 12 34 56 78", "Master", "recent.pdf", "2024-02-01 10:00:00"),
+    # Téléphone seul
+    ("Marie", "Curie", "Non trouvé", "+33 7 11 22 33 44", "Doctorat", "marie.pdf", "2024-01-15 10:00:00"),
+    # Aucune coordonnée
+    ("Sans", "Contact", "Non trouvé", "Non trouvé", "Non trouvé", "vide.pdf", "2024-01-20 10:00:00"),
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Base SQLite au schéma initial, remplie avant toute migration"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'cv.sqlite3'}")
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_SCHEMA))
+        conn.execute(
+            text("INSERT INTO cv_extractions (first_name, last_name, email, phone, degree, filename, created_at) "
+                 "VALUES (:first, :last, :email, :phone, :degree, :filename, :created)"),
+            [dict(zip(("first", "last", "email", "phone", "degree", "filename", "created"), row))
+             for row in BASELINE_ROWS]
+        )
+    Base.metadata.create_all(bind=engine)
+    migrate_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def rows_by_filename(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(CVExtraction.__table__)).mappings().all()
+    return {row["filename"]: row for row in rows}
+
+
+class TestMigrationDepuisSchemaInitial:
+    """Mise à jour d'une base créée avant le dédoublonnage"""
+
+    def test_colonnes_et_index(self, engine):
+        """Les colonnes et l'index unique de la clé candidat sont ajoutés"""
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns("cv_extractions")}
+        indexes = {index["name"] for index in inspector.get_indexes("cv_extractions")}
+        assert {"email_normalized", "phone_e164", "candidate_key", "last_seen_at"} <= columns
+        assert "ux_cv_extractions_candidate_key" in indexes
+
+    def test_cles_renseignees(self, engine):
+        """Les lignes existantes sont normalisées comme à l'upload"""
+        rows = rows_by_filename(engine)
+        assert rows["recent.pdf"]["email_normalized"] == "yann@a.fr"
+        assert rows["recent.pdf"]["phone_e164"] == "+33612345678"
+        assert rows["recent.pdf"]["candidate_key"] == "email:yann@a.fr"
+        assert rows["marie.pdf"]["email_normalized"] is None
+        assert rows["marie.pdf"]["candidate_key"] == "tel:+33711223344"
+        assert rows["vide.pdf"]["candidate_key"] is None
+        assert str(rows["recent.pdf"]["last_seen_at"]).startswith("2024-02-01")
+        assert rows["recent.pdf"]["upload_count"] == 1
+
+    def test_doublon_ancien_sans_cle(self, engine):
+        """La clé va à la ligne la plus récente ; le doublon plus ancien est conservé sans clé"""
+        rows = rows_by_filename(engine)
+        assert len(rows) == len(BASELINE_ROWS)
+        assert rows["ancien.pdf"]["candidate_key"] is None
+        assert rows["ancien.pdf"]["email_normalized"] == "yann@a.fr"
+
+    def test_upload_fusionne(self, engine):
+        """Un nouvel upload d'un candidat existant met à jour sa ligne au lieu d'en créer une"""
+        recent_id = rows_by_filename(engine)["recent.pdf"]["id"]
+        with sessionmaker(bind=engine)() as db:
+            cv_id = save_extraction(db, {
+                "first_name": "Yann", "last_name": "Houndjo", "email": "YANN@a.fr",
+                "phone": "0612345678", "degree": "Master Informatique",
+            }, "nouveau.pdf")
+        rows = rows_by_filename(engine)
+        assert cv_id == recent_id
+        assert len(rows) == len(BASELINE_ROWS)
+        assert rows["nouveau.pdf"]["upload_count"] == 2
+
+    def test_migration_idempotente(self, engine):
+        """Une seconde migration ne modifie plus rien"""
+        before = rows_by_filename(engine)
+        migrate_schema(engine)
+        assert rows_by_filename(engine) == before
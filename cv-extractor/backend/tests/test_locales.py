@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import locales
+from services.degree_taxonomy import classify_degree
+from services.extractor import extract_cv_info, extract_phone
+from services.repository import build_row
+from services.sections import EDUCATION, load_heading_automaton, segment_sections
+
+CV_EN = """John SMITH
+Software Engineer
+Email: john.smith@example.co.uk | Phone: +44 7911 123456
+PROFESSIONAL EXPERIENCE
+Senior developer at Acme Ltd, London. Worked with the data team on the migration of our platform.
+EDUCATION
+Master's degree in Computer Science, University of Manchester
+"""
+
+CV_DE = """Lebenslauf
+Max MÜLLER
+Telefon: 0151 23456789 | max.mueller@example.de
+Berufserfahrung
+Softwareentwickler bei der Firma Beispiel GmbH und Mitarbeit an den Projekten für die Kunden
+Ausbildung
+Diplom-Ingenieur Informatik, TU München
+"""
+
+CV_ES = """María GARCÍA
+Teléfono: +34 612 345 678 · maria.garcia@example.es
+Experiencia laboral
+Desarrolladora en la empresa Ejemplo para los clientes del sector con el equipo de datos
+Formación académica
+Grado en Ingeniería Informática, Universidad de Sevilla
+"""
+
+
+class TestDetection:
+    """Tests pour la détection de la locale"""
+
+    def test_langues(self):
+        """Test de la détection sur des CV en anglais, allemand et espagnol"""
+        assert locales.detect_locale(CV_EN) == "en"
+        assert locales.detect_locale(CV_DE) == "de"
+        assert locales.detect_locale(CV_ES) == "es"
+        assert locales.detect_locale("Expérience chez CBX Group pour la refonte des outils et des tests") == "fr"
+
+    def test_sans_indice(self):
+        """Test qu'un texte sans indice suffisant garde la locale par défaut"""
+        assert locales.detect_locale("") == locales.DEFAULT_LOCALE
+        assert locales.detect_locale("Yann HOUNDJO 0771899574 Python SQL") == locales.DEFAULT_LOCALE
+
+    def test_indicatif(self):
+        """Test que l'indicatif téléphonique compte pour le pays"""
+        assert locales.detect_locale("Max Mustermann +49 151 23456789") == "de"
+
+    def test_pack_compile_une_fois(self):
+        """Test que les packs sont compilés à la demande puis gardés en cache"""
+        assert locales.get_pack("es") is locales.get_pack("es")
+        assert locales.get_pack("fr").phone_patterns[0].search("+33 6 12 34 56 78")
+
+
+class TestExtractionParLocale:
+    """Tests pour l'extraction avec le pack de la locale"""
+
+    def test_anglais(self):
+        """Test d'un CV anglais (téléphone britannique, diplôme anglais)"""
+        result = extract_cv_info(CV_EN)
+        assert result["locale"] == "en"
+        assert (result["first_name"], result["last_name"]) == ("John", "Smith")
+        assert result["phone"] == "+447911123456"
+        assert result["degree_label"] == "Master" and result["degree_field"] == "Computer Science"
+
+    def test_allemand(self):
+        """Test d'un CV allemand : numéro national normalisé avec l'indicatif +49"""
+        result = extract_cv_info(CV_DE)
+        assert result["locale"] == "de"
+        assert (result["first_name"], result["last_name"]) == ("Max", "Müller")
+        assert result["degree_label"] == "Ingénieur"
+        assert build_row(result, "cv.pdf")["phone_e164"] == "+4915123456789"
+
+    def test_espagnol(self):
+        """Test d'un CV espagnol"""
+        result = extract_cv_info(CV_ES)
+        assert result["locale"] == "es"
+        assert result["phone"] == "+34612345678"
+        assert result["degree_label"] == "Licence" and result["degree_level"] == 3
+
+    def test_numero_sans_prefixe(self):
+        """Test qu'un numéro espagnol ou américain sans indicatif est normalisé en E.164"""
+        result = extract_cv_info(CV_ES.replace("+34 612 345 678", "612 345 678"))
+        assert result["locale"] == "es"
+        assert build_row(result, "cv.pdf")["phone_e164"] == "+34612345678"
+        result = extract_cv_info(CV_EN.replace("+44 7911 123456", "(415) 555-1234"))
+        assert result["locale"] == "en"
+        assert build_row(result, "cv.pdf")["candidate_key"] == "email:john.smith@example.co.uk"
+        assert build_row(result, "cv.pdf")["phone_e164"] == "+14155551234"
+
+    def test_pack_explicite(self):
+        """Test qu'un pack ne reconnaît que les formats de son pays"""
+        assert extract_phone("0612345678", locales.get_pack("fr")) == "0612345678"
+        assert extract_phone("0612345678", locales.get_pack("en")) is None
+
+    def test_taxonomie_par_locale(self):
+        """Test que les mots-clés propres à une langue ne valent que pour elle"""
+        assert classify_degree("Full driving licence", "en") is None
+        assert classify_degree("Licence Informatique", "fr")["degree_label"] == "Licence"
+        assert classify_degree("Abitur 2015", "de")["degree_level"] == 0
+        assert classify_degree("Abitur 2015", "fr") is None
+
+    def test_titres_par_locale(self):
+        """Test que les titres allemands ne sont cherchés que dans les CV allemands"""
+        assert segment_sections(CV_DE, "de").has(EDUCATION)
+        assert not segment_sections(CV_DE, "fr").has(EDUCATION)
+        assert load_heading_automaton("en") is load_heading_automaton("fr")
@@ -0,0 +1,156 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.cv_database import CVExtraction, MinHashBand
+from services import history, minhash
+from services.repository import delete_extraction, record_upload
+
+WORDS = (
+    "python sql docker kubernetes fastapi projet équipe client données analyse développement "
+    "formation master licence université lille paris stage alternance agile scrum api web "
+    "conception tests déploiement cloud sécurité réseau java react vue angular linux git"
+).split()
+
+
+def make_text(seed, length=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edit(text, changes, seed=0):
+    """Remplace `changes` mots du texte"""
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = "modifié"
+    return " ".join(words)
+
+
+@pytest.fixture
+def db():
+    """Session sur une base SQLite en mémoire"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_cv(email, phone="Non trouvé"):
+    return {
+        "first_name": "Yann",
+        "last_name": "Houndjo",
+        "email": email,
+        "phone": phone,
+        "degree": "Master Informatique",
+    }
+
+
+class TestSignature:
+    """Tests pour les signatures MinHash"""
+
+    def test_similarite(self):
+        """Test que la similarité estimée suit la part de texte commune"""
+        text = make_text(1)
+        signature = minhash.compute_signature(text)
+        assert minhash.similarity(signature, minhash.compute_signature(text)) == 1
+        assert minhash.similarity(signature, minhash.compute_signature(edit(text, 5))) >= 0.8
+        assert minhash.similarity(signature, minhash.compute_signature(make_text(2))) < 0.2
+
+    def test_format(self):
+        """Test du stockage compact et des bandes"""
+        signature = minhash.compute_signature(make_text(1))
+        assert len(minhash.pack(signature)) == 4 * minhash.NUM_HASHES
+        assert minhash.unpack(minhash.pack(signature)) == signature
+        assert len(minhash.band_buckets(signature)) == minhash.LSH_BANDS
+        assert minhash.compute_signature("") is None
+        assert minhash.compute_signature(" ... ") is None
+        # Texte court : moins de cases que de shingles, toutes remplies
+        assert len(minhash.compute_signature("Yann HOUNDJO")) == minhash.NUM_HASHES
+
+
+class TestQuasiDoublons:
+    """Tests pour le rattachement des versions d'un même CV"""
+
+    def test_version_liee(self, db):
+        """Test qu'une version modifiée avec un autre contact est liée au CV d'origine"""
+        text = make_text(1)
+        first_id, duplicate_of = record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        assert duplicate_of is None
+        second_text = edit(text, 5)
+        second_id, duplicate_of = record_upload(db, make_cv("yann@new.fr"), "v2.pdf", second_text)
+        assert second_id != first_id and duplicate_of == first_id
+        # Une version de la version est rattachée au CV d'origine
+        _, duplicate_of = record_upload(db, make_cv("yann@other.fr"), "v3.pdf", edit(second_text, 3, seed=1))
+        assert duplicate_of == first_id
+        # Un CV différent n'est pas lié
+        assert record_upload(db, make_cv("autre@mail.fr"), "autre.pdf", make_text(2))[1] is None
+
+    def test_candidat_existant(self, db):
+        """Test que le lien renvoyé pour un candidat déjà connu est celui enregistré"""
+        text = make_text(1)
+        record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        other_id, _ = record_upload(db, make_cv("autre@mail.fr"), "autre.pdf", make_text(2))
+        # Même candidat, nouveau texte proche d'un autre CV : la ligne reste un CV d'origine
+        second_id, duplicate_of = record_upload(db, make_cv("autre@mail.fr"), "autre-v2.pdf", edit(text, 5))
+        assert second_id == other_id
+        assert duplicate_of is None
+        assert db.get(CVExtraction, other_id).duplicate_of is None
+
+        cv_text = make_text(4)
+        cv_root_id, _ = record_upload(db, make_cv("cv@old.fr"), "cv-v1.pdf", cv_text)
+        version_id, duplicate_of = record_upload(db, make_cv("cv@new.fr"), "cv-v2.pdf", edit(cv_text, 3))
+        assert duplicate_of == cv_root_id
+        # Même candidat deux fois : le lien renvoyé est toujours celui de la ligne
+        assert record_upload(db, make_cv("cv@new.fr"), "cv-v3.pdf", make_text(3)) == (version_id, cv_root_id)
+        db.expire_all()
+        assert db.get(CVExtraction, version_id).duplicate_of == cv_root_id
+    
+    def test_historique_groupe(self, db):
+        """Test du regroupement des versions dans l'historique"""
+        text = make_text(1)
+        first_id, _ = record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        record_upload(db, make_cv("yann@new.fr"), "v2.pdf", edit(text, 5))
+        record_upload(db, make_cv("autre@mail.fr"), "autre.pdf", make_text(2))
+
+        rows = history.fetch_history(db, 10, group_versions=True)
+        assert sorted(row["versions"] for row in rows) == [1, 2]
+        assert history.count_history(db, group_versions=True) == 2
+        assert len(history.fetch_history(db, 10, versions_of=first_id)) == 2
+
+    def test_fusion(self, db, monkeypatch):
+        """Test du mode "merge" : la version est fusionnée dans la ligne d'origine"""
+        monkeypatch.setattr(minhash, "NEAR_DUPLICATE_MODE", "merge")
+        text = make_text(1)
+        first_id, _ = record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        second_id, _ = record_upload(db, make_cv("yann@new.fr"), "v2.pdf", edit(text, 5))
+        assert second_id == first_id
+        row = db.get(CVExtraction, first_id)
+        assert row.upload_count == 2 and row.email == "yann@new.fr"
+
+    def test_suppression(self, db):
+        """Test que la suppression du CV d'origine détache ses versions et ses bandes"""
+        text = make_text(1)
+        first_id, _ = record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        second_id, _ = record_upload(db, make_cv("yann@new.fr"), "v2.pdf", edit(text, 5))
+        delete_extraction(db, first_id)
+        assert db.get(CVExtraction, second_id).duplicate_of is None
+        assert db.scalar(select(func.count()).select_from(MinHashBand)) == minhash.LSH_BANDS
+        assert record_upload(db, make_cv("yann@3.fr"), "v3.pdf", text)[1] == second_id
+
+    def test_desactive(self, db, monkeypatch):
+        """Test de NEAR_DUPLICATE_MODE=off"""
+        monkeypatch.setattr(minhash, "NEAR_DUPLICATE_MODE", "off")
+        text = make_text(1)
+        record_upload(db, make_cv("yann@old.fr"), "v1.pdf", text)
+        assert record_upload(db, make_cv("yann@new.fr"), "v2.pdf", text)[1] is None
@@ -0,0 +1,133 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import time
+
+import pytest
+from docx import Document
+
+from services import parser_pool as parser_pool_module
+from services.parser_pool import (
+    ParserPool, ParserCrashError, ParserError, ParseTimeoutError, RECYCLES_TOTAL, PEAK_RSS_BYTES
+)
+from services.pdf_parser import PageTimeoutError, page_deadline
+
+
+@pytest.fixture
+def cv_docx(tmp_path):
+    """CV DOCX minimal"""
+    path = tmp_path / "cv.docx"
+    document = Document()
+    document.add_paragraph("Yann HOUNDJO")
+    document.add_paragraph("yannmgh@gmail.com")
+    document.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def pool():
+    parser_pool = ParserPool(1, memory_limit_mb=0, max_docs=2, max_rss_mb=4096)
+    yield parser_pool
+    parser_pool.close()
+
+
+class TestParserPool:
+    """Tests pour le pool de processus de parsing"""
+
+    def test_extraction(self, pool, cv_docx):
+        """Test que le texte est extrait dans un processus du pool"""
+        assert "yannmgh@gmail.com" in pool.extract_text(cv_docx, "docx")
+        assert PEAK_RSS_BYTES.count() >= 1
+
+    def test_recyclage_apres_n_documents(self, pool, cv_docx):
+        """Test que le processus est recyclé après max_docs documents"""
+        before = RECYCLES_TOTAL.value(reason="max_docs")
+        for _ in range(3):
+            assert "Yann" in pool.extract_text(cv_docx, "docx")
+        assert RECYCLES_TOTAL.value(reason="max_docs") == before + 1
+
+    def test_fichier_invalide(self, pool, tmp_path, cv_docx):
+        """Test qu'un fichier illisible lève ParserError sans casser le pool"""
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"pas un pdf")
+        with pytest.raises(ParserError):
+            pool.extract_text(str(broken), "pdf")
+        assert "Yann" in pool.extract_text(cv_docx, "docx")
+
+
+def _crashing_pages(file_path, file_extension):
+    """Document qui fait tomber le processus de parsing"""
+    yield "Yann HOUNDJO\n"
+    os._exit(1)
+
+
+class TestProcessusArrete:
+    """Tests pour un processus de parsing arrêté au repos ou pendant un document"""
+
+    def test_mort_au_repos(self, pool, cv_docx):
+        """Test qu'un processus mort entre deux documents est remplacé sans erreur"""
+        assert "Yann" in pool.extract_text(cv_docx, "docx")
+        idle = pool._idle.queue[0]
+        idle.process.kill()
+        idle.process.join()
+
+        died_idle = RECYCLES_TOTAL.value(reason="died_idle")
+        crashed = RECYCLES_TOTAL.value(reason="crashed")
+        assert "Yann" in pool.extract_text(cv_docx, "docx")
+        assert RECYCLES_TOTAL.value(reason="died_idle") == died_idle + 1
+        assert RECYCLES_TOTAL.value(reason="crashed") == crashed
+
+    def test_arret_pendant_le_parsing(self, monkeypatch, cv_docx):
+        """Test qu'un arrêt pendant le parsing est imputé au document"""
+        monkeypatch.setattr(parser_pool_module, "iter_raw_text", _crashing_pages)
+        # "fork" : le processus hérite de la fonction remplacée
+        pool = ParserPool(1, memory_limit_mb=0, start_method="fork")
+        try:
+            crashed = RECYCLES_TOTAL.value(reason="crashed")
+            with pytest.raises(ParserCrashError):
+                pool.extract_text("crash.pdf", "pdf")
+            assert RECYCLES_TOTAL.value(reason="crashed") == crashed + 1
+
+            monkeypatch.undo()
+            assert "Yann" in pool.extract_text(cv_docx, "docx")
+        finally:
+            pool.close()
+
+
+def _slow_pages(file_path, file_extension):
+    """Document dont la deuxième page ne se termine jamais"""
+    yield "Yann HOUNDJO\n"
+    time.sleep(30)
+    yield "page 2\n"
+
+
+class TestDelais:
+    """Tests pour les délais de parsing"""
+
+    def test_delai_page(self):
+        """Test qu'une page trop longue est interrompue"""
+        with pytest.raises(PageTimeoutError):
+            with page_deadline(0.1):
+                time.sleep(2)
+
+    def test_delai_document(self, monkeypatch, cv_docx):
+        """Test que le processus est tué et que les pages déjà extraites sont retournées"""
+        monkeypatch.setattr(parser_pool_module, "iter_raw_text", _slow_pages)
+        # "fork" : le processus hérite de la fonction remplacée
+        pool = ParserPool(1, memory_limit_mb=0, start_method="fork", doc_timeout=0.5)
+        try:
+            started = time.monotonic()
+            with pytest.raises(ParseTimeoutError) as error:
+                pool.extract_text("lent.pdf", "pdf")
+            assert time.monotonic() - started < 5
+            assert error.value.partial_text == "Yann HOUNDJO"
+
+            # Le pool reste utilisable avec un nouveau processus
+            monkeypatch.undo()
+            assert "Yann" in pool.extract_text(cv_docx, "docx")
+        finally:
+            pool.close()
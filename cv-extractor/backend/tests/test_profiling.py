@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services import profiling
+from services.profiling import RequestProfile
+
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profiling, "PROFILE_KEEP_SLOWEST", 2)
+    return tmp_path / "profiles"
+
+
+def _profile():
+    profile = RequestProfile()
+    assert profile.call(_work, 1000) == _work(1000)
+    return profile
+
+
+class TestProfiling:
+    """Tests pour le profilage des requêtes"""
+
+    def test_jeton_admin(self, monkeypatch):
+        """Test que le profilage à la demande exige le jeton configuré"""
+        assert not profiling.is_admin("secret")
+        monkeypatch.setattr(profiling, "PROFILING_TOKEN", "secret")
+        assert profiling.is_admin("secret")
+        assert not profiling.is_admin("autre")
+        assert not profiling.is_admin(None)
+
+    def test_fusion_des_statistiques(self):
+        """Test que les statistiques d'un autre processus sont fusionnées"""
+        profile = _profile()
+        _, raw_stats = profiling.collect_stats(_work, 10)
+        profile.add_stats(raw_stats)
+
+        profile_id = profiling.save_on_demand(profile)
+        summary = profiling.render_summary(profiling.profile_path(profile_id))
+        assert "_work" in summary
+
+    def test_conserve_les_plus_lents(self):
+        """Test que seuls les PROFILE_KEEP_SLOWEST profils les plus lents sont gardés"""
+        assert profiling.keep_if_slow(_profile(), 0.3)
+        assert profiling.keep_if_slow(_profile(), 0.1)
+        assert profiling.keep_if_slow(_profile(), 0.05) is None
+        slowest = profiling.keep_if_slow(_profile(), 0.5)
+
+        kept = profiling.list_profiles()
+        assert len(kept) == 2
+        assert slowest in kept
+        assert all(not profile_id.startswith("slow_000000100") for profile_id in kept)
+
+    def test_requete_sans_statistiques(self):
+        """Test qu'une requête servie par un cache ne supprime aucun profil lent"""
+        kept = [profiling.keep_if_slow(_profile(), 0.3), profiling.keep_if_slow(_profile(), 0.1)]
+        assert profiling.keep_if_slow(RequestProfile(), 0.5) is None
+        assert sorted(profiling.list_profiles()) == sorted(kept)
+
+    def test_identifiant_invalide(self):
+        """Test qu'un identifiant hors format ne donne accès à aucun fichier"""
+        assert profiling.profile_path("../main") is None
+        assert profiling.profile_path("slow_1_000000000000") is None
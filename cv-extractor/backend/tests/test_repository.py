@@ -0,0 +1,167 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.cv_database import CVExtraction
+from services.locales import get_pack
+from services.normalize import normalize_email, normalize_phone_e164
+from services.extractor import EXTRACTOR_VERSION
+from services.repository import build_row, upsert_rows, save_extraction, decompress_text, reextracted_values
+
+
+@pytest.fixture
+def db():
+    """Session sur une base SQLite en mémoire"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_cv(**fields):
+    cv = {
+        "first_name": "Yann",
+        "last_name": "Houndjo",
+        "email": "yannmgh@gmail.com",
+        "phone": "0771899574",
+        "degree": "Bachelor CDA",
+    }
+    cv.update(fields)
+    return cv
+
+
+class TestNormalisation:
+    """Tests pour la normalisation des coordonnées"""
+    
+    def test_email(self):
+        """Test de la normalisation d'un email"""
+        assert normalize_email(" John.Doe@Example.COM ") == "john.doe@example.com"
+        assert normalize_email("Non trouvé") is None
+    
+    def test_phone_national(self):
+        """Test d'un numéro français national"""
+        assert normalize_phone_e164("06 12 34 56 78") == "+33612345678"
+    
+    def test_phone_international(self):
+        """Test des formats internationaux"""
+        assert normalize_phone_e164("(+33) 6 12 34 56 78") == "+33612345678"
+        assert normalize_phone_e164("0033612345678") == "+33612345678"
+        assert normalize_phone_e164("+33612345678") == "+33612345678"
+    
+    def test_phone_sans_prefixe(self):
+        """Test des numéros nationaux écrits sans "0", selon la locale du CV"""
+        assert normalize_phone_e164("612 345 678", get_pack("es")) == "+34612345678"
+        assert normalize_phone_e164("(415) 555-1234", get_pack("en")) == "+14155551234"
+        assert normalize_phone_e164("07911 123456", get_pack("en")) == "+447911123456"
+        assert normalize_phone_e164("0151 23456789", get_pack("de")) == "+4915123456789"
+        assert normalize_phone_e164("612 345 678") is None
+        assert normalize_phone_e164("612 345 678", get_pack("fr")) is None
+    
+    def test_phone_invalide(self):
+        """Test d'un numéro inexploitable"""
+        assert normalize_phone_e164("Non trouvé") is None
+        assert normalize_phone_e164("12") is None
+
+
+class TestUpsert:
+    """Tests pour l'enregistrement dédoublonné des candidats"""
+    
+    def test_meme_candidat_fusionne(self, db):
+        """Test que deux uploads du même candidat donnent une seule ligne"""
+        first_id = save_extraction(db, make_cv(), "cv_v1.pdf")
+        second_id = save_extraction(db, make_cv(email="YANNMGH@gmail.com"), "cv_v2.pdf")
+        
+        assert first_id == second_id
+        row = db.query(CVExtraction).one()
+        assert row.upload_count == 2
+        assert row.filename == "cv_v2.pdf"
+    
+    def test_valeur_connue_conservee(self, db):
+        """Test qu'un champ "Non trouvé" n'écrase pas une valeur connue"""
+        save_extraction(db, make_cv(), "cv_v1.pdf")
+        save_extraction(db, make_cv(degree="Non trouvé", phone="06 12 34 56 78"), "cv_v2.pdf")
+        
+        row = db.query(CVExtraction).one()
+        assert row.degree == "Bachelor CDA"
+        assert row.phone_e164 == "+33612345678"
+    
+    def test_meme_candidat_espagnol(self, db):
+        """Test qu'un numéro espagnol sans indicatif identifie le candidat"""
+        first_id = save_extraction(db, make_cv(email="Non trouvé", phone="612345678", locale="es"), "a.pdf")
+        second_id = save_extraction(db, make_cv(email="Non trouvé", phone="+34612345678", locale="es"), "b.pdf")
+        
+        assert first_id == second_id
+        row = db.query(CVExtraction).one()
+        assert row.candidate_key == "tel:+34612345678"
+        assert row.upload_count == 2
+    
+    def test_meme_candidat_americain(self, db):
+        """Test qu'un numéro nord-américain sans indicatif identifie le candidat"""
+        first_id = save_extraction(db, make_cv(email="Non trouvé", phone="(415)555-1234", locale="en"), "a.pdf")
+        second_id = save_extraction(db, make_cv(email="Non trouvé", phone="+14155551234", locale="en"), "b.pdf")
+        
+        assert first_id == second_id
+        assert db.query(CVExtraction).one().candidate_key == "tel:+14155551234"
+    
+    def test_candidats_differents(self, db):
+        """Test que deux candidats différents donnent deux lignes"""
+        save_extraction(db, make_cv(), "a.pdf")
+        save_extraction(db, make_cv(email="autre@example.com", phone="0612345678"), "b.pdf")
+        assert db.query(CVExtraction).count() == 2
+    
+    def test_sans_coordonnees(self, db):
+        """Test qu'un CV sans email ni téléphone est toujours inséré"""
+        save_extraction(db, make_cv(email="Non trouvé", phone="Non trouvé"), "a.pdf")
+        save_extraction(db, make_cv(email="Non trouvé", phone="Non trouvé"), "a.pdf")
+        assert db.query(CVExtraction).count() == 2
+    
+    def test_lot_avec_doublons(self, db):
+        """Test d'un lot contenant plusieurs fois le même candidat"""
+        rows = [build_row(make_cv(), f"cv_{i}.pdf") for i in range(3)]
+        upsert_rows(db, rows)
+        db.commit()
+        assert db.query(CVExtraction).one().upload_count == 3
+
+
+class TestTexteVersionne:
+    """Tests pour le stockage du texte et la ré-extraction"""
+    
+    def test_texte_stocke(self, db):
+        """Test que le texte est stocké compressé avec la version de l'extracteur"""
+        save_extraction(db, make_cv(), "cv.pdf", text="Yann HOUNDJO\nyannmgh@gmail.com")
+        row = db.query(CVExtraction).one()
+        assert decompress_text(row.normalized_text) == "Yann HOUNDJO\nyannmgh@gmail.com"
+        assert row.extractor_version == EXTRACTOR_VERSION
+    
+    def test_texte_conserve_sans_nouveau_texte(self, db):
+        """Test qu'un upload servi par le cache ne remplace pas le texte stocké"""
+        save_extraction(db, make_cv(), "cv_v1.pdf", text="texte v1")
+        save_extraction(db, make_cv(), "cv_v2.pdf")
+        assert decompress_text(db.query(CVExtraction).one().normalized_text) == "texte v1"
+    
+    def test_reextraction_upload_unique(self):
+        """Test qu'une ligne d'un seul upload prend le nouveau résultat tel quel"""
+        row = dict(make_cv(), id=1, upload_count=1, degree_level=3, degree_label="Licence", degree_field=None)
+        values = reextracted_values(row, make_cv(degree="Non trouvé", degree_level=None,
+                                                 degree_label=None, degree_field=None))
+        assert values["degree"] == "Non trouvé"
+        assert values["degree_level"] is None
+        assert values["extractor_version"] == EXTRACTOR_VERSION
+    
+    def test_reextraction_ligne_fusionnee(self):
+        """Test qu'une ligne fusionnée conserve ses valeurs connues"""
+        row = dict(make_cv(), id=1, upload_count=3, degree_level=3, degree_label="Licence", degree_field=None)
+        values = reextracted_values(row, make_cv(first_name="Yannick", degree="Non trouvé", degree_level=None,
+                                                 degree_label=None, degree_field=None))
+        assert values["first_name"] == "Yannick"
+        assert values["degree"] == "Bachelor CDA"
+        assert values["degree_level"] == 3
+        assert values["email_normalized"] == "yannmgh@gmail.com"
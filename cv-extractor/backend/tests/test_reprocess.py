@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+import reprocess
+from database import Base, create_database_engine
+from models.cv_database import CVExtraction
+from services.extractor import EXTRACTOR_VERSION
+from services.repository import save_extraction
+
+TEXT = "Yann HOUNDJO yann@a.fr 06 12 34 56 78 Master Informatique"
+
+
+def make_cv(phone):
+    return {
+        "first_name": "Yann", "last_name": "Houndjo", "email": "yann@a.fr",
+        "phone": phone, "degree": "Master Informatique",
+    }
+
+
+class FakePool:
+    """Pool exécuté dans le processus du test ; `during` simule une écriture concurrente"""
+
+    during = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, func, items, chunksize=1):
+        results = [func(item) for item in items]
+        if FakePool.during:
+            FakePool.during()
+            FakePool.during = None
+        return results
+
+
+@pytest.fixture
+def Session(tmp_path, monkeypatch):
+    """Base SQLite sur fichier (une connexion par session), pool dans le processus"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'cv.sqlite3'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(reprocess, "SessionLocal", Session)
+    monkeypatch.setattr(reprocess.multiprocessing, "Pool", FakePool)
+    monkeypatch.setattr(reprocess.sys, "stdout", sys.stdout)
+    yield Session
+    engine.dispose()
+
+
+def store_stale(Session, phone="06 12 34 56 78") -> int:
+    """Enregistre un CV avec une version d'extracteur obsolète"""
+    with Session() as db:
+        cv_id = save_extraction(db, make_cv(phone), "v1.pdf", text=TEXT)
+        db.execute(update(CVExtraction).where(CVExtraction.id == cv_id).values(extractor_version=1))
+        db.commit()
+    return cv_id
+
+
+class TestReextraction:
+    """Tests pour la ré-extraction des lignes obsolètes"""
+
+    def test_mise_a_jour(self, Session):
+        """Test qu'une ligne obsolète prend le résultat de l'extracteur courant"""
+        cv_id = store_stale(Session, phone="Non trouvé")
+        assert reprocess.reprocess(workers=1, batch_size=10) == (1, 0)
+        with Session() as db:
+            row = db.get(CVExtraction, cv_id)
+            assert row.phone == "0612345678" and row.extractor_version == EXTRACTOR_VERSION
+
+    def test_upload_concurrent_conserve(self, Session):
+        """Test qu'un upload enregistré pendant la ré-extraction du lot n'est pas écrasé"""
+        cv_id = store_stale(Session)
+
+        def concurrent_upload():
+            with Session() as db:
+                save_extraction(db, make_cv("07 98 76 54 32"), "v2.pdf", text=TEXT.replace("06 12 34 56 78", "07 98 76 54 32"))
+
+        FakePool.during = concurrent_upload
+        assert reprocess.reprocess(workers=1, batch_size=10) == (0, 0)
+        with Session() as db:
+            row = db.get(CVExtraction, cv_id)
+            assert row.phone == "07 98 76 54 32" and row.upload_count == 2
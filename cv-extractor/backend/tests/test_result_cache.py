@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.result_cache import ResultCache
+
+
+class TestResultCache:
+    """Tests pour le cache de résultats partagé"""
+    
+    def test_set_get(self, tmp_path):
+        """Test d'écriture puis de lecture d'une entrée"""
+        cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+        cache.set("abc", {"email": "john@example.com"})
+        assert cache.get("abc") == {"email": "john@example.com"}
+    
+    def test_cle_absente(self, tmp_path):
+        """Test avec une clé inconnue"""
+        cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+        assert cache.get("inconnue") is None
+    
+    def test_entree_expiree(self, tmp_path):
+        """Test qu'une entrée expirée n'est plus retournée"""
+        cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=10)
+        cache.set("abc", {"email": "john@example.com"}, ttl_seconds=-1)
+        assert cache.get("abc") is None
+    
+    def test_partage_entre_instances(self, tmp_path):
+        """Test que deux instances (deux workers) voient les mêmes entrées"""
+        path = str(tmp_path / "cache.sqlite3")
+        ResultCache(path, ttl_seconds=60, max_entries=10).set("abc", {"phone": "0612345678"})
+        assert ResultCache(path, ttl_seconds=60, max_entries=10).get("abc") == {"phone": "0612345678"}
+    
+    def test_limite_entrees(self, tmp_path):
+        """Test que prune() respecte le nombre maximal d'entrées"""
+        cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=2)
+        for i in range(5):
+            cache.set(f"k{i}", {"i": i}, ttl_seconds=60 + i)
+        cache.prune()
+        assert cache.get("k0") is None
+        assert cache.get("k4") == {"i": 4}
@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import random
+import re
+import time
+
+import pytest
+
+from services import regex_engine
+from services.extractor import extract_email
+from services.scanners import find_email, remove_letter_spacing
+
+# Patterns d'origine, pour comparer les résultats des scanners
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+SPACED_LETTERS_PATTERN = re.compile(r'(?<=[A-ZÀ-Ÿa-zà-ÿ])\s+(?=[A-ZÀ-Ÿa-zà-ÿ](?:\s|$))')
+
+
+def random_texts(count, alphabet="aZ.@-_1 é%+\n×", max_length=30):
+    rng = random.Random(42)
+    for _ in range(count):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+class TestScanners:
+    """Tests pour les scanners en temps linéaire"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Contact : yann.houndjo@gmail.com - 0771899574", "yann.houndjo@gmail.com"),
+        ("a@b.c yann@univ-lille.fr", "yann@univ-lille.fr"),
+        ("mail@domaine.com1 autre@domaine.org", "autre@domaine.org"),
+        ("-yann@a.b.fr.", "yann@a.b.fr"),
+        ("pas d'email ici @ ni là", None),
+    ])
+    def test_email(self, text, expected):
+        """Test de l'extraction de l'email"""
+        assert find_email(text) == expected
+
+    def test_email_comme_le_pattern(self):
+        """Test que le scanner donne le résultat du pattern d'origine (textes aléatoires)"""
+        for text in random_texts(20000):
+            match = EMAIL_PATTERN.search(text)
+            assert find_email(text) == (match.group(0) if match else None), text
+
+    def test_lettres_espacees_comme_le_pattern(self):
+        """Test que le scanner donne le résultat du pattern d'origine (textes aléatoires)"""
+        assert remove_letter_spacing("Y a n n  H O U N D J O") == "YannHOUNDJO"
+        for text in random_texts(20000, alphabet="aZé× \n\t."):
+            assert remove_letter_spacing(text) == SPACED_LETTERS_PATTERN.sub("", text), text
+
+
+class TestEntreesHostiles:
+    """Tests du coût de l'extraction sur des textes construits pour le retour arrière"""
+
+    @pytest.mark.parametrize("text", [
+        "a." * 100_000,
+        "yann@" + "a.1" * 60_000,
+        "a" * 200_000 + "@b.c.d1",
+    ])
+    def test_email_lineaire(self, text):
+        """Test qu'un texte de 200 ko est traité rapidement (l'ancien pattern : environ une minute)"""
+        started = time.perf_counter()
+        extract_email(text)
+        assert time.perf_counter() - started < 1
+
+
+class TestMoteur:
+    """Tests pour le choix du moteur d'expressions régulières"""
+
+    def test_repli_sur_re(self, monkeypatch):
+        """Test que le module re est utilisé si google-re2 n'est pas installé"""
+        monkeypatch.setattr(regex_engine, "REGEX_ENGINE", "re2")
+        monkeypatch.setattr(regex_engine, "re2", None)
+        assert regex_engine.active_engine() == "re"
+        assert isinstance(regex_engine.compile(r"\d+"), re.Pattern)
+
+    def test_re2(self, monkeypatch):
+        """Test des patterns de l'extracteur avec google-re2"""
+        re2 = pytest.importorskip("re2")
+        monkeypatch.setattr(regex_engine, "REGEX_ENGINE", "re2")
+        monkeypatch.setattr(regex_engine, "re2", re2)
+        assert regex_engine.active_engine() == "re2"
+        pattern = regex_engine.compile(r"0[1-9](?:\s?\d{2}){4}")
+        assert pattern.search("Tél : 07 71 89 95 74").group(0) == "07 71 89 95 74"
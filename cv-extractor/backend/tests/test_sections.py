@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from services.extractor import extract_cv_info, extract_degree_info
+from services.sections import EDUCATION, EXPERIENCE, HEADER, SKILLS, segment_sections
+
+# Texte nettoyé tel que produit par le parsing : une seule ligne
+CV_TEXT = (
+    "Yann HOUNDJO yannmgh@gmail.com 07 71 89 95 74 "
+    "EXPÉRIENCES PROFESSIONNELLES Scrum Master chez Orange (2021-2023) "
+    "J'ai une expérience de la formation des équipes. "
+    "Formation Licence Informatique, Université de Lille "
+    "Compétences : Python, SQL"
+)
+
+
+class TestSegmentation:
+    """Tests pour le découpage du CV en sections"""
+
+    def test_sections(self):
+        """Test que les titres découpent le texte dans l'ordre"""
+        index = segment_sections(CV_TEXT)
+        assert [section.name for section in index.sections] == [HEADER, EXPERIENCE, EDUCATION, SKILLS]
+        assert index.select([EDUCATION]).strip() == "Licence Informatique, Université de Lille"
+        assert index.select([SKILLS]).strip() == "Python, SQL"
+        assert "yannmgh@gmail.com" in index.select([HEADER])
+
+    def test_mot_dans_une_phrase(self):
+        """Test qu'un mot-clé en minuscules ou dans une phrase n'est pas un titre"""
+        index = segment_sections("Yann HOUNDJO. J'ai une Expérience de la formation continue.")
+        assert [section.name for section in index.sections] == [HEADER]
+
+    @pytest.mark.parametrize("text", [
+        "Diplômes : Master Informatique",
+        "DIPLÔMES Master Informatique",
+        "Yann HOUNDJO\nFormation\nMaster Informatique",
+    ])
+    def test_formes_de_titres(self, text):
+        """Test des titres en majuscules, suivis de ':' ou en début de ligne"""
+        assert segment_sections(text).select([EDUCATION]).strip() == "Master Informatique"
+
+    def test_sans_titre(self):
+        """Test qu'un texte sans titre est entièrement dans l'en-tête"""
+        index = segment_sections("Yann HOUNDJO Master Informatique")
+        assert index.without([EXPERIENCE]) == "Yann HOUNDJO Master Informatique"
+
+
+class TestExtractionParSection:
+    """Tests pour les extracteurs limités à leurs sections"""
+
+    def test_diplome_dans_la_formation(self):
+        """Test que le "Scrum Master" d'une expérience n'est pas pris pour un diplôme"""
+        info = extract_degree_info(CV_TEXT)
+        assert info["degree_label"] == "Licence"
+        assert info["degree_field"] == "Informatique"
+
+    def test_diplome_hors_formation(self):
+        """Test du repli sur le reste du texte si la formation ne cite aucun diplôme"""
+        text = "Yann HOUNDJO Titulaire d'un Master MIAGE EXPÉRIENCE Ingénieur DevOps FORMATION Université de Lille"
+        assert extract_degree_info(text)["degree_label"] == "Master"
+
+    def test_coordonnees(self):
+        """Test que les coordonnées sont trouvées dans l'en-tête"""
+        result = extract_cv_info(CV_TEXT)
+        assert result["email"] == "yannmgh@gmail.com"
+        assert result["phone"] == "0771899574"
@@ -0,0 +1,196 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import threading
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_database_engine
+from models.cv_database import CVExtraction, StatsTotal
+from services import stats
+from services.extractor import extract_cv_info
+from services.repository import (
+    build_row, delete_extraction, delete_extractions, lock_candidate_keys, rebuild_stats, save_extraction,
+    update_totals, upsert_rows
+)
+
+
+@pytest.fixture
+def db():
+    """Session sur une base SQLite en mémoire"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_cv(email, phone="Non trouvé", degree="Master Informatique", label="Master"):
+    return {
+        "first_name": "Yann",
+        "last_name": "Houndjo",
+        "email": email,
+        "phone": phone,
+        "degree": degree,
+        "degree_level": 5 if label else None,
+        "degree_label": label,
+        "degree_field": None,
+    }
+
+
+def totals(db):
+    return {(row.metric, row.value): row.count for row in db.scalars(select(StatsTotal)) if row.count}
+
+
+class TestCompteurs:
+    """Tests pour la mise à jour incrémentale des statistiques"""
+
+    def test_identiques_au_recalcul(self, db):
+        """Test que les compteurs incrémentaux égalent un recalcul complet"""
+        first_id = save_extraction(db, make_cv("yann@a.fr"), "a.pdf")
+        # Même candidat : le téléphone est trouvé, le diplôme ne l'est plus (valeur conservée)
+        save_extraction(db, make_cv("yann@a.fr", phone="0612345678", degree="Non trouvé", label=None), "a2.pdf")
+        save_extraction(db, make_cv("Non trouvé", degree="BTS SIO", label="BTS"), "b.pdf")
+        other_id = save_extraction(db, make_cv("autre@b.fr", degree="Non trouvé", label=None), "c.pdf")
+        save_extraction(db, make_cv("dernier@c.fr"), "d.pdf")
+        delete_extraction(db, first_id)
+        delete_extractions(db, [other_id, 999])
+
+        incremental = totals(db)
+        rebuild_stats(db)
+        assert incremental == totals(db)
+        assert incremental[("cvs", "")] == 2
+        assert incremental[("missing", "email")] == 1
+        assert incremental[("degree", "BTS")] == 1
+
+    def test_reextraction(self, db):
+        """Test de la différence avant / après d'une mise à jour directe"""
+        cv_id = save_extraction(db, make_cv("yann@a.fr", degree="Non trouvé", label=None), "a.pdf")
+        before = db.execute(select(*[CVExtraction.__table__.c[field] for field in (
+            "first_name", "last_name", "email", "phone", "degree", "degree_label"
+        )])).mappings().all()
+        after = {**before[0], "degree": "Licence Informatique", "degree_label": "Licence"}
+        db.execute(update(CVExtraction).where(CVExtraction.id == cv_id)
+                   .values(degree=after["degree"], degree_label=after["degree_label"]))
+        update_totals(db, before, [after])
+
+        incremental = totals(db)
+        rebuild_stats(db)
+        assert incremental == totals(db)
+        assert ("missing", "degree") not in incremental
+
+    def test_analyse_selective(self, db):
+        """Test qu'une analyse ?fields=email ne compte pas les champs non demandés"""
+        cv_data = extract_cv_info("Yann HOUNDJO yann@a.fr Master Informatique", fields=("email",))
+        save_extraction(db, cv_data, "a.pdf")
+        save_extraction(db, make_cv("autre@b.fr", degree="Non trouvé", label=None), "b.pdf")
+
+        incremental = totals(db)
+        assert ("missing", "phone") in incremental and incremental[("missing", "phone")] == 1
+        assert incremental[("extracted", "phone")] == 1
+        assert incremental[("degree", "Non trouvé")] == 1 and ("degree", "Master") not in incremental
+        rebuild_stats(db)
+        assert incremental == totals(db)
+
+        result = stats.fetch_stats(db, today=datetime.utcnow().date())
+        assert result["fields"]["email"] == {"missing": 0, "found_rate": 1.0}
+        assert result["fields"]["phone"] == {"missing": 1, "found_rate": 0.0}
+        assert result["daily"][-1]["fields"]["degree"] == {"missing": 1, "found_rate": 0.0}
+
+
+class TestConcurrence:
+    """Tests pour les uploads simultanés d'un même nouveau candidat"""
+
+    def test_insertions_simultanees(self, tmp_path):
+        """Test que des uploads parallèles du même nouveau candidat ne le comptent qu'une fois"""
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'cv.sqlite3'}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def upload(index):
+            session = Session()
+            try:
+                barrier.wait()
+                save_extraction(session, make_cv("nouveau@a.fr"), f"{index}.pdf")
+            except Exception as error:
+                errors.append(error)
+            finally:
+                session.close()
+
+        threads = [threading.Thread(target=upload, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session = Session()
+        try:
+            assert not errors
+            incremental = totals(session)
+            assert incremental[("cvs", "")] == 1
+            rebuild_stats(session)
+            assert incremental == totals(session)
+        finally:
+            session.close()
+            engine.dispose()
+
+    def test_verrou_postgresql(self):
+        """Test que PostgreSQL verrouille chaque clé, même absente, dans un ordre stable"""
+        class Dialect:
+            name = "postgresql"
+
+        class Recorder:
+            statements = []
+
+            def get_bind(self):
+                return type("Bind", (), {"dialect": Dialect})()
+
+            def execute(self, statement):
+                self.statements.append(str(statement.compile(
+                    dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+                )))
+
+        recorder = Recorder()
+        lock_candidate_keys(recorder, ["email:b@b.fr", "email:a@a.fr", "email:b@b.fr"])
+        assert len(recorder.statements) == 2
+        assert "pg_advisory_xact_lock(hashtext('email:a@a.fr'))" in recorder.statements[0]
+        assert "email:b@b.fr" in recorder.statements[1]
+
+
+class TestLecture:
+    """Tests pour GET /api/v1/stats"""
+
+    def test_quotidien_et_taux(self, db):
+        """Test des uploads par jour (doublons compris) et des taux de réussite"""
+        rows = [
+            build_row(make_cv("yann@a.fr"), "a.pdf", seen_at=datetime(2026, 10, 17, 9)),
+            build_row(make_cv("yann@a.fr"), "a2.pdf", seen_at=datetime(2026, 10, 17, 18)),
+            build_row(make_cv("Non trouvé", phone="0612345678", label=None, degree="Non trouvé"), "b.pdf",
+                      seen_at=datetime(2026, 10, 19, 8)),
+        ]
+        upsert_rows(db, rows)
+        db.commit()
+
+        result = stats.fetch_stats(db, days=7, today=date(2026, 10, 19))
+        assert result["cvs"] == 2
+        assert result["fields"]["email"] == {"missing": 1, "found_rate": 0.5}
+        assert result["degrees"] == {"Master": 1, "Non trouvé": 1}
+        assert [(day["day"], day["uploads"]) for day in result["daily"]] == [("2026-10-17", 2), ("2026-10-19", 1)]
+        assert result["daily"][0]["fields"]["phone"] == {"missing": 2, "found_rate": 0.0}
+        # Fenêtre d'un jour : seul le jour même
+        assert len(stats.fetch_stats(db, days=1, today=date(2026, 10, 19))["daily"]) == 1
+
+    def test_base_vide(self, db):
+        """Test sans aucun CV"""
+        result = stats.fetch_stats(db)
+        assert result["cvs"] == 0 and result["daily"] == []
+        assert result["fields"]["email"]["found_rate"] is None
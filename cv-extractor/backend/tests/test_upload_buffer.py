@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import hashlib
+import io
+import time
+from multiprocessing import shared_memory
+
+import pytest
+from docx import Document
+
+from services import parser_pool as parser_pool_module
+from services import upload_buffer
+from services.parser_pool import ParserPool, ParseTimeoutError
+from services.upload_buffer import UploadBuffer, open_source
+
+
+@pytest.fixture
+def cv_bytes():
+    """Contenu d'un CV DOCX minimal"""
+    document = Document()
+    document.add_paragraph("Yann HOUNDJO")
+    document.add_paragraph("yannmgh@gmail.com")
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+def segment_exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+class TestUploadBuffer:
+    """Tests pour la copie des uploads en mémoire partagée"""
+
+    def test_memoire_partagee(self, tmp_path, cv_bytes):
+        """Test que le contenu et le hash sont ceux de l'upload, sans fichier sur disque"""
+        upload, file_hash = UploadBuffer.from_file(io.BytesIO(cv_bytes), tmp_path, "docx")
+        try:
+            assert file_hash == hashlib.sha256(cv_bytes).hexdigest()
+            kind, name, size = upload.handle
+            assert kind == "shm" and size == len(cv_bytes)
+            assert list(tmp_path.iterdir()) == []
+            with open_source(upload.handle) as source:
+                assert source.read() == cv_bytes
+        finally:
+            upload.close()
+        assert not segment_exists(name)
+        upload.close()
+
+    def test_repli_sur_fichier(self, monkeypatch, tmp_path, cv_bytes):
+        """Test du fichier temporaire si la mémoire partagée est désactivée"""
+        monkeypatch.setattr(upload_buffer, "SHARED_MEMORY_UPLOADS", False)
+        upload, _ = UploadBuffer.from_file(io.BytesIO(cv_bytes), tmp_path, "docx")
+        path = Path(upload.handle)
+        assert path.read_bytes() == cv_bytes
+        upload.close()
+        assert not path.exists()
+
+
+def _slow_pages(source, file_extension):
+    """Document dont la deuxième page ne se termine jamais"""
+    source.read()
+    yield "Yann HOUNDJO\n"
+    time.sleep(30)
+    yield "page 2\n"
+
+
+class TestTransmissionAuPool:
+    """Tests pour la lecture des uploads par les processus de parsing"""
+
+    def test_extraction(self, tmp_path, cv_bytes):
+        """Test que le processus de parsing lit le document dans le segment"""
+        pool = ParserPool(1, memory_limit_mb=0)
+        upload, _ = UploadBuffer.from_file(io.BytesIO(cv_bytes), tmp_path, "docx")
+        try:
+            assert "yannmgh@gmail.com" in pool.extract_text(upload.handle, "docx")
+        finally:
+            upload.close()
+            pool.close()
+
+    def test_segment_libere_apres_delai(self, monkeypatch, tmp_path, cv_bytes):
+        """Test que le segment est supprimé quand le processus de parsing est tué"""
+        monkeypatch.setattr(parser_pool_module, "iter_raw_text", _slow_pages)
+        pool = ParserPool(1, memory_limit_mb=0, start_method="fork", doc_timeout=0.5)
+        upload, _ = UploadBuffer.from_file(io.BytesIO(cv_bytes), tmp_path, "pdf")
+        name = upload.handle[1]
+        try:
+            with pytest.raises(ParseTimeoutError):
+                pool.extract_text(upload.handle, "pdf")
+        finally:
+            upload.close()
+            pool.close()
+        assert not segment_exists(name)
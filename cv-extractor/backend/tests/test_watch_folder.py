@@ -0,0 +1,185 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import watch_folder
+from database import Base
+from models.cv_database import CVExtraction
+from watch_folder import FileIndex, FolderWatcher, PendingFiles
+
+
+class TestFileIndex:
+    """Tests pour l'index persistant des fichiers vus"""
+
+    def test_fichier_inchange(self, tmp_path):
+        """Test qu'un fichier indexé et non modifié est reconnu"""
+        cv = tmp_path / "cv.pdf"
+        cv.write_bytes(b"%PDF")
+        stat = cv.stat()
+        index = FileIndex(tmp_path / "index.sqlite3")
+        index.record([(str(cv), stat.st_mtime_ns, stat.st_size, "abc", "ok")])
+        assert index.is_current(str(cv), stat)
+
+    def test_fichier_modifie(self, tmp_path):
+        """Test qu'un changement de taille rend l'entrée obsolète"""
+        cv = tmp_path / "cv.pdf"
+        cv.write_bytes(b"%PDF")
+        stat = cv.stat()
+        index = FileIndex(tmp_path / "index.sqlite3")
+        index.record([(str(cv), stat.st_mtime_ns, stat.st_size, "abc", "ok")])
+        cv.write_bytes(b"%PDF-1.7")
+        assert not index.is_current(str(cv), cv.stat())
+
+    def test_persistance(self, tmp_path):
+        """Test que l'index survit à une réouverture (redémarrage)"""
+        FileIndex(tmp_path / "index.sqlite3").record([("/depot/cv.pdf", 1, 2, "abc", "ok")])
+        assert FileIndex(tmp_path / "index.sqlite3").get("/depot/cv.pdf") == (1, 2, "abc")
+
+
+class TestPendingFiles:
+    """Tests pour l'attente de stabilité des fichiers (debounce)"""
+
+    def test_extension_ignoree(self, tmp_path):
+        """Test qu'un fichier non supporté n'est pas mis en attente"""
+        pending = PendingFiles(debounce=0)
+        pending.touch(str(tmp_path / "notes.txt"))
+        assert len(pending) == 0
+
+    def test_fichier_stable(self, tmp_path):
+        """Test qu'un fichier n'est prêt qu'après deux contrôles identiques"""
+        cv = tmp_path / "cv.pdf"
+        cv.write_bytes(b"%PDF")
+        pending = PendingFiles(debounce=0)
+        pending.touch(str(cv))
+        assert pending.pop_ready(10) == []
+        ready = pending.pop_ready(10)
+        assert [path for path, _ in ready] == [str(cv)]
+        assert len(pending) == 0
+
+    def test_fichier_supprime(self, tmp_path):
+        """Test qu'un fichier supprimé avant traitement est oublié"""
+        pending = PendingFiles(debounce=0)
+        pending.touch(str(tmp_path / "absent.pdf"))
+        assert pending.pop_ready(10) == []
+        assert len(pending) == 0
+
+
+class FakePool:
+    """Pool exécuté dans le processus du test"""
+
+    def map(self, func, items):
+        return [func(item) for item in items]
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def fake_process(path):
+    return path, ({
+        "first_name": "Yann", "last_name": "Houndjo", "email": f"{Path(path).stem}@a.fr",
+        "phone": "Non trouvé", "degree": "Non trouvé",
+    }, "texte"), None
+
+
+class TestFichierIllisible:
+    """Tests pour un fichier qui disparaît ou se verrouille après son contrôle de stabilité"""
+
+    def test_fichier_supprime_apres_controle(self, tmp_path, monkeypatch):
+        """Test qu'un fichier supprimé est oublié et qu'un fichier verrouillé est remis en attente"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        monkeypatch.setattr(watch_folder, "SessionLocal", Session)
+        monkeypatch.setattr(watch_folder.multiprocessing, "Pool", lambda *args, **kwargs: FakePool())
+        monkeypatch.setattr(watch_folder, "_process", fake_process)
+        real_hash = watch_folder.file_hash
+
+        def file_hash(path):
+            if path.name == "verrouille.pdf":
+                raise PermissionError(13, "Permission denied", str(path))
+            return real_hash(path)
+
+        monkeypatch.setattr(watch_folder, "file_hash", file_hash)
+        for name in ("a.pdf", "supprime.pdf", "verrouille.pdf"):
+            (tmp_path / name).write_bytes(f"%PDF {name}".encode())
+        index = FileIndex(tmp_path / "index.sqlite3")
+        watcher = FolderWatcher(tmp_path, index, workers=1, batch_size=10, debounce=0, poll_interval=1)
+        watcher.scan()
+        watcher.pending.pop_ready(10)  # premier contrôle de stabilité
+
+        pop_ready = watcher.pending.pop_ready
+
+        def pop_then_delete(limit):
+            ready = pop_ready(limit)
+            (tmp_path / "supprime.pdf").unlink()
+            return ready
+
+        monkeypatch.setattr(watcher.pending, "pop_ready", pop_then_delete)
+        assert watcher.process_ready() == 3
+        assert index.get(str(tmp_path / "a.pdf")) is not None
+        assert index.get(str(tmp_path / "supprime.pdf")) is None
+        assert index.get(str(tmp_path / "verrouille.pdf")) is None
+        assert len(watcher.pending) == 1
+        with Session() as db:
+            assert db.scalar(select(func.count()).select_from(CVExtraction)) == 1
+
+
+class TestEcritureEnBase:
+    """Tests pour la reprise d'un lot dont l'écriture en base échoue"""
+
+    def test_lot_remis_en_attente(self, tmp_path, monkeypatch):
+        """Test qu'une erreur de base ne perd pas le lot et n'arrête pas le démon"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        monkeypatch.setattr(watch_folder, "SessionLocal", Session)
+        monkeypatch.setattr(watch_folder.multiprocessing, "Pool", lambda *args, **kwargs: FakePool())
+        monkeypatch.setattr(watch_folder, "_process", fake_process)
+
+        real_upsert = watch_folder.upsert_rows
+        calls = []
+
+        def failing_upsert(db, rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return real_upsert(db, rows)
+
+        monkeypatch.setattr(watch_folder, "upsert_rows", failing_upsert)
+        for name in ("a.pdf", "b.pdf"):
+            (tmp_path / name).write_bytes(b"%PDF")
+        index = FileIndex(tmp_path / "index.sqlite3")
+        watcher = FolderWatcher(tmp_path, index, workers=1, batch_size=10, debounce=0, poll_interval=1)
+        watcher.retry_delay = 0
+        watcher.scan()
+        watcher.pending.pop_ready(10)  # premier contrôle de stabilité
+
+        assert watcher.process_ready() == 2
+        assert watcher.failures == 1 and len(watcher.pending) == 2
+        assert index.get(str(tmp_path / "a.pdf")) is None
+
+        assert watcher.process_ready() == 2
+        assert calls == [2, 2] and watcher.failures == 0 and len(watcher.pending) == 0
+        assert index.get(str(tmp_path / "a.pdf")) is not None
+        with Session() as db:
+            assert db.scalar(select(func.count()).select_from(CVExtraction)) == 2
+
+    def test_delai_croissant(self, tmp_path):
+        """Test qu'un fichier remis en attente n'est prêt qu'après le délai, sans nouveau contrôle de stabilité"""
+        cv = tmp_path / "cv.pdf"
+        cv.write_bytes(b"%PDF")
+        pending = PendingFiles(debounce=0)
+        pending.retry([(str(cv), cv.stat())], delay=60)
+        assert pending.pop_ready(10) == [] and len(pending) == 1
+        immediate = PendingFiles(debounce=0)
+        immediate.retry([(str(cv), cv.stat())], delay=0)
+        assert [path for path, _ in immediate.pop_ready(10)] == [str(cv)]
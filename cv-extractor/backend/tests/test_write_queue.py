@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+# Ajoute le dossier backend au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_database_engine
+from models.cv_database import CVExtraction
+from services.repository import delete_extraction, save_extraction
+from services.write_queue import WriteQueue
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Base SQLite sur fichier, avec les réglages du mode embarqué"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'db' / 'cv.sqlite3'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def write_queue(engine):
+    write_queue = WriteQueue(sessionmaker(bind=engine))
+    yield write_queue
+    write_queue.close()
+
+
+def make_cv(index):
+    return {
+        "first_name": "Yann",
+        "last_name": "Houndjo",
+        "email": f"yann{index}@example.com",
+        "phone": "Non trouvé",
+        "degree": "Non trouvé",
+    }
+
+
+class TestModeSQLite:
+    """Tests pour le stockage SQLite embarqué"""
+
+    def test_pragmas(self, engine):
+        """Test que la base est en WAL avec un délai d'attente du verrou"""
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+    def test_ecritures_concurrentes(self, engine, write_queue):
+        """Test que des écritures venues de plusieurs threads aboutissent toutes"""
+        errors = []
+
+        def upload(worker):
+            for index in range(worker, 200, 8):
+                try:
+                    write_queue.run(save_extraction, make_cv(index), f"cv{index}.pdf")
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=upload, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        db = sessionmaker(bind=engine)()
+        assert db.query(CVExtraction).count() == 200
+        db.close()
+
+    def test_erreur_propagee(self, write_queue):
+        """Test qu'une écriture en échec lève son exception sans bloquer la file"""
+        def failing(db):
+            raise ValueError("écriture impossible")
+
+        with pytest.raises(ValueError):
+            write_queue.run(failing)
+        cv_id = write_queue.run(save_extraction, make_cv(1), "cv.pdf")
+        assert write_queue.run(delete_extraction, cv_id)
+        assert not write_queue.run(delete_extraction, cv_id)
@@ -0,0 +1,353 @@
+"""
+Démon d'ingestion d'un dossier surveillé (dépôt de l'ATS).
+
+Les fichiers PDF/DOCX nouveaux ou modifiés sont détectés (inotify via
+watchdog, ou scrutation périodique si watchdog n'est pas installé),
+attendus jusqu'à ce qu'ils soient stables (debounce), traités par lots
+dans un pool de processus puis enregistrés en base.
+
+Un index persistant (SQLite : chemin, mtime, taille, hash) mémorise les
+fichiers déjà traités : au redémarrage, seul un `stat` est fait sur les
+fichiers existants, et seuls les fichiers nouveaux ou modifiés sont traités.
+
+Si l'écriture en base échoue (base verrouillée, connexion perdue), le lot
+est annulé et ses fichiers sont remis en attente, avec un délai qui double
+à chaque échec consécutif : le démon continue de tourner. De même, un
+fichier supprimé avant sa lecture est oublié, un fichier encore
+verrouillé est remis en attente.
+
+Usage :
+    cd backend
+    python watch_folder.py /chemin/vers/depot [--debounce 2] [--batch-size 50]
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Configure le PYTHONPATH AVANT tous les autres imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bulk_ingest import discover_files, file_hash
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SessionLocal
+from init_db import init_database
+from services.pipeline import SUPPORTED_EXTENSIONS, process_file
+from services.repository import build_row, upsert_rows
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # dépendance optionnelle : scrutation périodique
+    Observer = None
+    FileSystemEventHandler = object
+
+INDEX_NAME = ".cv_watch_index.sqlite3"
+# Délai avant de retenter un lot dont l'écriture en base a échoué (doublé à chaque échec)
+RETRY_DELAY = 5.0
+RETRY_MAX_DELAY = 300.0
+
+
+class FileIndex:
+    """
+    Index persistant des fichiers vus : chemin -> (mtime, taille, hash, statut).
+    """
+
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " hash TEXT,"
+            " status TEXT NOT NULL,"
+            " processed_at REAL NOT NULL)"
+        )
+
+    def get(self, path: str) -> Optional[Tuple[int, int, str]]:
+        return self.conn.execute(
+            "SELECT mtime_ns, size, hash FROM files WHERE path = ?", (path,)
+        ).fetchone()
+
+    def is_current(self, path: str, stat: os.stat_result) -> bool:
+        """Le fichier n'a pas changé depuis son dernier traitement"""
+        entry = self.get(path)
+        return entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+
+    def record(self, entries: List[Tuple[str, int, int, str, str]]) -> None:
+        """Enregistre (chemin, mtime, taille, hash, statut) pour un lot"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, hash, status, processed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [entry + (now,) for entry in entries]
+            )
+
+
+class PendingFiles:
+    """
+    Fichiers en attente, traités seulement quand ils n'ont pas bougé
+    depuis `debounce` secondes (copie en cours terminée).
+    """
+
+    def __init__(self, debounce: float):
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+
+    def touch(self, path: str) -> None:
+        if path.rsplit(".", 1)[-1].lower() not in SUPPORTED_EXTENSIONS:
+            return
+        with self._lock:
+            self._pending[path] = (time.monotonic(), None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def retry(self, ready: List[Tuple[str, os.stat_result]], delay: float) -> None:
+        """Remet en attente des fichiers déjà stables, prêts à nouveau dans `delay` secondes"""
+        with self._lock:
+            for path, stat in ready:
+                # Un événement reçu entre-temps (fichier modifié) garde la priorité
+                if path not in self._pending:
+                    self._pending[path] = (
+                        time.monotonic() + delay - self.debounce, (stat.st_mtime_ns, stat.st_size)
+                    )
+
+    def pop_ready(self, limit: int) -> List[Tuple[str, os.stat_result]]:
+        """Retire et retourne jusqu'à `limit` fichiers stables"""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (last_event, last_stat) in list(self._pending.items()):
+                if len(ready) >= limit:
+                    break
+                if now - last_event < self.debounce:
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    del self._pending[path]
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if signature != last_stat:
+                    # Encore modifié depuis le dernier contrôle : on attend encore
+                    self._pending[path] = (now, signature)
+                    continue
+                del self._pending[path]
+                ready.append((path, stat))
+        return ready
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Relaie les événements inotify vers la liste d'attente"""
+
+    def __init__(self, pending: PendingFiles):
+        self.pending = pending
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.pending.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.pending.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.pending.touch(event.dest_path)
+
+
+def _init_worker() -> None:
+    """
+    Sortie des extracteurs muette. Les signaux d'arrêt, souvent envoyés à
+    tout le groupe de processus, sont ignorés : le parent termine le lot
+    en cours puis ferme le pool.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.stdout = open(os.devnull, "w")
+
+
+def _process(path: str) -> Tuple[str, Optional[Tuple[Dict, str]], Optional[str]]:
+    try:
+        return path, process_file(path, path.rsplit(".", 1)[-1].lower()), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class FolderWatcher:
+    """
+    Boucle principale : réconciliation au démarrage, puis traitement par
+    lots des fichiers stables.
+    """
+
+    def __init__(self, root: Path, index: FileIndex, workers: int, batch_size: int,
+                 debounce: float, poll_interval: float):
+        self.root = root
+        self.index = index
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.pending = PendingFiles(debounce)
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker, maxtasksperchild=200)
+        self.retry_delay = RETRY_DELAY
+        self.failures = 0
+        # Simple drapeau : un threading.Event positionné depuis le gestionnaire
+        # de signal peut bloquer si le thread principal est dans Event.wait()
+        self.stopping = False
+
+    def scan(self) -> int:
+        """
+        Met en attente les fichiers nouveaux ou modifiés d'après l'index
+        (un simple stat par fichier, sans relecture du contenu).
+        """
+        count = 0
+        for path in discover_files(self.root):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if not self.index.is_current(str(path), stat):
+                self.pending.touch(str(path))
+                count += 1
+        return count
+
+    def process_ready(self) -> int:
+        """Traite un lot de fichiers stables. Retourne le nombre de fichiers traités."""
+        ready = self.pending.pop_ready(self.batch_size)
+        if not ready:
+            return 0
+
+        # Contenu inchangé (simple "touch") : pas de retraitement
+        to_process, entries, unreadable = [], [], []
+        stats = {}
+        for path, stat in ready:
+            try:
+                digest = file_hash(Path(path))
+            except OSError as e:
+                # Supprimé, renommé ou encore verrouillé depuis le contrôle de stabilité
+                if os.path.exists(path):
+                    unreadable.append((path, stat))
+                    print(f" Fichier illisible {path}, nouvel essai dans {self.retry_delay:.0f} s : {e}")
+                else:
+                    print(f" Fichier disparu avant traitement : {path}")
+                continue
+            previous = self.index.get(path)
+            if previous is not None and previous[2] == digest:
+                entries.append((path, stat.st_mtime_ns, stat.st_size, digest, "ok"))
+            else:
+                to_process.append(path)
+                stats[path] = (stat, digest)
+
+        self.pending.retry(unreadable, self.retry_delay)
+
+        rows, written = [], []
+        for path, result, error in self.pool.map(_process, to_process):
+            stat, digest = stats[path]
+            if error is None:
+                cv_data, text = result
+                rows.append(build_row(cv_data, Path(path).name, text=text))
+                written.append(path)
+            else:
+                print(f" Erreur sur {path} : {error}")
+            entries.append((path, stat.st_mtime_ns, stat.st_size, digest, "ok" if error is None else "error"))
+
+        if rows and not self._write(rows):
+            # Lot annulé : ses fichiers seront retraités, les autres sont indexés
+            delay = min(RETRY_MAX_DELAY, self.retry_delay * 2 ** (self.failures - 1))
+            self.pending.retry([(path, stat) for path, stat in ready if path in written], delay)
+            self.index.record([entry for entry in entries if entry[0] not in written])
+            print(f" {len(rows)} CV remis en attente, nouvel essai dans {delay:.0f} s")
+            return len(ready)
+        # L'index n'est mis à jour qu'après le commit en base
+        self.index.record(entries)
+        print(f" {len(rows)} CV enregistrés, {len(entries) - len(rows)} ignorés ou en erreur ({len(self.pending)} en attente)")
+        return len(ready)
+
+    def _write(self, rows: List[Dict]) -> bool:
+        """Enregistre un lot en base. Retourne False (transaction annulée) si l'écriture échoue."""
+        db = SessionLocal()
+        try:
+            upsert_rows(db, rows)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.failures += 1
+            print(f" Erreur lors de l'enregistrement en base ({self.failures} échec(s) consécutif(s)) : {e}")
+            return False
+        finally:
+            db.close()
+        self.failures = 0
+        return True
+
+    def run(self) -> None:
+        queued = self.scan()
+        print(f" {queued} fichiers nouveaux ou modifiés depuis le dernier arrêt")
+
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_EventHandler(self.pending), str(self.root), recursive=True)
+            observer.start()
+            print(f" Surveillance inotify de {self.root}")
+        else:
+            print(f" watchdog non installé : scrutation toutes les {self.poll_interval} s")
+
+        last_scan = time.monotonic()
+        try:
+            while not self.stopping:
+                if observer is None and time.monotonic() - last_scan >= self.poll_interval:
+                    self.scan()
+                    last_scan = time.monotonic()
+                if not self.process_ready():
+                    time.sleep(0.5)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self.pool.close()
+            self.pool.join()
+
+    def stop(self, *_) -> None:
+        self.stopping = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion continue d'un dossier de CV")
+    parser.add_argument("directory", type=Path, help="Dossier surveillé (récursif)")
+    parser.add_argument("--index", type=Path, help=f"Index persistant (défaut : <dossier>/{INDEX_NAME})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    parser.add_argument("--batch-size", type=int, default=50, help="Nombre maximal de fichiers par lot")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Délai de stabilité d'un fichier (s)")
+    parser.add_argument("--poll-interval", type=float, default=10.0, help="Période de scrutation sans inotify (s)")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"Dossier introuvable : {args.directory}")
+
+    init_database()
+    watcher = FolderWatcher(
+        args.directory,
+        FileIndex(args.index or args.directory / INDEX_NAME),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+    )
+    signal.signal(signal.SIGTERM, watcher.stop)
+    signal.signal(signal.SIGINT, watcher.stop)
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,9 @@ import streamlit as st
 import requests
 import json
 import os
+import uuid
 from typing import Optional, Dict, List
 import pandas as pd
-from datetime import datetime
 
 st.set_page_config(
     page_title="CV Extractor",
@@ -24,6 +24,37 @@ BASE_URL = os.getenv("BACKEND_URL", "http://backend:8000").replace("/api/v1/uplo
 UPLOAD_URL = f"{BASE_URL}/api/v1/upload-cv"
 HISTORY_URL = f"{BASE_URL}/api/v1/history"
 
+# Clé d'API du frontend, déclarée "interactive" dans API_CLIENTS côté backend :
+# les uploads faits depuis l'interface sont prioritaires sur l'ingestion en masse
+FRONTEND_API_KEY = os.getenv("FRONTEND_API_KEY", "")
+
+# Historique : pagination, tri et filtres sont faits par le backend
+PAGE_SIZES = [25, 50, 100, 200]
+SORT_OPTIONS = {
+    "Dernier upload": "last_seen_at",
+    "Premier upload": "created_at",
+    "Nom": "last_name",
+    "Prénom": "first_name",
+    "Niveau de diplôme": "degree_level",
+    "Fichier": "filename",
+    "Nombre d'uploads": "upload_count",
+}
+DEGREE_LABELS = [
+    "Tous", "CAP", "Bac", "BTS", "DUT", "BUT", "Licence", "Bachelor",
+    "Master", "Mastère spécialisé", "MBA", "Ingénieur", "Doctorat",
+]
+HISTORY_COLUMNS = {
+    "last_name": "Nom",
+    "first_name": "Prénom",
+    "email": "Email",
+    "phone": "Téléphone",
+    "degree": "Diplôme",
+    "degree_level": "Bac+",
+    "filename": "Fichier",
+    "upload_count": "Uploads",
+    "last_seen_at": "Dernier upload",
+}
+
 st.markdown("""
     <style>
     .main-title {
@@ -51,14 +82,25 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def upload_headers() -> Dict[str, str]:
+    """En-têtes d'upload : clé du frontend et identifiant de la session (un bucket de débit par utilisateur)"""
+    if not FRONTEND_API_KEY:
+        return {}
+    end_user = st.session_state.setdefault("end_user_id", uuid.uuid4().hex)
+    return {"X-API-Key": FRONTEND_API_KEY, "X-End-User": end_user}
+
+
 def upload_cv_to_backend(file) -> Optional[Dict]:
     """Envoie le fichier CV au backend"""
     try:
         files = {"file": (file.name, file.getvalue(), file.type)}
-        response = requests.post(UPLOAD_URL, files=files, timeout=30)
+        response = requests.post(UPLOAD_URL, files=files, headers=upload_headers(), timeout=30)
         
         if response.status_code == 200:
             return response.json()
+        elif response.status_code in (429, 503):
+            st.warning(f" Serveur occupé, réessayez dans {response.headers.get('Retry-After', 'quelques')} secondes")
+            return None
         else:
             st.error(f"Erreur API : {response.status_code} - {response.text}")
             return None
@@ -71,14 +113,27 @@ def upload_cv_to_backend(file) -> Optional[Dict]:
         return None
 
 
-def get_history() -> Optional[List[Dict]]:
-    """Récupère l'historique des CV"""
+def get_history(params: Dict) -> Optional[Dict]:
+    """
+    Récupère une page de l'historique des CV ({"total", "data"...}).
+    L'ETag de la dernière réponse est renvoyé : si l'historique n'a pas
+    changé et que la page demandée est la même, le backend répond 304 et
+    la copie locale est réutilisée.
+    """
+    cached = st.session_state.get("history_cache")
+    if cached and cached["params"] != params:
+        cached = None
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
     try:
-        response = requests.get(HISTORY_URL, timeout=10)
+        response = requests.get(HISTORY_URL, params=params, headers=headers, timeout=10)
         
+        if response.status_code == 304 and cached:
+            return cached["page"]
         if response.status_code == 200:
-            data = response.json()
-            return data.get("data", [])
+            page = response.json()
+            if response.headers.get("ETag"):
+                st.session_state["history_cache"] = {"etag": response.headers["ETag"], "params": params, "page": page}
+            return page
         else:
             st.error(f"Erreur lors de la récupération de l'historique : {response.status_code}")
             return None
@@ -91,10 +146,10 @@ def get_history() -> Optional[List[Dict]]:
         return None
 
 
-def delete_cv_from_history(cv_id: int) -> bool:
-    """Supprime un CV de l'historique"""
+def delete_cvs_from_history(cv_ids: List[int]) -> bool:
+    """Supprime les CV sélectionnés de l'historique"""
     try:
-        response = requests.delete(f"{HISTORY_URL}/{cv_id}", timeout=10)
+        response = requests.post(f"{HISTORY_URL}/delete", json={"ids": cv_ids}, timeout=10)
         return response.status_code == 200
     except Exception as e:
         st.error(f" Erreur lors de la suppression : {str(e)}")
@@ -107,6 +162,12 @@ def display_results_page(cv_data: Dict):
     
     st.markdown('<p class="main-title"> Résultats de l\'extraction</p>', unsafe_allow_html=True)
     st.markdown('<div class="success-box"> Le CV a été analysé avec succès et sauvegardé dans la base de données !</div>', unsafe_allow_html=True)
+    if cv_data.get("partial"):
+        st.warning(" Analyse interrompue (document trop long à lire) : seules les premières pages ont été prises en compte")
+    if cv_data.get("locale"):
+        st.caption(f"Langue détectée : {cv_data['locale'].upper()}")
+    if cv_data.get("duplicate_of"):
+        st.info(f" Ce CV ressemble fortement au CV n°{cv_data['duplicate_of']} de l'historique : il y est rattaché comme nouvelle version")
     
     st.markdown("###  Informations extraites (modifiables)")
     
@@ -205,8 +266,38 @@ def display_upload_page():
                         st.rerun()
 
 
+def history_filters() -> Dict:
+    """Filtres et tri de l'historique (envoyés au backend)"""
+    col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 1, 2, 1, 1])
+    
+    with col1:
+        search = st.text_input("Rechercher", placeholder="Nom, prénom, email ou fichier", key="history_search")
+    with col2:
+        degree_label = st.selectbox("Diplôme", DEGREE_LABELS, key="history_degree")
+    with col3:
+        min_level = st.number_input("Bac+ min.", min_value=0, max_value=8, value=0, key="history_min_level")
+    with col4:
+        sort_label = st.selectbox("Trier par", list(SORT_OPTIONS), key="history_sort")
+    with col5:
+        descending = st.toggle("Décroissant", value=True, key="history_descending")
+    with col6:
+        group_versions = st.toggle("Versions", value=False, key="history_group_versions",
+                                   help="Une ligne par CV d'origine, avec son nombre de versions")
+    
+    params = {"sort": f"{'-' if descending else ''}{SORT_OPTIONS[sort_label]}"}
+    if search.strip():
+        params["q"] = search.strip()
+    if degree_label != "Tous":
+        params["degree_label"] = degree_label
+    if min_level:
+        params["min_level"] = int(min_level)
+    if group_versions:
+        params["group_versions"] = "true"
+    return params
+
+
 def display_history_page():
-    """Page d'historique des CV analysés"""
+    """Page d'historique des CV analysés (une page du tableau à la fois)"""
     st.markdown('<p class="main-title">📚 Historique des CV Analysés</p>', unsafe_allow_html=True)
     
     col1, col2 = st.columns([3, 1])
@@ -215,42 +306,69 @@ def display_history_page():
         if st.button("🔄 Rafraîchir", use_container_width=True):
             st.rerun()
     
-    history = get_history()
+    params = history_filters()
+    # Retour à la première page quand les filtres ou le tri changent
+    if st.session_state.get("history_params") != params:
+        st.session_state["history_params"] = params
+        st.session_state["history_page"] = 1
     
-    if history is None:
+    page_size = st.session_state.setdefault("history_page_size", PAGE_SIZES[1])
+    page_number = st.session_state.setdefault("history_page", 1)
+    page = get_history({**params, "limit": page_size, "offset": (page_number - 1) * page_size})
+    
+    if page is None:
         st.warning(" Impossible de récupérer l'historique")
         return
     
-    if len(history) == 0:
-        st.info(" Aucun CV analysé pour le moment. Commencez par uploader un CV !")
+    total = page.get("total", page["count"])
+    if total == 0:
+        if len(params) > 1:
+            st.info(" Aucun CV ne correspond à ces filtres.")
+        else:
+            st.info(" Aucun CV analysé pour le moment. Commencez par uploader un CV !")
         return
     
-    st.success(f" {len(history)} CV analysé(s)")
+    page_count = max(1, -(-total // page_size))
+    if page_number > page_count:
+        # Page vidée par une suppression : dernière page existante
+        st.session_state["history_page"] = page_count
+        st.rerun()
     
-    # Affichage sous forme de tableau
-    for cv in history:
-        with st.expander(
-            f" {cv['first_name']} {cv['last_name']} - {cv['filename']} - {datetime.fromisoformat(cv['created_at']).strftime('%d/%m/%Y %H:%M')}"
-        ):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**Prénom :** {cv['first_name']}")
-                st.write(f"**Nom :** {cv['last_name']}")
-                st.write(f"**Email :** {cv['email']}")
-            
-            with col2:
-                st.write(f"**Téléphone :** {cv['phone']}")
-                st.write(f"**Diplôme :** {cv['degree']}")
-                st.write(f"**Date d'analyse :** {datetime.fromisoformat(cv['created_at']).strftime('%d/%m/%Y à %H:%M:%S')}")
-            
-            # Bouton de suppression
-            if st.button(f" Supprimer", key=f"delete_{cv['id']}"):
-                if delete_cv_from_history(cv['id']):
-                    st.success(" CV supprimé !")
-                    st.rerun()
-                else:
-                    st.error(" Erreur lors de la suppression")
+    st.success(f" {total} CV analysé(s)")
+    
+    # Tableau virtualisé : seules les lignes visibles sont dessinées
+    columns = {**HISTORY_COLUMNS, "versions": "Versions"} if "group_versions" in params else HISTORY_COLUMNS
+    table = pd.DataFrame(page["data"], columns=["id", *columns])
+    table["last_seen_at"] = pd.to_datetime(table["last_seen_at"])
+    selection = st.dataframe(
+        table.set_index("id").rename(columns=columns),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        column_config={
+            "Email": st.column_config.TextColumn(width="medium"),
+            "Diplôme": st.column_config.TextColumn(width="large"),
+            "Dernier upload": st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm"),
+        },
+        # Nouvelle sélection dès que les lignes affichées changent
+        key=f"history_table_{json.dumps(params, sort_keys=True)}_{page_number}_{page_size}_{total}",
+    )
+    selected_ids = [int(table["id"].iloc[row]) for row in selection.selection.rows if row < len(table)]
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        if st.button(f" Supprimer la sélection ({len(selected_ids)})", disabled=not selected_ids):
+            if delete_cvs_from_history(selected_ids):
+                st.success(" CV supprimé(s) !")
+                st.rerun()
+            else:
+                st.error(" Erreur lors de la suppression")
+    with col2:
+        st.number_input(f"Page (sur {page_count})", min_value=1, max_value=page_count, key="history_page")
+    with col3:
+        st.selectbox("Lignes par page", PAGE_SIZES, key="history_page_size")
 
 
 def main():